@@ -80,9 +80,10 @@ CREATE TABLE LISTING (
 	list_image TEXT,
 	location_id VARCHAR(50) REFERENCES LOCATION(location_id),
 	meta_tag TEXT,
-	t_created TIMESTAMP,
-	t_last_edit TIMESTAMP
-
+	t_created TIMESTAMP NOT NULL DEFAULT now(),
+	t_last_edit TIMESTAMP,
+	-- weighted title/meta_tag/description document, see data_models/search_index.py
+	search_vector TSVECTOR
 );
 
 CREATE TABLE TRANSACTION (
@@ -90,10 +91,12 @@ CREATE TABLE TRANSACTION (
 	buyer_id VARCHAR(50) REFERENCES BUYER(buyer_id),
 	seller_id VARCHAR(50) REFERENCES SELLER(seller_id),
 	listing_id VARCHAR(50) REFERENCES LISTING(listing_id),
-	t_date DATE,
+	t_date DATE NOT NULL DEFAULT CURRENT_DATE,
 	agreed_price DECIMAL(10, 2) NOT NULL,
 	serv_fee DECIMAL(10, 2),
-	status VARCHAR(20) CHECK (status IN ('pending', 'confirming', 'confirmed', 'completed')) NOT NULL
+	status VARCHAR(20) CHECK (status IN ('pending', 'confirming', 'confirmed', 'completed')) NOT NULL,
+	idempotency_key VARCHAR(64),
+	t_last_edit TIMESTAMP
 );
 
 CREATE TABLE DISPUTE (
@@ -102,5 +105,59 @@ CREATE TABLE DISPUTE (
 	admin_id VARCHAR(50) REFERENCES ADMIN(admin_id),
 	description TEXT NOT NULL,
 	status VARCHAR(50) CHECK(status IN ('solved', 'unsolved')) NOT NULL,
-	resolution_date DATE
-);
\ No newline at end of file
+	resolution_date DATE,
+	t_filed TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- Secondary indexes, named as in the models; keep in sync with
+-- migrations/versions/b4db21e4f319_index_plan.py
+CREATE INDEX ix_pr_transaction_buyer_date ON TRANSACTION (buyer_id, t_date, transaction_id);
+CREATE INDEX ix_pr_transaction_seller_date ON TRANSACTION (seller_id, t_date, transaction_id);
+CREATE INDEX ix_pr_transaction_buyer_status ON TRANSACTION (buyer_id, status);
+CREATE INDEX ix_pr_transaction_seller_status ON TRANSACTION (seller_id, status);
+CREATE INDEX ix_pr_transaction_listing_buyer ON TRANSACTION (listing_id, buyer_id);
+CREATE UNIQUE INDEX ux_pr_transaction_buyer_idempotency ON TRANSACTION (buyer_id, idempotency_key);
+CREATE INDEX ix_pr_listing_created ON LISTING (t_created, listing_id);
+CREATE INDEX ix_pr_listing_seller_status ON LISTING (seller_id, status);
+CREATE INDEX ix_pr_listing_price ON LISTING (price);
+CREATE INDEX ix_pr_listing_search_vector ON LISTING USING gin (search_vector);
+CREATE INDEX ix_pr_dispute_transaction ON DISPUTE (transaction_id);
+CREATE INDEX ix_pr_dispute_status ON DISPUTE (status, dispute_id);
+CREATE INDEX ix_pr_dispute_unsolved_filed ON DISPUTE (t_filed, dispute_id) WHERE status = 'unsolved';
+CREATE INDEX ix_pr_account_user ON ACCOUNT (user_id);
+
+-- Dashboard aggregates, maintained incrementally by data_models/summary.py;
+-- keep in sync with migrations/versions/3f9a6c1d2b7e_dashboard_summaries.py
+CREATE TABLE SELLER_SUMMARY (
+	seller_id VARCHAR(50) PRIMARY KEY REFERENCES SELLER(seller_id),
+	completed_amount DECIMAL(12, 2) NOT NULL DEFAULT 0,
+	completed_fees DECIMAL(12, 2) NOT NULL DEFAULT 0,
+	count_pending INTEGER NOT NULL DEFAULT 0,
+	count_processing INTEGER NOT NULL DEFAULT 0,
+	count_cancelled INTEGER NOT NULL DEFAULT 0,
+	count_refunded INTEGER NOT NULL DEFAULT 0,
+	count_confirming INTEGER NOT NULL DEFAULT 0,
+	count_confirmed INTEGER NOT NULL DEFAULT 0,
+	count_completed INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE BUYER_SUMMARY (
+	buyer_id VARCHAR(50) PRIMARY KEY REFERENCES BUYER(buyer_id),
+	completed_amount DECIMAL(12, 2) NOT NULL DEFAULT 0,
+	completed_fees DECIMAL(12, 2) NOT NULL DEFAULT 0,
+	count_pending INTEGER NOT NULL DEFAULT 0,
+	count_processing INTEGER NOT NULL DEFAULT 0,
+	count_cancelled INTEGER NOT NULL DEFAULT 0,
+	count_refunded INTEGER NOT NULL DEFAULT 0,
+	count_confirming INTEGER NOT NULL DEFAULT 0,
+	count_confirmed INTEGER NOT NULL DEFAULT 0,
+	count_completed INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE LISTING_SALES (
+	listing_id VARCHAR(50) PRIMARY KEY REFERENCES LISTING(listing_id) ON DELETE CASCADE,
+	seller_id VARCHAR(50) REFERENCES SELLER(seller_id),
+	sale_count INTEGER NOT NULL DEFAULT 0,
+	total_amount DECIMAL(12, 2) NOT NULL DEFAULT 0
+);
+CREATE INDEX ix_pr_listing_sales_seller ON LISTING_SALES (seller_id, sale_count);
@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
 
 import click
+import os
 import sys
 from pathlib import Path
-from COMSW4111.server import create_app
 
 file = Path(__file__).resolve()
 package_root_directory = file.parents[1]
@@ -21,6 +21,7 @@ def launch():
     Launches the web browser and runs the app.
     :param url: The URL to open in the web browser.
     """
+    from COMSW4111.server import create_app
     app = create_app()
     app.run(host="0.0.0.0", port=8111, debug=True)
 
@@ -31,13 +32,136 @@ def local(url):
     Launches the web browser and runs the app.
     :param url: The URL to open in the web browser.
     """
+    from COMSW4111.server import create_app
     app = create_app()
     click.launch(url)
     app.run(host="127.0.0.1", port=8111, debug=True)
 
+@click.command()
+@click.option("--host", default=None, help="Bind address (SERVER_HOST)")
+@click.option("--port", type=int, default=None, help="Bind port (SERVER_PORT)")
+@click.option("--workers", type=int, default=None, help="Worker processes (SERVER_WORKERS)")
+@click.option("--threads", type=int, default=None, help="Threads per worker (SERVER_THREADS)")
+@click.option("--keepalive", type=int, default=None, help="Keep-alive seconds (SERVER_KEEPALIVE)")
+@click.option("--preload/--no-preload", default=None, help="Import the app once in the master (SERVER_PRELOAD)")
+@click.option("--pidfile", default=None, help="Master pid file, for kill -HUP reloads (SERVER_PIDFILE)")
+def serve(host, port, workers, threads, keepalive, preload, pidfile):
+    """
+    Runs the app under gunicorn with multiple workers, configured from the
+    APP_ENV config profile, which defaults to production here.
+    Send SIGHUP to the master to reload workers gracefully.
+    """
+    from functools import partial
+    from COMSW4111.config import get_config
+    from COMSW4111.server import create_app
+    from COMSW4111.server.wsgi import server_options, serve as run_server
+    # Unlike the development server, never fall back to the debug profile
+    config_class = get_config(os.environ.get('APP_ENV') or 'production')
+    config = {key: getattr(config_class, key) for key in dir(config_class) if key.isupper()}
+    options = server_options(
+        config,
+        workers=workers,
+        threads=threads,
+        keepalive=keepalive,
+        preload_app=preload,
+        pidfile=pidfile
+    )
+    if host or port:
+        default_host, default_port = options['bind'].rsplit(':', 1)
+        options['bind'] = f"{host or default_host}:{port or default_port}"
+    run_server(partial(create_app, config_class), options)
+
+@click.command("startup-profile")
+@click.option("--top", type=int, default=20, help="Number of packages to list")
+def startup_profile(top):
+    """
+    Reports how long importing and building the web app takes in a fresh
+    interpreter, and which packages spend the most time being imported.
+    """
+    from COMSW4111.commandline.profiling import profile_startup
+    total, packages = profile_startup(top)
+    for name, seconds in packages:
+        click.echo(f"{seconds * 1000:8.1f} ms  {name}")
+    click.echo(f"create_app ready in {total * 1000:.1f} ms")
+
+@click.group()
+def database():
+    """Click group for database maintenance commands."""
+    pass
+
+
+@click.command()
+def bootstrap():
+    """
+    Creates all tables on a new database and stamps it at the latest migration.
+    Run this once per database; use 'flask db upgrade' for later schema changes.
+    """
+    from COMSW4111.data_models.schema import bootstrap as create_schema
+    from COMSW4111.commandline.maintenance import create_maintenance_app
+    app = create_maintenance_app(migrations=True)
+    with app.app_context():
+        revision = create_schema()
+    click.echo(f"Database created at revision {revision}")
+
+@click.command()
+def reindex():
+    """
+    Rebuilds the listing search index from the pr_listing table.
+    """
+    from COMSW4111.data_models.search_index import rebuild_search_index
+    from COMSW4111.commandline.maintenance import create_maintenance_app
+    app = create_maintenance_app()
+    with app.app_context():
+        count = rebuild_search_index()
+    click.echo(f"Indexed {count} listings")
+
+@click.command("rebuild-summaries")
+def rebuild_summaries():
+    """
+    Recomputes the seller/buyer dashboard summary tables from pr_transaction.
+    """
+    from COMSW4111.data_models.summary import rebuild_summaries as rebuild
+    from COMSW4111.commandline.maintenance import create_maintenance_app
+    app = create_maintenance_app()
+    with app.app_context():
+        count = rebuild()
+    click.echo(f"Wrote {count} summary rows")
+
+@click.command()
+@click.option("--allow-seqscan", is_flag=True, help="Keep the Postgres planner's enable_seqscan on")
+@click.option("--verbose", is_flag=True, help="Print every plan, not only the offending ones")
+def explain(allow_seqscan, verbose):
+    """
+    Runs EXPLAIN on every registered query and reports sequential scans.
+    Exits with status 1 if any query still scans a whole table.
+    """
+    from COMSW4111.data_models.query_plan import explain_queries
+    from COMSW4111.commandline.maintenance import create_maintenance_app
+    app = create_maintenance_app()
+    with app.app_context():
+        results = explain_queries(allow_seqscan=allow_seqscan)
+    failures = 0
+    for name, plan, seq_scans in results:
+        if seq_scans:
+            failures += 1
+            click.echo(f"SEQ SCAN  {name}: {', '.join(seq_scans)}")
+        else:
+            click.echo(f"ok        {name}")
+        if seq_scans or verbose:
+            for line in plan:
+                click.echo(f"    {line}")
+    click.echo(f"{len(results)} queries, {failures} with sequential scans")
+    sys.exit(1 if failures else 0)
+
 web_browser.add_command(launch)
 web_browser.add_command(local)
-cli = click.CommandCollection(sources=[web_browser])
+web_browser.add_command(serve)
+web_browser.add_command(startup_profile)
+database.add_command(bootstrap)
+database.add_command(reindex)
+database.add_command(rebuild_summaries)
+database.add_command(explain)
+cli = click.CommandCollection(sources=[web_browser, database])
 
 if __name__ == '__main__':
     cli()
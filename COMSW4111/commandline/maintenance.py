@@ -0,0 +1,20 @@
+from flask import Flask
+from COMSW4111.config import get_config
+from COMSW4111.data_models import db
+from COMSW4111.data_models.schema import MIGRATIONS_DIR
+
+
+def create_maintenance_app(config_class=None, migrations=False):
+    """Bare app for database commands: config and SQLAlchemy only.
+
+    None of the blueprints, login handling or JSON/session machinery of
+    :func:`COMSW4111.server.create_app` are imported. Pass ``migrations=True``
+    for commands that drive Flask-Migrate; alembic is only imported then.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_class or get_config())
+    db.init_app(app)
+    if migrations:
+        from flask_migrate import Migrate
+        Migrate(app, db, directory=str(MIGRATIONS_DIR))
+    return app
@@ -0,0 +1,32 @@
+import re
+import sys
+import subprocess
+from collections import defaultdict
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+\d+ \|\s+(\S+)')
+STARTUP_SCRIPT = (
+    "import time; start = time.perf_counter(); "
+    "from COMSW4111.server import create_app; create_app(check_schema=False); "
+    "print(time.perf_counter() - start)"
+)
+
+
+def profile_startup(top=20):
+    """Build the web app in a fresh interpreter under ``-X importtime``.
+
+    Returns the wall time of import plus ``create_app`` in seconds and the
+    ``top`` packages whose own modules took longest to import, as
+    ``(top-level package, seconds)``. Each module's self time is counted
+    once, so the figures add up to the total import time.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        capture_output=True, text=True, check=True
+    )
+    packages = defaultdict(int)
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            packages[match.group(2).split('.')[0]] += int(match.group(1))
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return float(result.stdout.strip().splitlines()[-1]), [(name, micros / 1e6) for name, micros in slowest]
@@ -5,7 +5,15 @@ from datetime import datetime
 from flask_login import UserMixin
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.dialects.postgresql import TEXT
-from COMSW4111.data_models.password_logic import generate_password_hash, check_password_hash
+from COMSW4111.data_models import password_pool
+
+# session.info key collecting users whose cached copy (server/user_cache.py) is stale
+CHANGED_KEY = 'user_cache_pending'
+
+
+def note_changed(session, *user_ids):
+    """Record users whose rows were written by bulk statements, which the ORM flush hooks cannot see."""
+    session.info.setdefault(CHANGED_KEY, set()).update(user_ids)
 
 class PRUser(UserMixin, db.Model):
     __tablename__ = 'pr_user'
@@ -29,9 +37,17 @@ class PRUser(UserMixin, db.Model):
         return self.user_id
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_pool.hash_password(password)
 
     def check_password(self, password):
-        self.password_hash = self.password_hash.strip()
-        return check_password_hash(self.password_hash, password)
+        """Verify ``password`` off the request thread. On success, a hash made
+        with outdated parameters is replaced in place; the caller commits it."""
+        if not self.password_hash:
+            return False
+        stored = self.password_hash.strip()
+        if not password_pool.check_password(stored, password):
+            return False
+        if password_pool.needs_rehash(stored, password_pool.hash_method()):
+            self.password_hash = password_pool.hash_password(password)
+        return True
 
@@ -1,6 +1,7 @@
 # __init__.py
 from flask_sqlalchemy import SQLAlchemy
-db = SQLAlchemy()
+from .routing import RoutingSession
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 # Import all models AFTER db is initialized
 from .PRUser import PRUser
@@ -13,4 +14,6 @@ from .buyer import Buyer
 from .account import Account
 from .bank_account import BankAccount
 from .credit_card import CreditCard
-from .location import Location
\ No newline at end of file
+from .location import Location
+from .summary import SellerSummary, BuyerSummary, ListingSales
+from . import search_index
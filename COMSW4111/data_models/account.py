@@ -9,9 +9,11 @@ class Account(db.Model):
     user_id = db.Column(db.String(50), db.ForeignKey('pr_user.user_id'))
     account_type = db.Column(db.String(50), db.CheckConstraint("account_type IN ('bank_account', 'credit_card')"))
     billing_address = db.Column(TEXT, nullable=False)
+    __table_args__ = (
+        db.Index('ix_pr_account_user', 'user_id'),
+    )
     # Relationships
     bank_account = db.relationship('BankAccount', backref='pr_account', uselist=False, lazy=True)
     credit_card = db.relationship('CreditCard', backref='pr_account', uselist=False, lazy=True)
     seller = db.relationship('Seller', backref='pr_account', uselist=False, lazy=True)
     buyer = db.relationship('Buyer', backref='pr_account', uselist=False, lazy=True)
-
@@ -0,0 +1,222 @@
+from __future__ import annotations
+import uuid
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import and_, exists, literal, select, true, update
+from sqlalchemy.exc import IntegrityError
+from COMSW4111.data_models import db
+from COMSW4111.data_models.account import Account
+from COMSW4111.data_models.buyer import Buyer
+from COMSW4111.data_models.listing import Listing, note_changed
+from COMSW4111.data_models.PRUser import PRUser, note_changed as note_user_changed
+from COMSW4111.data_models.transaction import Transaction
+
+
+class CheckoutError(Exception):
+    """Checkout refused; ``status`` is the HTTP status the API answers with."""
+
+    status = 409
+
+
+class ListingNotFound(CheckoutError):
+    status = 404
+
+
+class OwnListing(CheckoutError):
+    status = 400
+
+
+class ListingUnavailable(CheckoutError):
+    pass
+
+
+class AlreadyPurchased(CheckoutError):
+    pass
+
+
+class IdempotencyKeyReused(CheckoutError):
+    """The key was already used for a checkout with different parameters."""
+
+    status = 422
+
+
+def _insert(connection):
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+
+def _ensure_buyer(connection, user_id):
+    """Create the buyer's account and buyer rows if missing, without reading them first.
+
+    Both are ``INSERT ... SELECT`` statements guarded by ``NOT EXISTS`` /
+    ``ON CONFLICT DO NOTHING``, so they are no-ops for returning buyers and
+    safe against a concurrent checkout by the same user. Returns whether
+    either inserted a row.
+    """
+    accounts = Account.__table__
+    users = PRUser.__table__
+    has_account = exists().where(accounts.c.user_id == user_id)
+    new_account = select(literal(str(uuid.uuid4())), users.c.user_id, users.c.address).where(
+        users.c.user_id == user_id, ~has_account
+    )
+    created = connection.execute(
+        accounts.insert().from_select(["account_id", "user_id", "billing_address"], new_account)
+    ).rowcount > 0
+    buyers = Buyer.__table__
+    account_id = select(accounts.c.account_id).where(accounts.c.user_id == user_id).limit(1).scalar_subquery()
+    # The WHERE keeps SQLite from reading ON CONFLICT as part of the SELECT
+    new_buyer = select(literal(user_id), account_id).where(true())
+    insert = _insert(connection)
+    if insert is not None:
+        statement = insert(buyers).from_select(["buyer_id", "account_id"], new_buyer)
+        statement = statement.on_conflict_do_nothing(index_elements=["buyer_id"])
+    else:
+        statement = buyers.insert().from_select(
+            ["buyer_id", "account_id"],
+            new_buyer.where(~exists().where(buyers.c.buyer_id == user_id))
+        )
+    return connection.execute(statement).rowcount > 0 or created
+
+
+def claim_statement(listing_id, buyer_id):
+    """UPDATE flipping an active listing to ``pending`` for ``buyer_id``.
+
+    The listing row is selected ``FOR UPDATE SKIP LOCKED`` and updated in the
+    same statement: while one checkout holds it, competing ones match no row
+    straight away instead of queueing behind the lock, and once it commits
+    the listing is no longer ``active``. SQLite has no row locks and simply
+    serializes the writers.
+    """
+    already_bought = exists().where(Transaction.listing_id == listing_id, Transaction.buyer_id == buyer_id)
+    claimable = (
+        select(Listing.listing_id)
+        .where(
+            Listing.listing_id == listing_id,
+            Listing.status == "active",
+            Listing.seller_id != buyer_id,
+            ~already_bought
+        )
+        .with_for_update(skip_locked=True, of=Listing)
+    )
+    return (
+        update(Listing)
+        .where(Listing.listing_id.in_(claimable), Listing.status == "active")
+        .values(status="pending", t_last_edit=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _claim_listing(listing_id, buyer_id):
+    """Run :func:`claim_statement`; returns the listing's seller, or ``None`` if it was not claimed."""
+    statement = claim_statement(listing_id, buyer_id)
+    if db.session.get_bind().dialect.update_returning:
+        return db.session.execute(statement.returning(Listing.seller_id)).scalar()
+    if db.session.execute(statement).rowcount == 0:
+        return None
+    return db.session.execute(select(Listing.seller_id).where(Listing.listing_id == listing_id)).scalar()
+
+
+def _refusal(listing_id, buyer_id) -> CheckoutError:
+    """Explain why :func:`_claim_listing` matched nothing."""
+    listing = db.session.execute(
+        select(Listing.seller_id, Listing.status).where(Listing.listing_id == listing_id)
+    ).first()
+    if listing is None:
+        return ListingNotFound("Listing not found")
+    if listing.seller_id == buyer_id:
+        return OwnListing("Cannot buy your own listing")
+    bought = db.session.execute(
+        select(Transaction.transaction_id).where(
+            and_(Transaction.listing_id == listing_id, Transaction.buyer_id == buyer_id)
+        ).limit(1)
+    ).first()
+    if bought is not None:
+        return AlreadyPurchased("Transaction already exists")
+    return ListingUnavailable("Listing is no longer available")
+
+
+def replay_query(buyer_id, idempotency_key):
+    return Transaction.query.filter_by(buyer_id=buyer_id, idempotency_key=idempotency_key)
+
+
+def _same_amount(stored, requested):
+    if stored is None or requested is None:
+        return stored is None and requested is None
+    try:
+        return Decimal(str(requested)) == stored
+    except InvalidOperation:
+        return False
+
+
+def _replay(buyer_id, idempotency_key, listing_id, agreed_price, serv_fee):
+    """The transaction an earlier request with ``idempotency_key`` created, if any.
+
+    Raises :class:`IdempotencyKeyReused` when that request asked for
+    something else: a key only ever stands for one checkout.
+    """
+    if not idempotency_key:
+        return None
+    existing = replay_query(buyer_id, idempotency_key).first()
+    if existing is not None and not (
+        existing.listing_id == listing_id
+        and _same_amount(existing.agreed_price, agreed_price)
+        and _same_amount(existing.serv_fee, serv_fee)
+    ):
+        raise IdempotencyKeyReused("Idempotency key was already used for a different checkout")
+    return existing
+
+
+def checkout(user_id, listing_id, agreed_price, serv_fee, idempotency_key=None) -> tuple[Transaction, bool]:
+    """Buy ``listing_id`` for ``user_id`` in one database transaction.
+
+    Returns ``(transaction, created)``. A retry carrying the same
+    ``idempotency_key`` returns the transaction the first attempt created,
+    with ``created`` False, instead of buying again; reusing the key for a
+    different listing or amount raises :class:`IdempotencyKeyReused`.
+    Raises a :class:`CheckoutError` when the listing cannot be bought;
+    nothing is written in that case.
+
+    The buyer rows are upserted before the listing is claimed, so the
+    listing's row lock is held only for the transaction INSERT and commit.
+    """
+    existing = _replay(user_id, idempotency_key, listing_id, agreed_price, serv_fee)
+    if existing is not None:
+        return existing, False
+    try:
+        if _ensure_buyer(db.session.connection(), user_id):
+            # The new buyer role bypassed the ORM; drop the cached current_user at commit
+            note_user_changed(db.session, user_id)
+        seller_id = _claim_listing(listing_id, user_id)
+        if seller_id is None:
+            raise _refusal(listing_id, user_id)
+        note_changed(db.session, listing_id)
+        transaction = Transaction(
+            transaction_id=str(uuid.uuid4()),
+            buyer_id=user_id,
+            seller_id=seller_id,
+            listing_id=listing_id,
+            t_date=datetime.utcnow(),
+            agreed_price=agreed_price,
+            serv_fee=serv_fee,
+            status="pending",
+            idempotency_key=idempotency_key
+        )
+        db.session.add(transaction)
+        db.session.commit()
+        return transaction, True
+    except (CheckoutError, IntegrityError):
+        db.session.rollback()
+        # A concurrent retry with the same key may have committed first
+        existing = _replay(user_id, idempotency_key, listing_id, agreed_price, serv_fee)
+        if existing is None:
+            raise
+        return existing, False
+    except Exception:
+        db.session.rollback()
+        raise
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+from datetime import datetime
+from sqlalchemy import text
 from sqlalchemy.dialects.postgresql import TEXT
 from COMSW4111.data_models import db
 
@@ -11,6 +13,18 @@ class Dispute(db.Model):
     description = db.Column(TEXT, nullable=False)
     status = db.Column(db.String(50),  db.CheckConstraint("status IN ('solved', 'unsolved')"), nullable=False)
     resolution_date = db.Column(db.Date)
+    t_filed = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, server_default=db.func.now())
+    __table_args__ = (
+        db.Index('ix_pr_dispute_transaction', 'transaction_id'),
+        db.Index('ix_pr_dispute_status', 'status', 'dispute_id'),
+        # Admin work queue: open disputes, oldest first
+        db.Index(
+            'ix_pr_dispute_unsolved_filed', 't_filed', 'dispute_id',
+            postgresql_where=text("status = 'unsolved'"), sqlite_where=text("status = 'unsolved'")
+        ),
+    )
+
+    STATUSES = ('unsolved', 'solved')
     # Relationships
     transaction = db.relationship('Transaction', backref='pr_dispute', lazy=True)
-    admin = db.relationship('Admin', backref='pr_dispute', lazy=True)
\ No newline at end of file
+    admin = db.relationship('Admin', backref='pr_dispute', lazy=True)
@@ -1,9 +1,18 @@
 #!/usr/bin/env python3
 
-from sqlalchemy.dialects.postgresql import TEXT
+from sqlalchemy.orm import deferred
+from sqlalchemy.dialects.postgresql import TEXT, TSVECTOR
 from sqlalchemy.types import DECIMAL
 from COMSW4111.data_models import db
 
+# session.info key collecting the ids of listings written in the current transaction
+CHANGED_KEY = 'listings_changed'
+
+
+def note_changed(session, *listing_ids):
+    """Record listings changed by bulk statements, which the ORM flush hooks cannot see."""
+    session.info.setdefault(CHANGED_KEY, set()).update(listing_ids)
+
 class Listing(db.Model):
     __tablename__ = 'pr_listing'
     listing_id = db.Column(db.String(50), primary_key=True)
@@ -15,11 +24,15 @@ class Listing(db.Model):
     list_image = db.Column(TEXT)
     location_id = db.Column(db.String(50), db.ForeignKey('pr_location.location_id'))
     meta_tag = db.Column(TEXT)
-    t_created = db.Column(db.DateTime)
+    t_created = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
     t_last_edit = db.Column(db.DateTime)
+    # Weighted title/meta_tag/description document, kept in sync by search_index
+    search_vector = deferred(db.Column(TSVECTOR().with_variant(TEXT(), 'sqlite')))
+    __table_args__ = (
+        db.Index('ix_pr_listing_search_vector', 'search_vector', postgresql_using='gin'),
+        db.Index('ix_pr_listing_created', 't_created', 'listing_id'),
+        db.Index('ix_pr_listing_seller_status', 'seller_id', 'status'),
+        db.Index('ix_pr_listing_price', 'price'),
+    )
     # Relationships
     transactions = db.relationship('Transaction', backref='pr_listing', lazy=True)
-
-
-
-
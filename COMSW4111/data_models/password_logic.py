@@ -63,6 +63,40 @@ def _hash_internal(method: str, salt: str, password: str) -> tuple[str, str]:
     else:
         raise ValueError(f"Invalid hash method '{method}'.")
 
+def canonical_method(method: str) -> str:
+    """Expand ``method`` to the fully parameterised form stored in a hash,
+    e.g. ``"pbkdf2"`` to ``"pbkdf2:sha256:1000000"``."""
+    name, *args = method.split(":")
+    if name == "scrypt":
+        if not args:
+            return "scrypt:32768:8:1"
+        if len(args) != 3:
+            raise ValueError("'scrypt' takes 3 arguments.")
+        return f"scrypt:{':'.join(str(int(arg)) for arg in args)}"
+    elif name == "pbkdf2":
+        if len(args) > 2:
+            raise ValueError("'pbkdf2' takes 2 arguments.")
+        hash_name = args[0] if args else "sha256"
+        iterations = int(args[1]) if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    else:
+        raise ValueError(f"Invalid hash method '{method}'.")
+
+
+def needs_rehash(pwhash: str, method: str = "pbkdf2") -> bool:
+    """Return ``True`` if ``pwhash`` was not produced with ``method``, so the
+    password should be hashed again the next time it is available in plaintext.
+
+    :param pwhash: The stored password hash.
+    :param method: The key derivation function and parameters new hashes use.
+    """
+    stored = pwhash.split("$", 1)[0]
+    try:
+        return canonical_method(stored) != canonical_method(method)
+    except ValueError:
+        return True
+
+
 def generate_password_hash(
     password: str, method: str = "pbkdf2", salt_length: int = 16
 ) -> str:
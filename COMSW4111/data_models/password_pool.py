@@ -0,0 +1,88 @@
+from __future__ import annotations
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from flask import current_app
+from COMSW4111.data_models.password_logic import generate_password_hash, check_password_hash, needs_rehash
+
+_lock = threading.Lock()
+_executor: ProcessPoolExecutor | None = None
+_slots: threading.BoundedSemaphore | None = None
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing queue is full or a hash overruns ``PASSWORD_HASH_TIMEOUT``.
+
+    Callers should answer 503 and let the client retry.
+    """
+
+    retry_after = 1
+
+
+def _config(name, default):
+    return current_app.config.get(name, default)
+
+
+def hash_method() -> str:
+    """Key derivation method and parameters new hashes are created with."""
+    return _config("PASSWORD_HASH_METHOD", "pbkdf2")
+
+
+def _pool() -> tuple[ProcessPoolExecutor | None, threading.BoundedSemaphore]:
+    global _executor, _slots
+    if _slots is None:
+        with _lock:
+            if _slots is None:
+                workers = _config("PASSWORD_HASH_WORKERS", 2)
+                if workers:
+                    # spawn: children must not inherit the parent's DB connections or threads
+                    _executor = ProcessPoolExecutor(
+                        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                _slots = threading.BoundedSemaphore(_config("PASSWORD_HASH_QUEUE", 16))
+    return _executor, _slots
+
+
+def _run(fn, *args):
+    """Run ``fn(*args)`` in the hashing pool, or raise :class:`PasswordHashingBusy`.
+
+    At most ``PASSWORD_HASH_QUEUE`` hashes may be queued or running at once
+    in this process; beyond that requests are turned away immediately rather
+    than piling up behind a CPU-bound queue. The calling thread waits on the
+    result without holding the GIL, so other requests keep being served,
+    and gives up after ``PASSWORD_HASH_TIMEOUT`` seconds.
+    With ``PASSWORD_HASH_WORKERS = 0`` hashing runs inline.
+    """
+    executor, slots = _pool()
+    if not slots.acquire(blocking=False):
+        raise PasswordHashingBusy()
+    try:
+        if executor is None:
+            return fn(*args)
+        future = executor.submit(fn, *args)
+        try:
+            return future.result(timeout=_config("PASSWORD_HASH_TIMEOUT", 30))
+        except TimeoutError:
+            # Still queued: don't run it for nobody; already running: it finishes on its own
+            future.cancel()
+            raise PasswordHashingBusy() from None
+    finally:
+        slots.release()
+
+
+def hash_password(password: str) -> str:
+    return _run(generate_password_hash, password, hash_method())
+
+
+def check_password(pwhash: str, password: str) -> bool:
+    return _run(check_password_hash, pwhash, password)
+
+
+def shutdown() -> None:
+    """Stop the worker processes; a new pool is started on next use."""
+    global _executor, _slots
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = None
+        _slots = None
@@ -0,0 +1,204 @@
+from __future__ import annotations
+import re
+from decimal import Decimal
+from sqlalchemy import func, text
+from COMSW4111.data_models import db
+from COMSW4111.data_models.PRUser import PRUser
+from COMSW4111.data_models.account import Account
+from COMSW4111.data_models.buyer import Buyer
+from COMSW4111.data_models.checkout import claim_statement, replay_query
+from COMSW4111.data_models.dispute import Dispute
+from COMSW4111.data_models.listing import Listing
+from COMSW4111.data_models.summary import BuyerSummary, ListingSales, SellerSummary
+from COMSW4111.data_models.transaction import Transaction
+
+# Placeholder bound into registered queries; only the plan matters, not the rows.
+PROBE_ID = "explain-probe"
+PROBE_PAGE = 51
+
+QUERIES: dict = {}
+
+_PG_SEQ_SCAN = re.compile(r"Seq Scan on (\w+)")
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)\b(?! USING (?:COVERING )?INDEX)")
+
+
+def register_query(name: str):
+    """Register a zero-argument builder returning a query that ``explain_queries`` should check.
+
+    Builders reproduce the shape of a query issued by a route, with
+    :data:`PROBE_ID` standing in for request parameters.
+    """
+    def decorator(builder):
+        QUERIES[name] = builder
+        return builder
+    return decorator
+
+
+def _explain(statement) -> list[str]:
+    bind = db.session.get_bind()
+    # Probe values are plain strings and numbers, so they can be inlined and
+    # the statement sent as-is without going through bind processing.
+    sql = str(statement.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True}))
+    if bind.dialect.name == "postgresql":
+        sql = "EXPLAIN " + sql
+    else:
+        sql = "EXPLAIN QUERY PLAN " + sql
+    rows = db.session.connection().exec_driver_sql(sql).fetchall()
+    return [str(row[0]) if len(row) == 1 else str(row[-1]) for row in rows]
+
+
+def sequential_scans(plan: list[str]) -> list[str]:
+    """Tables read with a full sequential scan in ``plan``."""
+    tables = []
+    for line in plan:
+        match = _PG_SEQ_SCAN.search(line) or _SQLITE_SCAN.match(line.strip())
+        if match:
+            tables.append(match.group(1))
+    return tables
+
+
+def explain_queries(allow_seqscan: bool = False) -> list[tuple[str, list[str], list[str]]]:
+    """EXPLAIN every registered query; returns ``(name, plan, seq_scan_tables)``.
+
+    On Postgres the planner's ``enable_seqscan`` is switched off for the
+    duration unless ``allow_seqscan`` is set, so that small development
+    tables do not hide a missing index: any sequential scan that remains
+    has no usable index behind it.
+    """
+    results = []
+    try:
+        if db.session.get_bind().dialect.name == "postgresql" and not allow_seqscan:
+            db.session.execute(text("SET LOCAL enable_seqscan = off"))
+        for name, builder in sorted(QUERIES.items()):
+            query = builder()
+            plan = _explain(getattr(query, "statement", query))
+            results.append((name, plan, sequential_scans(plan)))
+    finally:
+        db.session.rollback()
+    return results
+
+
+@register_query("listing.search_recent")
+def _listing_search_recent():
+    return Listing.query.order_by(Listing.t_created.desc(), Listing.listing_id.desc()).limit(PROBE_PAGE)
+
+
+@register_query("listing.search_price")
+def _listing_search_price():
+    return Listing.query.filter(Listing.price >= Decimal("10"), Listing.price <= Decimal("20")).limit(PROBE_PAGE)
+
+
+@register_query("listing.search_text")
+def _listing_search_text():
+    from COMSW4111.data_models.search_index import search_listings_query
+    query, rank = search_listings_query(Listing.query, "probe")
+    rank = rank.label("rank")
+    return query.add_columns(rank).order_by(rank.desc(), Listing.listing_id.desc()).limit(PROBE_PAGE)
+
+
+@register_query("listing.by_seller")
+def _listing_by_seller():
+    return Listing.query.filter(Listing.seller_id == PROBE_ID, Listing.status == "active")
+
+
+@register_query("transactions.visible_to")
+def _transactions_visible_to():
+    return (
+        Transaction.query.filter(Transaction.visible_to(PROBE_ID, "all"))
+        .order_by(Transaction.t_date.desc(), Transaction.transaction_id.desc())
+        .limit(PROBE_PAGE)
+    )
+
+
+@register_query("transactions.existing_purchase")
+def _transactions_existing_purchase():
+    return Transaction.query.filter(Transaction.listing_id == PROBE_ID, Transaction.buyer_id == PROBE_ID)
+
+
+@register_query("checkout.claim_listing")
+def _checkout_claim_listing():
+    return claim_statement(PROBE_ID, PROBE_ID)
+
+
+@register_query("checkout.replay")
+def _checkout_replay():
+    return replay_query(PROBE_ID, PROBE_ID)
+
+
+@register_query("account.seller_list")
+def _account_seller_list():
+    return (
+        db.session.query(Transaction, Listing.title, Listing.list_image)
+        .join(Listing, Transaction.listing_id == Listing.listing_id)
+        .filter(Transaction.seller_id == PROBE_ID)
+        .order_by(Transaction.t_date.desc(), Transaction.transaction_id.desc())
+        .limit(PROBE_PAGE)
+    )
+
+
+@register_query("account.seller_summary")
+def _account_seller_summary():
+    return SellerSummary.query.filter(SellerSummary.seller_id == PROBE_ID)
+
+
+@register_query("account.buyer_summary")
+def _account_buyer_summary():
+    return BuyerSummary.query.filter(BuyerSummary.buyer_id == PROBE_ID)
+
+
+@register_query("account.sales_by_listing")
+def _account_sales_by_listing():
+    return (
+        db.session.query(ListingSales.listing_id, Listing.title, ListingSales.sale_count, ListingSales.total_amount)
+        .join(Listing, ListingSales.listing_id == Listing.listing_id)
+        .filter(ListingSales.seller_id == PROBE_ID, ListingSales.sale_count > 0)
+    )
+
+
+@register_query("account.by_user")
+def _account_by_user():
+    return Account.query.filter(Account.user_id == PROBE_ID)
+
+
+@register_query("dispute.by_transaction")
+def _dispute_by_transaction():
+    return Dispute.query.filter(Dispute.transaction_id == PROBE_ID)
+
+
+@register_query("dispute.visible_to")
+def _dispute_visible_to():
+    return (
+        Dispute.query.join(Transaction, Dispute.transaction_id == Transaction.transaction_id)
+        .filter(Transaction.visible_to(PROBE_ID))
+        .order_by(Dispute.dispute_id.desc())
+        .limit(PROBE_PAGE)
+    )
+
+
+@register_query("admin.dispute_queue")
+def _admin_dispute_queue():
+    return (
+        db.session.query(Dispute.dispute_id, Transaction.agreed_price, PRUser.first_name)
+        .join(Transaction, Dispute.transaction_id == Transaction.transaction_id)
+        .join(PRUser, Transaction.buyer_id == PRUser.user_id)
+        .filter(Dispute.status == "unsolved")
+        .order_by(Dispute.t_filed, Dispute.dispute_id)
+        .limit(PROBE_PAGE)
+    )
+
+
+@register_query("admin.dispute_counts")
+def _admin_dispute_counts():
+    return db.session.query(Dispute.status, func.count(Dispute.dispute_id)).group_by(Dispute.status)
+
+
+@register_query("admin.disputes")
+def _admin_disputes():
+    return (
+        db.session.query(Dispute, Transaction, PRUser.first_name, PRUser.last_name)
+        .join(Transaction, Dispute.transaction_id == Transaction.transaction_id)
+        .join(Buyer, Transaction.buyer_id == Buyer.buyer_id)
+        .join(PRUser, Buyer.buyer_id == PRUser.user_id)
+        .order_by(Transaction.t_date.desc(), Dispute.dispute_id.desc())
+        .limit(PROBE_PAGE)
+    )
@@ -0,0 +1,30 @@
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+
+REPLICA = "replica"
+_ROUTE_KEY = "db_route"
+
+
+class RoutingSession(Session):
+    """Session that reads from the ``replica`` bind while a request is routed there.
+
+    :mod:`COMSW4111.server.replica` decides per request; everything else,
+    including every flush and any query issued during one, uses the bind
+    Flask-SQLAlchemy would normally pick (the primary).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and use_replica():
+            engine = self._db.engines.get(REPLICA)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_replica() -> bool:
+    return has_app_context() and g.get(_ROUTE_KEY) == REPLICA
+
+
+def route_to(bind):
+    """Send the rest of this request's reads to ``bind`` (``REPLICA``) or, with ``None``, the primary."""
+    setattr(g, _ROUTE_KEY, bind)
@@ -0,0 +1,67 @@
+from pathlib import Path
+from functools import lru_cache
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from COMSW4111.data_models import db
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[1] / 'migrations'
+
+
+class SchemaOutOfDate(RuntimeError):
+    """The database is not at the migration head this code was written against."""
+
+
+@lru_cache(maxsize=None)
+def head_revision(directory=MIGRATIONS_DIR):
+    """Newest migration in ``directory``, read from the scripts without touching the database."""
+    from alembic.config import Config as AlembicConfig
+    from alembic.script import ScriptDirectory
+    config = AlembicConfig()
+    config.set_main_option('script_location', str(directory))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def current_revision():
+    """Revision recorded in ``alembic_version``, or ``None`` if the database was never stamped."""
+    try:
+        with db.engine.connect() as connection:
+            return connection.execute(text('SELECT version_num FROM alembic_version')).scalar()
+    except SQLAlchemyError:
+        return None
+
+
+def check_schema(app, directory=MIGRATIONS_DIR):
+    """Compare the database's revision with the migration head: one SELECT, no DDL.
+
+    ``SCHEMA_CHECK`` chooses what a mismatch does: ``'error'`` raises
+    :class:`SchemaOutOfDate`, ``'warn'`` logs it, and a false value skips
+    the check entirely.
+    """
+    mode = app.config.get('SCHEMA_CHECK')
+    if not mode:
+        return
+    expected = head_revision(directory)
+    with app.app_context():
+        found = current_revision()
+    if found == expected:
+        return
+    message = (
+        f"Database schema is at {found or 'no revision'}, expected {expected}; "
+        "run 'database bootstrap' on a new database or 'flask db upgrade' on an existing one"
+    )
+    if mode == 'error':
+        raise SchemaOutOfDate(message)
+    app.logger.warning(message)
+
+
+def bootstrap():
+    """Create every table on an empty database and stamp it at the migration head.
+
+    Existing tables are left alone; bring those up to date with
+    ``flask db upgrade`` instead.
+    """
+    from flask_migrate import stamp
+    db.create_all()
+    stamp(revision='head')
+    return head_revision(current_app.extensions['migrate'].directory)
@@ -0,0 +1,207 @@
+from __future__ import annotations
+import re
+import threading
+from collections import defaultdict
+from sqlalchemy import case, event, false, func, literal, text
+from sqlalchemy.orm import Session
+from flask import current_app
+from COMSW4111.data_models import db
+from COMSW4111.data_models.listing import Listing
+
+SEARCH_CONFIG = "english"
+# Field weights, highest first. Postgres ranks with A/B/C labels, the
+# in-memory index uses the numeric weight of the field a token came from.
+FIELD_WEIGHTS = (("title", "A", 3), ("meta_tag", "B", 2), ("description", "C", 1))
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_PENDING_KEY = "listing_search_pending"
+
+
+def tokenize(value: str | None) -> list[str]:
+    """Split ``value`` into lowercase alphanumeric search terms."""
+    if not value:
+        return []
+    return _TOKEN_RE.findall(value.lower())
+
+
+def search_backend() -> str:
+    """Return ``'postgres'`` or ``'memory'`` for the current app.
+
+    ``SEARCH_BACKEND = 'auto'`` picks Postgres full-text search when the
+    database is Postgres and the in-process inverted index otherwise.
+    """
+    backend = current_app.config.get("SEARCH_BACKEND", "auto")
+    if backend == "auto":
+        return "postgres" if db.engine.dialect.name == "postgresql" else "memory"
+    return backend
+
+
+def listing_document_sql(fields):
+    """SQL expression producing the weighted tsvector for a listing.
+
+    ``fields`` maps each of title/meta_tag/description to a column or a
+    plain value, so the same document can be built for an UPDATE over the
+    table or an INSERT of a single row.
+    """
+    parts = [
+        func.setweight(func.to_tsvector(SEARCH_CONFIG, func.coalesce(fields[field], "")), label)
+        for field, label, _ in FIELD_WEIGHTS
+    ]
+    document = parts[0]
+    for part in parts[1:]:
+        document = document.op("||")(part)
+    return document
+
+
+class InvertedIndex:
+    """Thread-safe token -> {listing_id: score} postings for SQLite/dev.
+
+    The index is built lazily from the database on first use and then kept
+    current from committed ORM changes, so a lookup only touches the
+    postings of the query terms instead of every row in ``pr_listing``.
+    It is per process; writes made by other processes are picked up on the
+    next :meth:`rebuild`.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: dict[str, dict[str, int]] = defaultdict(dict)
+        self._documents: dict[str, set[str]] = {}
+        self.ready = False
+
+    @staticmethod
+    def _scores(fields: dict) -> dict[str, int]:
+        scores: dict[str, int] = defaultdict(int)
+        for field, _, weight in FIELD_WEIGHTS:
+            for token in tokenize(fields.get(field)):
+                scores[token] += weight
+        return scores
+
+    def _remove(self, listing_id: str) -> None:
+        for token in self._documents.pop(listing_id, ()):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(listing_id, None)
+                if not postings:
+                    del self._postings[token]
+
+    def add(self, listing_id: str, fields: dict) -> None:
+        scores = self._scores(fields)
+        with self._lock:
+            self._remove(listing_id)
+            for token, score in scores.items():
+                self._postings[token][listing_id] = score
+            self._documents[listing_id] = set(scores)
+
+    def remove(self, listing_id: str) -> None:
+        with self._lock:
+            self._remove(listing_id)
+
+    def rebuild(self, session) -> int:
+        """Reload every listing from ``session`` and return the row count."""
+        rows = session.query(
+            Listing.listing_id, Listing.title, Listing.description, Listing.meta_tag
+        ).all()
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+            for row in rows:
+                self.add(row.listing_id, row._asdict())
+            self.ready = True
+        return len(rows)
+
+    def search(self, query: str) -> list[tuple[str, int]]:
+        """Return ``(listing_id, score)`` pairs matching every term, best first."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            postings = sorted((self._postings.get(term, {}) for term in terms), key=len)
+            if not postings[0]:
+                return []
+            matches = {listing_id: 0 for listing_id in postings[0]}
+            for posting in postings[1:]:
+                matches = {listing_id: 0 for listing_id in matches if listing_id in posting}
+                if not matches:
+                    return []
+            for posting in postings:
+                for listing_id in matches:
+                    matches[listing_id] += posting[listing_id]
+        return sorted(matches.items(), key=lambda item: item[1], reverse=True)
+
+
+listing_index = InvertedIndex()
+
+
+def search_listings_query(query, text_query: str):
+    """Restrict a ``Listing`` query to ``text_query`` matches.
+
+    Returns ``(query, rank)`` where ``rank`` is a SQL expression scoring
+    each match, higher is better, for the caller to order and page on.
+    With the in-memory index the query is limited to the matching ids and
+    the rank is a ``CASE`` over their scores.
+    """
+    if search_backend() == "postgres":
+        ts_query = func.plainto_tsquery(SEARCH_CONFIG, text_query)
+        query = query.filter(Listing.search_vector.op("@@")(ts_query))
+        return query, func.ts_rank_cd(Listing.search_vector, ts_query)
+    if not listing_index.ready:
+        listing_index.rebuild(db.session)
+    ranks = dict(listing_index.search(text_query))
+    if not ranks:
+        return query.filter(false()), literal(0)
+    rank = case(ranks, value=Listing.listing_id, else_=0)
+    return query.filter(Listing.listing_id.in_(list(ranks))), rank
+
+
+def rebuild_search_index() -> int:
+    """Backfill the search column (Postgres) or in-memory index; returns rows indexed."""
+    if search_backend() == "postgres":
+        db.session.execute(text("ALTER TABLE pr_listing ADD COLUMN IF NOT EXISTS search_vector tsvector"))
+        db.session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_pr_listing_search_vector ON pr_listing USING gin (search_vector)"
+        ))
+        table = Listing.__table__
+        result = db.session.execute(table.update().values(search_vector=listing_document_sql(table.c)))
+        db.session.commit()
+        return result.rowcount
+    return listing_index.rebuild(db.session)
+
+
+@event.listens_for(Listing, "before_insert")
+@event.listens_for(Listing, "before_update")
+def _set_search_vector(mapper, connection, target):
+    if connection.dialect.name == "postgresql":
+        target.search_vector = listing_document_sql(
+            {field: getattr(target, field) for field, _, _ in FIELD_WEIGHTS}
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_listing_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for obj in session.deleted:
+        if isinstance(obj, Listing):
+            pending[obj.listing_id] = None
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Listing) and obj not in session.deleted:
+            pending[obj.listing_id] = {
+                "title": obj.title, "description": obj.description, "meta_tag": obj.meta_tag
+            }
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_listing_changes(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or not listing_index.ready:
+        return
+    for listing_id, fields in pending.items():
+        if fields is None:
+            listing_index.remove(listing_id)
+        else:
+            listing_index.add(listing_id, fields)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_listing_changes(session):
+    session.info.pop(_PENDING_KEY, None)
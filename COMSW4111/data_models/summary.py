@@ -0,0 +1,199 @@
+from __future__ import annotations
+from collections import Counter
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.orm import Session
+from sqlalchemy.types import DECIMAL
+from COMSW4111.data_models import db
+from COMSW4111.data_models.transaction import Transaction
+
+# Always reported on the dashboards, even at zero
+DASHBOARD_STATUSES = ("pending", "confirming", "confirmed", "completed")
+# Transaction attributes the summaries are derived from
+TRACKED = ("buyer_id", "seller_id", "listing_id", "agreed_price", "serv_fee", "status")
+
+
+class PartySummary:
+    """Running totals over every transaction of one seller or buyer.
+
+    Rows are maintained incrementally by the flush hooks in this module, so
+    dashboards read one row instead of aggregating the transaction history.
+    ``rebuild_summaries`` recomputes them from scratch.
+    """
+
+    completed_amount = db.Column(DECIMAL(12, 2), nullable=False, default=0)
+    completed_fees = db.Column(DECIMAL(12, 2), nullable=False, default=0)
+    count_pending = db.Column(db.Integer, nullable=False, default=0)
+    count_processing = db.Column(db.Integer, nullable=False, default=0)
+    count_cancelled = db.Column(db.Integer, nullable=False, default=0)
+    count_refunded = db.Column(db.Integer, nullable=False, default=0)
+    count_confirming = db.Column(db.Integer, nullable=False, default=0)
+    count_confirmed = db.Column(db.Integer, nullable=False, default=0)
+    count_completed = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def for_party(cls, party_id):
+        """Summary row for ``party_id``, or an unsaved all-zero one if it has no transactions yet."""
+        summary = db.session.get(cls, party_id)
+        if summary is None:
+            counts = {f"count_{status}": 0 for status in Transaction.STATUSES}
+            summary = cls(completed_amount=0, completed_fees=0, **counts)
+        return summary
+
+    def status_summary(self) -> dict:
+        counts = {status: getattr(self, f"count_{status}") or 0 for status in Transaction.STATUSES}
+        return {status: count for status, count in counts.items() if count or status in DASHBOARD_STATUSES}
+
+
+class SellerSummary(PartySummary, db.Model):
+    __tablename__ = "pr_seller_summary"
+    seller_id = db.Column(db.String(50), db.ForeignKey("pr_seller.seller_id"), primary_key=True)
+
+
+class BuyerSummary(PartySummary, db.Model):
+    __tablename__ = "pr_buyer_summary"
+    buyer_id = db.Column(db.String(50), db.ForeignKey("pr_buyer.buyer_id"), primary_key=True)
+
+
+class ListingSales(db.Model):
+    """Completed sales per listing, for the seller dashboard's per-listing breakdown."""
+
+    __tablename__ = "pr_listing_sales"
+    # Deleting a listing drops its sales row; the transactions keep their history
+    listing_id = db.Column(db.String(50), db.ForeignKey("pr_listing.listing_id", ondelete="CASCADE"), primary_key=True)
+    seller_id = db.Column(db.String(50), db.ForeignKey("pr_seller.seller_id"))
+    sale_count = db.Column(db.Integer, nullable=False, default=0)
+    total_amount = db.Column(DECIMAL(12, 2), nullable=False, default=0)
+    __table_args__ = (db.Index("ix_pr_listing_sales_seller", "seller_id", "sale_count"),)
+
+
+PARTIES = ((SellerSummary, "seller_id"), (BuyerSummary, "buyer_id"))
+
+
+def _contributions(values: dict, sign: int):
+    """Yield ``(model, row, deltas)`` that add (``sign=1``) or remove (``-1``) one transaction."""
+    status = values["status"]
+    completed = status == "completed"
+    price = values["agreed_price"] or 0
+    fee = values["serv_fee"] or 0
+    for model, party in PARTIES:
+        if values[party] is None:
+            continue
+        deltas = {}
+        if status in Transaction.STATUSES:
+            deltas[f"count_{status}"] = sign
+        if completed:
+            deltas["completed_amount"] = sign * price
+            deltas["completed_fees"] = sign * fee
+        if deltas:
+            yield model, {party: values[party]}, deltas
+    if completed and values["listing_id"] is not None:
+        yield ListingSales, {"listing_id": values["listing_id"], "seller_id": values["seller_id"]}, {
+            "sale_count": sign, "total_amount": sign * price
+        }
+
+
+def _state_values(obj, before: bool):
+    """Tracked values of a flushed transaction as they were ``before`` the flush, or after it."""
+    attrs = inspect(obj).attrs
+    values = {}
+    for key in TRACKED:
+        history = attrs[key].history
+        if before:
+            current = history.deleted or history.unchanged
+        else:
+            current = history.added or history.unchanged
+        values[key] = current[0] if current else None
+    return values
+
+
+def _upsert(connection, model, row: dict, deltas: dict):
+    table = model.__table__
+    keys = [column.name for column in table.primary_key]
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(table).values({**row, **deltas})
+        statement = statement.on_conflict_do_update(
+            index_elements=keys, set_={name: table.c[name] + statement.excluded[name] for name in deltas}
+        )
+        connection.execute(statement)
+        return
+    where = [table.c[key] == row[key] for key in keys]
+    increments = {name: table.c[name] + delta for name, delta in deltas.items()}
+    result = connection.execute(table.update().where(*where).values(increments))
+    if result.rowcount == 0:
+        connection.execute(table.insert().values({**row, **deltas}))
+
+
+# Load the previous value when these are assigned on an expired instance, so
+# the flush hook always knows what a transaction counted towards before.
+for _key in TRACKED:
+    event.listen(getattr(Transaction, _key), "set", lambda target, value, oldvalue, initiator: value,
+                 active_history=True, retval=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_transaction_deltas(session, flush_context):
+    pending = {}
+
+    def collect(values, sign):
+        for model, row, deltas in _contributions(values, sign):
+            key = (model, tuple(sorted(row.items())))
+            pending.setdefault(key, (row, Counter()))[1].update(deltas)
+
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            collect(_state_values(obj, before=False), 1)
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            collect(_state_values(obj, before=True), -1)
+    for obj in session.dirty:
+        if isinstance(obj, Transaction) and obj not in session.deleted:
+            before, after = _state_values(obj, before=True), _state_values(obj, before=False)
+            if before != after:
+                collect(before, -1)
+                collect(after, 1)
+    if not pending:
+        return
+    connection = session.connection()
+    for (model, _), (row, deltas) in pending.items():
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if deltas:
+            _upsert(connection, model, row, deltas)
+
+
+def rebuild_summaries() -> int:
+    """Recompute every summary row from ``pr_transaction``; returns the number of rows written."""
+    completed = Transaction.status == "completed"
+    written = 0
+    for model in (ListingSales, SellerSummary, BuyerSummary):
+        db.session.execute(model.__table__.delete())
+    for model, party in PARTIES:
+        party_column = getattr(Transaction, party)
+        columns = {
+            party: party_column,
+            "completed_amount": func.coalesce(func.sum(case((completed, Transaction.agreed_price), else_=0)), 0),
+            "completed_fees": func.coalesce(func.sum(case((completed, Transaction.serv_fee), else_=0)), 0),
+        }
+        for status in Transaction.STATUSES:
+            columns[f"count_{status}"] = func.sum(case((Transaction.status == status, 1), else_=0))
+        query = select(*columns.values()).where(party_column.isnot(None)).group_by(party_column)
+        written += db.session.execute(model.__table__.insert().from_select(list(columns), query)).rowcount
+    query = (
+        select(
+            Transaction.listing_id,
+            func.max(Transaction.seller_id),
+            func.count(Transaction.transaction_id),
+            func.coalesce(func.sum(Transaction.agreed_price), 0),
+        )
+        .where(completed, Transaction.listing_id.isnot(None))
+        .group_by(Transaction.listing_id)
+    )
+    written += db.session.execute(
+        ListingSales.__table__.insert().from_select(["listing_id", "seller_id", "sale_count", "total_amount"], query)
+    ).rowcount
+    db.session.commit()
+    return written
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 
+from datetime import datetime
 from COMSW4111.data_models import db
+from sqlalchemy import or_
 from sqlalchemy.types import DECIMAL
 
 class Transaction(db.Model):
@@ -9,7 +11,33 @@ class Transaction(db.Model):
     buyer_id = db.Column(db.String(50), db.ForeignKey('pr_buyer.buyer_id'))
     seller_id = db.Column(db.String(50), db.ForeignKey('pr_seller.seller_id'))
     listing_id = db.Column(db.String(50), db.ForeignKey('pr_listing.listing_id'))
-    t_date = db.Column(db.Date)
+    t_date = db.Column(db.Date, nullable=False, server_default=db.func.current_date())
     agreed_price = db.Column(DECIMAL(10, 2), nullable=False)
     serv_fee = db.Column(DECIMAL(10, 2))
-    status = db.Column(db.String(20), db.CheckConstraint("status IN ('pending', 'processing', 'cancelled', 'refunded', 'confirming', 'confirmed', 'completed')"), nullable=False)
\ No newline at end of file
+    status = db.Column(db.String(20), db.CheckConstraint("status IN ('pending', 'processing', 'cancelled', 'refunded', 'confirming', 'confirmed', 'completed')"), nullable=False)
+    # Client-supplied checkout key; a retry with the same key returns this transaction
+    idempotency_key = db.Column(db.String(64))
+    # Bumped on every ORM update; the ETag/Last-Modified source for the API
+    t_last_edit = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    __table_args__ = (
+        db.Index('ix_pr_transaction_buyer_date', 'buyer_id', 't_date', 'transaction_id'),
+        db.Index('ix_pr_transaction_seller_date', 'seller_id', 't_date', 'transaction_id'),
+        db.Index('ix_pr_transaction_buyer_status', 'buyer_id', 'status'),
+        db.Index('ix_pr_transaction_seller_status', 'seller_id', 'status'),
+        db.Index('ix_pr_transaction_listing_buyer', 'listing_id', 'buyer_id'),
+        db.Index('ux_pr_transaction_buyer_idempotency', 'buyer_id', 'idempotency_key', unique=True),
+    )
+
+    ROLES = ('buyer', 'seller', 'all')
+    STATUSES = ('pending', 'processing', 'cancelled', 'refunded', 'confirming', 'confirmed', 'completed')
+
+    @classmethod
+    def visible_to(cls, user_id, role='all'):
+        """Filter clause for transactions where ``user_id`` is the buyer, the seller or either."""
+        if role == 'buyer':
+            return cls.buyer_id == user_id
+        if role == 'seller':
+            return cls.seller_id == user_id
+        if role == 'all':
+            return or_(cls.buyer_id == user_id, cls.seller_id == user_id)
+        raise ValueError(f"Invalid role '{role}'")
@@ -0,0 +1,26 @@
+"""last edit time on pr_transaction for conditional GETs
+
+Revision ID: 2b7d4c8e1f63
+Revises: 5d8b3f0e6a27
+Create Date: 2026-10-18 18:12:40.506271
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b7d4c8e1f63'
+down_revision = '5d8b3f0e6a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('pr_transaction', sa.Column('t_last_edit', sa.DateTime(), nullable=True))
+    # Existing transactions count as last edited when they were placed
+    op.execute("UPDATE pr_transaction SET t_last_edit = t_date")
+
+
+def downgrade():
+    op.drop_column('pr_transaction', 't_last_edit')
@@ -0,0 +1,73 @@
+"""seller/buyer dashboard summary tables
+
+Revision ID: 3f9a6c1d2b7e
+Revises: b4db21e4f319
+Create Date: 2026-10-18 14:03:52.618204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a6c1d2b7e'
+down_revision = 'b4db21e4f319'
+branch_labels = None
+depends_on = None
+
+# keep in sync with Transaction.STATUSES
+STATUSES = ('pending', 'processing', 'cancelled', 'refunded', 'confirming', 'confirmed', 'completed')
+
+
+def _party_columns():
+    return [
+        sa.Column('completed_amount', sa.DECIMAL(12, 2), nullable=False, server_default='0'),
+        sa.Column('completed_fees', sa.DECIMAL(12, 2), nullable=False, server_default='0'),
+    ] + [sa.Column(f'count_{status}', sa.Integer(), nullable=False, server_default='0') for status in STATUSES]
+
+
+def _backfill_party(table, party):
+    counts = ', '.join(f"SUM(CASE WHEN status = '{status}' THEN 1 ELSE 0 END)" for status in STATUSES)
+    op.execute(
+        f"INSERT INTO {table} ({party}, completed_amount, completed_fees, "
+        f"{', '.join(f'count_{status}' for status in STATUSES)}) "
+        f"SELECT {party}, "
+        f"COALESCE(SUM(CASE WHEN status = 'completed' THEN agreed_price ELSE 0 END), 0), "
+        f"COALESCE(SUM(CASE WHEN status = 'completed' THEN serv_fee ELSE 0 END), 0), {counts} "
+        f"FROM pr_transaction WHERE {party} IS NOT NULL GROUP BY {party}"
+    )
+
+
+def upgrade():
+    op.create_table(
+        'pr_seller_summary',
+        sa.Column('seller_id', sa.String(50), sa.ForeignKey('pr_seller.seller_id'), primary_key=True),
+        *_party_columns()
+    )
+    op.create_table(
+        'pr_buyer_summary',
+        sa.Column('buyer_id', sa.String(50), sa.ForeignKey('pr_buyer.buyer_id'), primary_key=True),
+        *_party_columns()
+    )
+    op.create_table(
+        'pr_listing_sales',
+        sa.Column('listing_id', sa.String(50), sa.ForeignKey('pr_listing.listing_id'), primary_key=True),
+        sa.Column('seller_id', sa.String(50), sa.ForeignKey('pr_seller.seller_id')),
+        sa.Column('sale_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_amount', sa.DECIMAL(12, 2), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_pr_listing_sales_seller', 'pr_listing_sales', ['seller_id', 'sale_count'])
+    _backfill_party('pr_seller_summary', 'seller_id')
+    _backfill_party('pr_buyer_summary', 'buyer_id')
+    op.execute(
+        "INSERT INTO pr_listing_sales (listing_id, seller_id, sale_count, total_amount) "
+        "SELECT listing_id, MAX(seller_id), COUNT(transaction_id), COALESCE(SUM(agreed_price), 0) "
+        "FROM pr_transaction WHERE status = 'completed' AND listing_id IS NOT NULL GROUP BY listing_id"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_pr_listing_sales_seller', table_name='pr_listing_sales')
+    op.drop_table('pr_listing_sales')
+    op.drop_table('pr_buyer_summary')
+    op.drop_table('pr_seller_summary')
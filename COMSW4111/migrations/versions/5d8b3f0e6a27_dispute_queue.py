@@ -0,0 +1,36 @@
+"""dispute filing time and partial index for the admin work queue
+
+Revision ID: 5d8b3f0e6a27
+Revises: 7c2e5a9d4f10
+Create Date: 2026-10-18 17:02:45.118362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8b3f0e6a27'
+down_revision = '7c2e5a9d4f10'
+branch_labels = None
+depends_on = None
+
+UNSOLVED = sa.text("status = 'unsolved'")
+
+
+def upgrade():
+    op.add_column('pr_dispute', sa.Column('t_filed', sa.DateTime(), nullable=True))
+    # Disputes filed before this column existed are dated by their transaction
+    op.execute(
+        "UPDATE pr_dispute SET t_filed = (SELECT t_date FROM pr_transaction "
+        "WHERE pr_transaction.transaction_id = pr_dispute.transaction_id)"
+    )
+    op.create_index(
+        'ix_pr_dispute_unsolved_filed', 'pr_dispute', ['t_filed', 'dispute_id'],
+        postgresql_where=UNSOLVED, sqlite_where=UNSOLVED
+    )
+
+
+def downgrade():
+    op.drop_index('ix_pr_dispute_unsolved_filed', table_name='pr_dispute')
+    op.drop_column('pr_dispute', 't_filed')
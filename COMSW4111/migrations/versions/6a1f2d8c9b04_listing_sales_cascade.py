@@ -0,0 +1,34 @@
+"""pr_listing_sales rows go with their listing
+
+Revision ID: 6a1f2d8c9b04
+Revises: 9e4a1c7b3d52
+Create Date: 2026-10-19 10:21:37.402913
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '6a1f2d8c9b04'
+down_revision = '9e4a1c7b3d52'
+branch_labels = None
+depends_on = None
+
+# Postgres' name for the unnamed constraint created by 3f9a6c1d2b7e; SQLite
+# constraints have no name, so batch mode gives them one from this convention
+FOREIGN_KEY = 'pr_listing_sales_listing_id_fkey'
+NAMING = {'fk': '%(table_name)s_%(column_0_name)s_fkey'}
+
+
+def _replace_foreign_key(ondelete):
+    with op.batch_alter_table('pr_listing_sales', naming_convention=NAMING) as batch_op:
+        batch_op.drop_constraint(FOREIGN_KEY, type_='foreignkey')
+        batch_op.create_foreign_key(FOREIGN_KEY, 'pr_listing', ['listing_id'], ['listing_id'], ondelete=ondelete)
+
+
+def upgrade():
+    _replace_foreign_key('CASCADE')
+
+
+def downgrade():
+    _replace_foreign_key(None)
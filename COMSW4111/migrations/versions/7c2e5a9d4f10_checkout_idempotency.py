@@ -0,0 +1,29 @@
+"""checkout idempotency key on pr_transaction
+
+Revision ID: 7c2e5a9d4f10
+Revises: 3f9a6c1d2b7e
+Create Date: 2026-10-18 16:21:07.334918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2e5a9d4f10'
+down_revision = '3f9a6c1d2b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('pr_transaction', sa.Column('idempotency_key', sa.String(64), nullable=True))
+    # NULL keys never collide, so transactions created without a key are unaffected
+    op.create_index(
+        'ux_pr_transaction_buyer_idempotency', 'pr_transaction', ['buyer_id', 'idempotency_key'], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index('ux_pr_transaction_buyer_idempotency', table_name='pr_transaction')
+    op.drop_column('pr_transaction', 'idempotency_key')
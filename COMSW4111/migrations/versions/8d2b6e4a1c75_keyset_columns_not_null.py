@@ -0,0 +1,46 @@
+"""sort keys of the paginated lists are required
+
+Revision ID: 8d2b6e4a1c75
+Revises: 6a1f2d8c9b04
+Create Date: 2026-10-19 11:05:48.290117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2b6e4a1c75'
+down_revision = '6a1f2d8c9b04'
+branch_labels = None
+depends_on = None
+
+# SQLite rebuilds the tables and would drop their unnamed CHECK constraints
+TRANSACTION_CHECKS = (sa.CheckConstraint(
+    "status IN ('pending', 'processing', 'cancelled', 'refunded', 'confirming', 'confirmed', 'completed')"
+),)
+LISTING_CHECKS = (sa.CheckConstraint("status IN ('active', 'pending', 'closed', 'completed')"),)
+
+
+def upgrade():
+    # A NULL sort key compares as unknown, so the keyset pages of
+    # transactions and listings stopped at the first such row
+    op.execute(
+        "UPDATE pr_transaction SET t_date = COALESCE(DATE(t_last_edit), CURRENT_DATE) WHERE t_date IS NULL"
+    )
+    op.execute("UPDATE pr_listing SET t_created = COALESCE(t_last_edit, CURRENT_TIMESTAMP) WHERE t_created IS NULL")
+    with op.batch_alter_table('pr_transaction', table_args=TRANSACTION_CHECKS) as batch_op:
+        batch_op.alter_column(
+            't_date', existing_type=sa.Date(), nullable=False, server_default=sa.func.current_date()
+        )
+    with op.batch_alter_table('pr_listing', table_args=LISTING_CHECKS) as batch_op:
+        batch_op.alter_column(
+            't_created', existing_type=sa.DateTime(), nullable=False, server_default=sa.func.now()
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('pr_listing', table_args=LISTING_CHECKS) as batch_op:
+        batch_op.alter_column('t_created', existing_type=sa.DateTime(), nullable=True, server_default=None)
+    with op.batch_alter_table('pr_transaction', table_args=TRANSACTION_CHECKS) as batch_op:
+        batch_op.alter_column('t_date', existing_type=sa.Date(), nullable=True, server_default=None)
@@ -0,0 +1,38 @@
+"""pr_dispute.t_filed is required, defaulting to the filing time
+
+Revision ID: 9e4a1c7b3d52
+Revises: 2b7d4c8e1f63
+Create Date: 2026-10-18 19:40:12.734519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4a1c7b3d52'
+down_revision = '2b7d4c8e1f63'
+branch_labels = None
+depends_on = None
+
+# SQLite rebuilds the table and would drop its unnamed CHECK constraint
+DISPUTE_CHECKS = (sa.CheckConstraint("status IN ('solved', 'unsolved')"),)
+
+
+def upgrade():
+    # A NULL t_filed breaks the admin queue's (t_filed, dispute_id) keyset;
+    # disputes without a transaction date are dated by the migration
+    op.execute(
+        "UPDATE pr_dispute SET t_filed = COALESCE((SELECT t_date FROM pr_transaction "
+        "WHERE pr_transaction.transaction_id = pr_dispute.transaction_id), CURRENT_TIMESTAMP) "
+        "WHERE t_filed IS NULL"
+    )
+    with op.batch_alter_table('pr_dispute', table_args=DISPUTE_CHECKS) as batch_op:
+        batch_op.alter_column(
+            't_filed', existing_type=sa.DateTime(), nullable=False, server_default=sa.func.now()
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('pr_dispute', table_args=DISPUTE_CHECKS) as batch_op:
+        batch_op.alter_column('t_filed', existing_type=sa.DateTime(), nullable=True, server_default=None)
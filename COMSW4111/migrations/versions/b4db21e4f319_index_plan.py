@@ -0,0 +1,82 @@
+"""index plan for hot foreign keys and status columns
+
+Revision ID: b4db21e4f319
+Revises:
+Create Date: 2026-10-18 10:12:41.204517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4db21e4f319'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, method) -- each matches a query shape in server/*/routes.py
+INDEXES = [
+    # transactions list / dashboards: WHERE buyer_id|seller_id = ? ORDER BY t_date, transaction_id
+    ('ix_pr_transaction_buyer_date', 'pr_transaction', 'buyer_id, t_date, transaction_id', 'btree'),
+    ('ix_pr_transaction_seller_date', 'pr_transaction', 'seller_id, t_date, transaction_id', 'btree'),
+    # dashboard summaries: WHERE buyer_id|seller_id = ? AND status = 'completed'
+    ('ix_pr_transaction_buyer_status', 'pr_transaction', 'buyer_id, status', 'btree'),
+    ('ix_pr_transaction_seller_status', 'pr_transaction', 'seller_id, status', 'btree'),
+    # checkout duplicate check: WHERE listing_id = ? AND buyer_id = ?
+    ('ix_pr_transaction_listing_buyer', 'pr_transaction', 'listing_id, buyer_id', 'btree'),
+    # search without text: ORDER BY t_created, listing_id
+    ('ix_pr_listing_created', 'pr_listing', 't_created, listing_id', 'btree'),
+    # seller listings: WHERE seller_id = ? [AND status = ?]
+    ('ix_pr_listing_seller_status', 'pr_listing', 'seller_id, status', 'btree'),
+    # search price range
+    ('ix_pr_listing_price', 'pr_listing', 'price', 'btree'),
+    # disputes for a transaction / by status
+    ('ix_pr_dispute_transaction', 'pr_dispute', 'transaction_id', 'btree'),
+    ('ix_pr_dispute_status', 'pr_dispute', 'status, dispute_id', 'btree'),
+    # payment accounts of a user
+    ('ix_pr_account_user', 'pr_account', 'user_id', 'btree'),
+    # full-text listing search
+    ('ix_pr_listing_search_vector', 'pr_listing', 'search_vector', 'gin'),
+]
+
+
+def _is_postgres():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade():
+    if _is_postgres():
+        op.execute("ALTER TABLE pr_listing ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        op.execute(
+            "UPDATE pr_listing SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(meta_tag, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'C') "
+            "WHERE search_vector IS NULL"
+        )
+        # CONCURRENTLY cannot run inside the migration transaction, but avoids
+        # locking writes on large tables while the index builds.
+        with op.get_context().autocommit_block():
+            for name, table, columns, method in INDEXES:
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING {method} ({columns})")
+    else:
+        existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('pr_listing')}
+        if 'search_vector' not in existing:
+            op.add_column('pr_listing', sa.Column('search_vector', sa.Text(), nullable=True))
+        for name, table, columns, method in INDEXES:
+            op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def downgrade():
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            for name, table, columns, method in reversed(INDEXES):
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        op.execute("ALTER TABLE pr_listing DROP COLUMN IF EXISTS search_vector")
+    else:
+        for name, table, columns, method in reversed(INDEXES):
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+        existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('pr_listing')}
+        if 'search_vector' in existing:
+            op.drop_column('pr_listing', 'search_vector')
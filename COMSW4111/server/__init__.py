@@ -3,12 +3,18 @@
 import sys
 import os
 from pathlib import Path
-from flask import Flask, Blueprint, request
+from importlib import import_module
+from flask import Flask, Blueprint, request, g
+from werkzeug.middleware.proxy_fix import ProxyFix
 from COMSW4111.data_models import db
 from flask_migrate import Migrate
 from COMSW4111.data_models import PRUser
 from flask_login import LoginManager, current_user
-from COMSW4111.config import Config
+from COMSW4111.config import get_config
+from COMSW4111.server import user_cache, replica, lazy
+from COMSW4111.data_models import schema
+from COMSW4111.server.auth import tokens
+from COMSW4111.server.serialization import make_provider
 
 file = Path(__file__).resolve()
 package_root_directory = file.parents[1]
@@ -19,22 +25,25 @@ login_manager.login_view = 'auth.login'
 
 @login_manager.request_loader
 def load_user_from_request(request):
-    auth_str = request.headers.get('Authorization')
-    token = auth_str.split(' ')[1] if auth_str else ''
-    if token:
-        user_id = PRUser.decode_token(token)
-        user = PRUser.query.get(user_id)
-        if user:
-            return user
+    user_id = tokens.user_id_from_header(request.headers.get('Authorization'))
+    if user_id:
+        # Token clients are stateless; don't hand them a session cookie
+        g.login_via_token = True
+        return user_cache.load_user(user_id)
     return None
 
 @login_manager.user_loader
 def load_user(id):
-    return PRUser.query.get(id)
+    return user_cache.load_user(id)
 
-def create_app(config_class=Config):
+def create_app(config_class=None, check_schema=True):
     app = Flask(__name__, template_folder="templates")
-    app.config.from_object(config_class)
+    app.config.from_object(config_class or get_config())
+    hops = app.config.get('PROXY_FIX_HOPS', 0)
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+    app.json = make_provider(app)
+    app.session_interface = tokens.TokenAwareSessionInterface()
     db.init_app(app)
     app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'static', 'listing_images')
     from COMSW4111.server.main import bp as main_bp
@@ -51,13 +60,18 @@ def create_app(config_class=Config):
     app.register_blueprint(listing_bp)
     from COMSW4111.server.transactions import bp as transactions_bp
     app.register_blueprint(transactions_bp)
-    from COMSW4111.server.dispute import bp as dispute_bp
-    app.register_blueprint(dispute_bp)
-    from COMSW4111.server.admin import bp as admin_bp
-    app.register_blueprint(admin_bp)
-    migrate.init_app(app, db)
+    # Rarely used blueprints: routes are added now, their modules imported on first request
+    lazy_blueprints = app.config.get('LAZY_BLUEPRINTS', ())
+    for name in ('dispute', 'admin'):
+        if name in lazy_blueprints:
+            lazy.register_lazy_blueprint(app, f'COMSW4111.server.{name}', name)
+        else:
+            app.register_blueprint(import_module(f'COMSW4111.server.{name}').bp)
+    migrate.init_app(app, db, directory=str(schema.MIGRATIONS_DIR))
     login_manager.init_app(app)
-    with app.app_context():
-        db.create_all()
+    replica.init_app(app)
+    # No DDL at startup: tables come from 'database bootstrap' or migrations
+    if check_schema:
+        schema.check_schema(app)
     return app
 
@@ -2,14 +2,46 @@
 
 import uuid
 from datetime import datetime
-from sqlalchemy import func, desc
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
+from COMSW4111.server import images
 from COMSW4111.server.account import bp
+from COMSW4111.server.replica import read_replica
 from sqlalchemy.exc import SQLAlchemyError
 from flask_login import login_required, current_user
-from COMSW4111.server.app import check_account_status
+from COMSW4111.server.app import check_account_status, busy_response
+from COMSW4111.data_models.password_pool import PasswordHashingBusy
+from COMSW4111.server.pagination import paginate, jsonify_page, InvalidCursor
+from COMSW4111.server.serialization import Schema
 from flask import jsonify, request, current_app, session, render_template
 from COMSW4111.data_models import (
-    db, PRUser, Account, BankAccount, CreditCard, Buyer, Seller, Transaction, Listing
+    db, PRUser, Account, BankAccount, CreditCard, Buyer, Seller, Transaction, Listing,
+    SellerSummary, BuyerSummary, ListingSales
+)
+
+TRANSACTION_FIELDS = dict(
+    transaction_id=Transaction.transaction_id,
+    date=Transaction.t_date,
+    listing_id=Transaction.listing_id,
+    listing_title=Listing.title,
+    listing_image=(Listing.list_image, lambda value: images.image_variant(value, 'thumb')),
+    price=Transaction.agreed_price,
+    service_fee=func.coalesce(Transaction.serv_fee, 0),
+    status=Transaction.status
+)
+SELLER_TRANSACTION = Schema(
+    **TRANSACTION_FIELDS,
+    net_amount=Transaction.agreed_price - func.coalesce(Transaction.serv_fee, 0)
+)
+BUYER_TRANSACTION = Schema(
+    **TRANSACTION_FIELDS,
+    total_amount=Transaction.agreed_price + func.coalesce(Transaction.serv_fee, 0)
+)
+SALES_BY_LISTING = Schema(
+    listing_id=ListingSales.listing_id,
+    listing_title=Listing.title,
+    total_sales=ListingSales.sale_count,
+    total_amount=ListingSales.total_amount
 )
 
 @bp.route('/api/account/profile', methods=['GET'])
@@ -17,7 +49,7 @@ from COMSW4111.data_models import (
 @check_account_status
 def get_profile():
     try:
-        user = PRUser.query.get(current_user.user_id)
+        user = db.session.get(PRUser, current_user.user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
         accounts_data = get_user_accounts(user.user_id)
@@ -49,7 +81,7 @@ def get_profile():
 def update_profile():
     try:
         data = request.get_json()
-        user = PRUser.query.get(current_user.user_id)
+        user = db.session.get(PRUser, current_user.user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
         if 'first_name' in data:
@@ -174,7 +206,7 @@ def delete_payment_method(account_id):
 @check_account_status
 def get_seller_status():
     try:
-        seller = Seller.query.filter_by(seller_id=current_user.user_id).first()
+        seller = db.session.get(Seller, current_user.user_id)
         if not seller:
             return jsonify({'error': 'Not a seller'}), 404
         stats = {
@@ -194,7 +226,7 @@ def get_seller_status():
 @check_account_status
 def get_buyer_status():
     try:
-        buyer = Buyer.query.filter_by(buyer_id=current_user.user_id).first()
+        buyer = db.session.get(Buyer, current_user.user_id)
         if not buyer:
             return jsonify({'error': 'Not a buyer'}), 404
         stats = {
@@ -214,13 +246,16 @@ def get_buyer_status():
 def change_password():
     try:
         data = request.get_json()
-        user = PRUser.query.get(current_user.user_id)
+        user = db.session.get(PRUser, current_user.user_id)
         if not user.check_password(data['current_password']):
             return jsonify({'error': 'Current password is incorrect'}), 400
         user.set_password(data['new_password'])
         user.t_last_act = datetime.utcnow()
         db.session.commit()
         return jsonify({'message': 'Password updated successfully'}), 200
+    except PasswordHashingBusy as e:
+        db.session.rollback()
+        return busy_response(e.retry_after)
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error changing password: {str(e)}")
@@ -231,13 +266,16 @@ def change_password():
 def delete_account():
     try:
         data = request.get_json()
-        user = PRUser.query.get(current_user.user_id)
+        user = db.session.get(PRUser, current_user.user_id)
         if not user.check_password(data['password']):
             return jsonify({'error': 'Password is incorrect'}), 400
         user.acc_status = 'inactive'
         user.t_last_act = datetime.utcnow()
         db.session.commit()
         return jsonify({'message': 'Account deactivated successfully'}), 200
+    except PasswordHashingBusy as e:
+        db.session.rollback()
+        return busy_response(e.retry_after)
     except Exception as e:
         print(e)
         db.session.rollback()
@@ -291,6 +329,7 @@ def get_user_accounts(user_id):
     return accounts_data
 
 @bp.route('/api/account/seller_list', methods=['GET'])
+@read_replica
 @login_required
 def get_seller_list():
     try:
@@ -298,81 +337,44 @@ def get_seller_list():
         if not seller:
             print("User is not a seller")
             return jsonify({"error": "User is not a seller"}), 403
-        transactions = db.session.query(
-            Transaction,
-            Listing.title.label('listing_title'),
-            Listing.list_image.label('listing_image')
-        ).join(
+        transactions = SELLER_TRANSACTION.query().select_from(Transaction).join(
             Listing, Transaction.listing_id == Listing.listing_id
         ).filter(
             Transaction.seller_id == seller.seller_id
-        ).order_by(
-            desc(Transaction.t_date)
-        ).all()
-        stats = db.session.query(
-            func.count(Transaction.transaction_id).label('total_transactions'),
-            func.sum(Transaction.agreed_price).label('total_sales'),
-            func.sum(Transaction.serv_fee).label('total_fees')
-        ).filter(
-            Transaction.seller_id == seller.seller_id,
-            Transaction.status == 'completed'
-        ).first()
-        sales_by_listing = db.session.query(
-            Listing.listing_id,
-            Listing.title,
-            func.count(Transaction.transaction_id).label('sale_count'),
-            func.sum(Transaction.agreed_price).label('total_amount')
-        ).join(
-            Transaction, Listing.listing_id == Transaction.listing_id
+        )
+        transactions, next_cursor = paginate(
+            transactions,
+            (Transaction.t_date, Transaction.transaction_id),
+            key=lambda row: (row.date, row.transaction_id)
+        )
+        stats = SellerSummary.for_party(seller.seller_id)
+        sales_by_listing = SALES_BY_LISTING.query().select_from(ListingSales).join(
+            Listing, ListingSales.listing_id == Listing.listing_id
         ).filter(
-            Transaction.seller_id == seller.seller_id,
-            Transaction.status == 'completed'
-        ).group_by(
-            Listing.listing_id,
-            Listing.title
+            ListingSales.seller_id == seller.seller_id,
+            ListingSales.sale_count > 0
         ).all()
         transaction_data = {
             "summary": {
-                "total_transactions": stats.total_transactions or 0,
-                "total_sales": float(stats.total_sales or 0),
-                "total_fees": float(stats.total_fees or 0),
-                "net_earnings": float((stats.total_sales or 0) - (stats.total_fees or 0))
+                "total_transactions": stats.count_completed,
+                "total_sales": float(stats.completed_amount),
+                "total_fees": float(stats.completed_fees),
+                "net_earnings": float(stats.completed_amount - stats.completed_fees)
             },
-            "transactions": [{
-                "transaction_id": transaction.Transaction.transaction_id,
-                "date": transaction.Transaction.t_date.strftime("%Y-%m-%d") if transaction.Transaction.t_date else None,
-                "listing_id": transaction.Transaction.listing_id,
-                "listing_title": transaction.listing_title,
-                "listing_image": transaction.listing_image,
-                "price": float(transaction.Transaction.agreed_price),
-                "service_fee": float(transaction.Transaction.serv_fee) if transaction.Transaction.serv_fee else 0,
-                "net_amount": float(transaction.Transaction.agreed_price) - float(
-                    transaction.Transaction.serv_fee or 0),
-                "status": transaction.Transaction.status
-            } for transaction in transactions],
-            "sales_by_listing": [{
-                "listing_id": item.listing_id,
-                "listing_title": item.title,
-                "total_sales": item.sale_count,
-                "total_amount": float(item.total_amount or 0)
-            } for item in sales_by_listing]
-        }
-        status_counts = {
-            'pending': 0,
-            'confirming': 0,
-            'confirmed': 0,
-            'completed': 0
+            "transactions": SELLER_TRANSACTION.dump_all(transactions),
+            "sales_by_listing": SALES_BY_LISTING.dump_all(sales_by_listing),
+            "status_summary": stats.status_summary()
         }
-        for transaction in transactions:
-            status_counts[transaction.Transaction.status] = status_counts.get(transaction.Transaction.status, 0) + 1
-        transaction_data['status_summary'] = status_counts
-        return jsonify(transaction_data)
+        return jsonify_page(transaction_data, next_cursor)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
     except Exception as e:
         print(e)
         current_app.logger.error(f"Error in get_seller_transactions: {str(e)}")
         return jsonify({"error": "Failed to fetch seller transactions"}), 500
 
 @bp.route('/api/account/buyer_list', methods=['GET'])
+@read_replica
 @login_required
 def get_buyer_transactions():
     try:
@@ -380,54 +382,29 @@ def get_buyer_transactions():
         if not buyer:
             print("User is not a buyer")
             return jsonify({"error": "User is not a buyer"}), 403
-        transactions = db.session.query(
-            Transaction,
-            Listing.title.label('listing_title'),
-            Listing.list_image.label('listing_image')
-        ).join(
+        transactions = BUYER_TRANSACTION.query().select_from(Transaction).join(
             Listing, Transaction.listing_id == Listing.listing_id
         ).filter(
             Transaction.buyer_id == buyer.buyer_id
-        ).order_by(
-            desc(Transaction.t_date)
-        ).all()
-        stats = db.session.query(
-            func.count(Transaction.transaction_id).label('total_transactions'),
-            func.sum(Transaction.agreed_price).label('total_spent'),
-            func.sum(Transaction.serv_fee).label('total_fees')
-        ).filter(
-            Transaction.buyer_id == buyer.buyer_id,
-            Transaction.status == 'completed'
-        ).first()
+        )
+        transactions, next_cursor = paginate(
+            transactions,
+            (Transaction.t_date, Transaction.transaction_id),
+            key=lambda row: (row.date, row.transaction_id)
+        )
+        stats = BuyerSummary.for_party(buyer.buyer_id)
         transaction_data = {
             "summary": {
-                "total_transactions": stats.total_transactions or 0,
-                "total_spent": float(stats.total_spent or 0),
-                "total_fees": float(stats.total_fees or 0)
+                "total_transactions": stats.count_completed,
+                "total_spent": float(stats.completed_amount),
+                "total_fees": float(stats.completed_fees)
             },
-            "transactions": [{
-                "transaction_id": transaction.Transaction.transaction_id,
-                "date": transaction.Transaction.t_date.strftime("%Y-%m-%d") if transaction.Transaction.t_date else None,
-                "listing_id": transaction.Transaction.listing_id,
-                "listing_title": transaction.listing_title,
-                "listing_image": transaction.listing_image,
-                "price": float(transaction.Transaction.agreed_price),
-                "service_fee": float(transaction.Transaction.serv_fee) if transaction.Transaction.serv_fee else 0,
-                "total_amount": float(transaction.Transaction.agreed_price) + float(
-                    transaction.Transaction.serv_fee or 0),
-                "status": transaction.Transaction.status
-            } for transaction in transactions]
+            "transactions": BUYER_TRANSACTION.dump_all(transactions),
+            "status_summary": stats.status_summary()
         }
-        status_counts = {
-            'pending': 0,
-            'confirming': 0,
-            'confirmed': 0,
-            'completed': 0
-        }
-        for transaction in transactions:
-            status_counts[transaction.Transaction.status] = status_counts.get(transaction.Transaction.status, 0) + 1
-        transaction_data['status_summary'] = status_counts
-        return jsonify(transaction_data)
+        return jsonify_page(transaction_data, next_cursor)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
     except Exception as e:
         print(e)
         current_app.logger.error(f"Error in get_buyer_transactions: {str(e)}")
@@ -480,13 +457,13 @@ def update_transaction_status():
                 'error': 'Invalid status value',
                 'valid_statuses': valid_statuses
             }), 400
-        transaction = Transaction.query.filter_by(transaction_id=data['transaction_id']).first()
+        transaction = db.session.get(Transaction, data['transaction_id'])
         if not transaction:
             return jsonify({'error': 'Transaction not found'}), 404
         transaction.status = new_status
         db.session.commit()
         if new_status != "pending":
-            listing = Listing.query.filter_by(listing_id=transaction.listing_id).first()
+            listing = db.session.get(Listing, transaction.listing_id)
             print(listing.seller_id)
             print(current_user.user_id)
             if listing.seller_id != current_user.user_id:
@@ -514,41 +491,65 @@ def update_transaction_status():
 @login_required
 def get_transaction_detail(transaction_id):
     try:
-        transaction = Transaction.query \
-            .join(Buyer, Transaction.buyer_id == Buyer.buyer_id) \
-            .join(Seller, Transaction.seller_id == Seller.seller_id) \
-            .filter(Transaction.transaction_id == transaction_id) \
-            .first()
+        BuyerUser, SellerUser = aliased(PRUser), aliased(PRUser)
+        BuyerAccount, SellerAccount = aliased(Account), aliased(Account)
+        transaction = db.session.query(
+            Transaction.transaction_id,
+            Transaction.t_date,
+            Transaction.agreed_price,
+            Transaction.serv_fee,
+            Transaction.status,
+            Transaction.listing_id,
+            Transaction.buyer_id,
+            Transaction.seller_id,
+            BuyerUser.first_name.label('buyer_first_name'),
+            BuyerUser.last_name.label('buyer_last_name'),
+            BuyerUser.email.label('buyer_email'),
+            SellerUser.first_name.label('seller_first_name'),
+            SellerUser.last_name.label('seller_last_name'),
+            SellerUser.email.label('seller_email'),
+            BuyerAccount.account_id.label('buyer_account_id'),
+            BuyerAccount.billing_address.label('buyer_billing_address'),
+            SellerAccount.account_id.label('seller_account_id'),
+            SellerAccount.billing_address.label('seller_billing_address')
+        ).join(
+            Buyer, Transaction.buyer_id == Buyer.buyer_id
+        ).join(
+            Seller, Transaction.seller_id == Seller.seller_id
+        ).join(
+            BuyerUser, Buyer.buyer_id == BuyerUser.user_id
+        ).join(
+            SellerUser, Seller.seller_id == SellerUser.user_id
+        ).outerjoin(
+            BuyerAccount, Buyer.account_id == BuyerAccount.account_id
+        ).outerjoin(
+            SellerAccount, Seller.account_id == SellerAccount.account_id
+        ).filter(
+            Transaction.transaction_id == transaction_id
+        ).first()
         if not transaction:
             return jsonify({'error': 'Transaction not found'}), 404
-        buyer_account = Account.query.filter_by(user_id=transaction.buyer_id).first()
-        seller_account = Account.query.filter_by(user_id=transaction.seller_id).first()
-        print(buyer_account.user_id)
-        print(seller_account.user_id)
-        print(transaction.agreed_price)
-        buyer_user = PRUser.query.get(buyer_account.user_id)
-        seller_user = PRUser.query.get(seller_account.user_id)
         transaction_data = {
             'transaction_id': transaction.transaction_id,
             'date': transaction.t_date.strftime('%Y-%m-%d'),
             'agreed_price': float(transaction.agreed_price),
-            'service_fee': float(transaction.serv_fee),
-            'total_amount': float(transaction.agreed_price) + float(transaction.serv_fee),
+            'service_fee': float(transaction.serv_fee or 0),
+            'total_amount': float(transaction.agreed_price) + float(transaction.serv_fee or 0),
             'status': transaction.status,
             'listing_id': transaction.listing_id,
-            'buyer_name': buyer_user.first_name + ' ' + buyer_user.last_name,
-            'buyer_email': buyer_user.email,
-            'seller_name': seller_user.first_name + ' ' + seller_user.last_name,
-            'seller_email': seller_user.email,
+            'buyer_name': transaction.buyer_first_name + ' ' + transaction.buyer_last_name,
+            'buyer_email': transaction.buyer_email,
+            'seller_name': transaction.seller_first_name + ' ' + transaction.seller_last_name,
+            'seller_email': transaction.seller_email,
             'buyer': {
                 'buyer_id': transaction.buyer_id,
-                'account_id': buyer_account.account_id,
-                'billing_address': buyer_account.billing_address
+                'account_id': transaction.buyer_account_id,
+                'billing_address': transaction.buyer_billing_address
             },
             'seller': {
                 'seller_id': transaction.seller_id,
-                'account_id': seller_account.account_id,
-                'billing_address': seller_account.billing_address
+                'account_id': transaction.seller_account_id,
+                'billing_address': transaction.seller_billing_address
             }
         }
         return jsonify(transaction_data), 200
@@ -3,11 +3,31 @@
 import uuid
 from datetime import datetime
 from COMSW4111.server.admin import bp
+from COMSW4111.server import dispute_queue
+from COMSW4111.server.app import busy_response
+from COMSW4111.server.auth import throttle
+from COMSW4111.data_models.password_pool import PasswordHashingBusy
+from COMSW4111.server.pagination import paginate, jsonify_page, InvalidCursor
+from COMSW4111.server.serialization import Schema
 from sqlalchemy.exc import SQLAlchemyError
 from flask_login import login_required, current_user
 from flask import jsonify, request, current_app, render_template
 from COMSW4111.data_models import db, PRUser, Admin, Dispute, Transaction, Buyer
 
+ADMIN_DISPUTE_FIELDS = dict(
+    dispute_id=Dispute.dispute_id,
+    transaction_id=Dispute.transaction_id,
+    status=Dispute.status,
+    description=Dispute.description,
+    amount=Transaction.agreed_price,
+    transaction_date=Transaction.t_date,
+    resolution_date=Dispute.resolution_date,
+    filed_by=PRUser.first_name + ' ' + PRUser.last_name,
+    transaction_status=Transaction.status
+)
+ADMIN_DISPUTE = Schema(**ADMIN_DISPUTE_FIELDS)
+QUEUE_DISPUTE = Schema(**ADMIN_DISPUTE_FIELDS, filed_at=Dispute.t_filed)
+
 @bp.route('/admin', methods=['GET'])
 def get_admin():
     return render_template("admin/admin.html")
@@ -26,34 +46,60 @@ def get_admin_disputes():
     try:
         if not current_user.admin:
             return jsonify({'error': 'Unauthorized access'}), 403
-        disputes = db.session.query(
-            Dispute,
-            Transaction,
-            PRUser.first_name.label('buyer_first_name'),
-            PRUser.last_name.label('buyer_last_name')
-        ).join(
+        disputes = ADMIN_DISPUTE.query().select_from(Dispute).join(
             Transaction, Dispute.transaction_id == Transaction.transaction_id
         ).join(
             Buyer, Transaction.buyer_id == Buyer.buyer_id
         ).join(
             PRUser, Buyer.buyer_id == PRUser.user_id
-        ).all()
-        disputes_data = [{
-            'dispute_id': dispute.Dispute.dispute_id,
-            'transaction_id': dispute.Dispute.transaction_id,
-            'status': dispute.Dispute.status,
-            'description': dispute.Dispute.description,
-            'amount': float(dispute.Transaction.agreed_price),
-            'transaction_date': dispute.Transaction.t_date.strftime('%Y-%m-%d'),
-            'resolution_date': dispute.Dispute.resolution_date.strftime('%Y-%m-%d') if dispute.Dispute.resolution_date else None,
-            'filed_by': f"{dispute.buyer_first_name} {dispute.buyer_last_name}",
-            'transaction_status': dispute.Transaction.status
-        } for dispute in disputes]
-        return jsonify({'disputes': disputes_data}), 200
+        )
+        disputes, next_cursor = paginate(
+            disputes,
+            (Transaction.t_date, Dispute.dispute_id),
+            key=lambda dispute: (dispute.transaction_date, dispute.dispute_id)
+        )
+        return jsonify_page({'disputes': ADMIN_DISPUTE.dump_all(disputes)}, next_cursor), 200
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching disputes: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@bp.route('/api/admin/disputes/queue', methods=['GET'])
+@login_required
+def get_dispute_queue():
+    """Dispute work queue, oldest first: ``?status=&filed_from=&filed_to=&min_amount=&max_amount=``.
+
+    Defaults to unsolved disputes, which the partial index
+    ``ix_pr_dispute_unsolved_filed`` serves in filing order, so a page
+    costs the same however much history has been resolved.
+    """
+    try:
+        if not current_user.admin:
+            return jsonify({'error': 'Unauthorized access'}), 403
+        disputes = QUEUE_DISPUTE.query().select_from(Dispute).join(
+            Transaction, Dispute.transaction_id == Transaction.transaction_id
+        ).join(
+            PRUser, Transaction.buyer_id == PRUser.user_id
+        ).filter(*dispute_queue.queue_filters(request.args))
+        disputes, next_cursor = paginate(
+            disputes,
+            dispute_queue.QUEUE_ORDER,
+            key=lambda dispute: (dispute.filed_at, dispute.dispute_id),
+            descending=False
+        )
+        return jsonify_page({
+            'disputes': QUEUE_DISPUTE.dump_all(disputes),
+            'counts': dispute_queue.status_counts()
+        }, next_cursor), 200
+    except dispute_queue.InvalidFilter as e:
+        return jsonify({'error': f'Invalid {e}'}), 400
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error fetching dispute queue: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @bp.route('/api/admin/disputes/<string:dispute_id>/status', methods=['PUT'])
 @login_required
 def update_dispute_status(dispute_id):
@@ -83,6 +129,13 @@ def update_dispute_status(dispute_id):
         current_app.logger.error(f"Error updating dispute status: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@bp.route('/api/admin/login-throttle', methods=['GET'])
+@login_required
+def get_login_throttle():
+    if not current_user.admin:
+        return jsonify({'error': 'Unauthorized access'}), 403
+    return jsonify(throttle.counters()), 200
+
 @bp.route('/api/admin/signup', methods=['POST'])
 def create_admin_account():
     form_data = request.get_json()
@@ -109,6 +162,8 @@ def create_admin_account():
             'user_id': user_id,
             'admin_role': "super"
         }), 201
+    except PasswordHashingBusy as e:
+        return busy_response(e.retry_after)
     except SQLAlchemyError as e:
         db.session.rollback()
         current_app.logger.error(f"Database error creating admin account: {str(e)}")
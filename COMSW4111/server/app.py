@@ -1,6 +1,6 @@
 # Custom decorator for checking account status
 from functools import wraps
-from flask_login import LoginManager, current_user
+from flask_login import current_user
 from sqlalchemy.exc import SQLAlchemyError
 from flask import current_app
 from flask import jsonify
@@ -30,3 +30,10 @@ def check_account_status(f):
         return f(*args, **kwargs)
 
     return decorated_function
+
+def busy_response(retry_after=1):
+    """503 telling the client to back off and retry, e.g. when password hashing is saturated."""
+    response = jsonify({'error': 'Server busy, please retry shortly'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(retry_after)
+    return response
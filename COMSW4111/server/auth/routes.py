@@ -4,7 +4,10 @@ import uuid
 from datetime import datetime
 from COMSW4111.server.auth import bp
 from COMSW4111.data_models import PRUser, db
-from flask import render_template, redirect, url_for, flash, request, session
+from COMSW4111.server.auth import tokens, throttle
+from COMSW4111.server.app import busy_response
+from COMSW4111.data_models.password_pool import PasswordHashingBusy
+from flask import render_template, redirect, url_for, flash, request, session, jsonify
 from flask_login import login_user, logout_user, login_required, current_user
 
 @bp.route('/login', methods=['GET', 'POST'])
@@ -15,8 +18,17 @@ def login():
 		email = request.form.get('email')
 		password = request.form.get('password')
 		remember = True if request.form.get('remember') else False
+		retry_after = throttle.check_login(request.remote_addr, email)
+		if retry_after:
+			flash('Too many login attempts, please try again later.', 'error')
+			return render_template('login.html'), 429, {'Retry-After': str(retry_after)}
 		user = PRUser.query.filter_by(email=email).first()
-		if user and user.check_password(password):
+		try:
+			password_ok = bool(user) and user.check_password(password)
+		except PasswordHashingBusy as e:
+			flash('The server is busy, please try again in a moment.', 'error')
+			return render_template('login.html'), 503, {'Retry-After': str(e.retry_after)}
+		if password_ok:
 			session.pop('id', None)
 			if user.acc_status == 'banned':
 				flash('This account has been banned.', 'error')
@@ -27,6 +39,8 @@ def login():
 			login_user(user, remember=remember)
 			session['id'] = user.user_id
 			user.t_last_act = datetime.utcnow()
+			# also persists a hash upgraded by check_password
+			db.session.commit()
 			return redirect(url_for('account.account'))
 		else:
 			flash('Invalid email or password', 'error')
@@ -53,7 +67,11 @@ def register():
 			phone_number=request.form.get('phone_number'),
 			acc_status='active'
 		)
-		new_user.set_password(request.form.get('password'))
+		try:
+			new_user.set_password(request.form.get('password'))
+		except PasswordHashingBusy as e:
+			flash('The server is busy, please try again in a moment.', 'error')
+			return render_template('signup.html'), 503, {'Retry-After': str(e.retry_after)}
 		try:
 			db.session.add(new_user)
 			db.session.commit()
@@ -72,3 +90,60 @@ def logout():
 	logout_user()
 	session.pop('id', None)
 	return redirect(url_for('auth.login'))
+
+
+def token_response(user_id, access, refresh):
+	access_token, expires_in = access
+	refresh_token, refresh_expires_in = refresh
+	return jsonify({
+		'user_id': user_id,
+		'token_type': 'Bearer',
+		'access_token': access_token,
+		'expires_in': expires_in,
+		'refresh_token': refresh_token,
+		'refresh_expires_in': refresh_expires_in
+	})
+
+@bp.route('/api/auth/token', methods=['POST'])
+def issue_token():
+	data = request.get_json(silent=True) or {}
+	retry_after = throttle.check_login(request.remote_addr, data.get('email'))
+	if retry_after:
+		return jsonify({'error': 'Too many login attempts'}), 429, {'Retry-After': str(retry_after)}
+	user = PRUser.query.filter_by(email=data.get('email')).first()
+	try:
+		password_ok = bool(user) and user.check_password(data.get('password') or '')
+	except PasswordHashingBusy as e:
+		return busy_response(e.retry_after)
+	if not password_ok:
+		return jsonify({'error': 'Invalid email or password'}), 401
+	if user.acc_status != 'active':
+		return jsonify({'error': f'Account is {user.acc_status}'}), 403
+	db.session.commit()
+	return token_response(
+		user.user_id,
+		tokens.issue_token(user.user_id, tokens.ACCESS),
+		tokens.issue_token(user.user_id, tokens.REFRESH)
+	), 200
+
+@bp.route('/api/auth/token/refresh', methods=['POST'])
+def refresh_token():
+	data = request.get_json(silent=True) or {}
+	try:
+		user_id, access, refresh = tokens.refresh_tokens(data.get('refresh_token') or '')
+	except tokens.InvalidToken as e:
+		return jsonify({'error': str(e)}), 401
+	return token_response(user_id, access, refresh), 200
+
+@bp.route('/api/auth/token/revoke', methods=['POST'])
+def revoke_token():
+	data = request.get_json(silent=True) or {}
+	token = data.get('token') or ''
+	kind = data.get('token_type_hint', tokens.ACCESS)
+	if kind not in (tokens.ACCESS, tokens.REFRESH):
+		return jsonify({'error': 'Invalid token_type_hint'}), 400
+	try:
+		tokens.revoke_token(token, kind)
+	except tokens.InvalidToken as e:
+		return jsonify({'error': str(e)}), 401
+	return jsonify({'message': 'Token revoked'}), 200
@@ -0,0 +1,116 @@
+import math
+import time
+import threading
+from collections import Counter, OrderedDict
+from flask import current_app
+
+_store = None
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+class LocalBucketStore:
+    """In-process token buckets, oldest idle keys evicted beyond ``max_keys``."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, period):
+        """Take one token from ``key``'s bucket; returns ``(allowed, retry_after_seconds)``."""
+        rate = capacity / period
+        now = time.monotonic()
+        with self._lock:
+            tokens, stamp = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - stamp) * rate)
+            if tokens >= 1:
+                allowed, retry_after = True, 0.0
+                tokens -= 1
+            else:
+                allowed, retry_after = False, (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class RedisBucketStore:
+    """Token buckets shared by every worker, updated atomically in Redis."""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local allowed = 0
+    local retry_after = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    else
+        retry_after = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate))
+    return {allowed, tostring(retry_after)}
+    """
+
+    def __init__(self, url):
+        import redis
+        client = redis.Redis.from_url(url)
+        self._take = client.register_script(self.SCRIPT)
+
+    def take(self, key, capacity, period):
+        args = [capacity, capacity / period, time.time()]
+        allowed, retry_after = self._take(keys=[f'pr_throttle:{key}'], args=args)
+        return bool(allowed), float(retry_after)
+
+
+def get_store():
+    global _store
+    if _store is None:
+        url = current_app.config.get('RATE_LIMIT_URL')
+        _store = RedisBucketStore(url) if url else LocalBucketStore()
+    return _store
+
+
+def _count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def counters():
+    """Snapshot of the throttle counters since process start, for monitoring."""
+    with _counters_lock:
+        return dict(_counters)
+
+
+def check_login(ip, email):
+    """Charge one login attempt to ``ip`` and to ``email``.
+
+    Both buckets are consulted before any password hashing happens. The
+    account bucket is keyed by the submitted email alone, whether or not
+    such an account exists, so guesses spread over many addresses are still
+    capped; it is sized above the per-IP bucket so that a single client
+    cannot exhaust it for the owner. Returns ``0`` when the attempt may proceed, otherwise
+    the number of seconds the client should wait.
+    """
+    store = get_store()
+    ip_capacity, ip_period = current_app.config.get('LOGIN_RATE_PER_IP', (20, 60))
+    allowed, retry_after = store.take(f'ip:{ip}', ip_capacity, ip_period)
+    if not allowed:
+        _count('rejected_ip')
+        return max(1, math.ceil(retry_after))
+    if email:
+        account_capacity, account_period = current_app.config.get('LOGIN_RATE_PER_ACCOUNT', (30, 300))
+        allowed, retry_after = store.take(f'account:{email.strip().lower()}', account_capacity, account_period)
+        if not allowed:
+            _count('rejected_account')
+            return max(1, math.ceil(retry_after))
+    _count('allowed')
+    return 0
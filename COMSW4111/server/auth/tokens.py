@@ -0,0 +1,126 @@
+import time
+import secrets
+from flask import current_app, g
+from flask.sessions import SecureCookieSessionInterface
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+from COMSW4111.server.cache import LocalCache, make_cache
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+_SALTS = {ACCESS: 'pr-access-token', REFRESH: 'pr-refresh-token'}
+
+_verified = None
+_revoked = None
+
+
+class InvalidToken(Exception):
+    """Raised when a bearer token is malformed, expired, revoked or of the wrong kind."""
+
+
+def _ttl(kind):
+    if kind == ACCESS:
+        return current_app.config.get('ACCESS_TOKEN_TTL', 900)
+    return current_app.config.get('REFRESH_TOKEN_TTL', 14 * 24 * 3600)
+
+
+def _serializer(kind):
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=_SALTS[kind])
+
+
+def _verified_cache():
+    global _verified
+    if _verified is None:
+        _verified = LocalCache(current_app.config.get('TOKEN_CACHE_SIZE', 10000))
+    return _verified
+
+
+def _revocations():
+    global _revoked
+    if _revoked is None:
+        _revoked = make_cache(
+            current_app.config.get('USER_CACHE_URL'),
+            current_app.config.get('TOKEN_REVOCATION_SIZE', 100000),
+            prefix='pr_token_revoked:'
+        )
+    return _revoked
+
+
+def issue_token(user_id, kind=ACCESS):
+    """Sign a new ``kind`` token for ``user_id``; returns ``(token, expires_in)``."""
+    payload = {'uid': user_id, 'jti': secrets.token_urlsafe(12)}
+    return _serializer(kind).dumps(payload), _ttl(kind)
+
+
+def _decode(token, kind):
+    """Check the signature and age of ``token``; returns ``(payload, expires_at)``."""
+    max_age = _ttl(kind)
+    try:
+        payload, issued = _serializer(kind).loads(token, max_age=max_age, return_timestamp=True)
+    except SignatureExpired as e:
+        raise InvalidToken('Token expired') from e
+    except BadSignature as e:
+        raise InvalidToken('Invalid token') from e
+    if not isinstance(payload, dict) or 'uid' not in payload or 'jti' not in payload:
+        raise InvalidToken('Invalid token')
+    return payload, issued.timestamp() + max_age
+
+
+def verify_token(token, kind=ACCESS):
+    """Return the user id carried by ``token`` without touching the database.
+
+    Access tokens that verified recently are served from an in-process LRU
+    so repeat requests skip the HMAC check; the revocation list is still
+    consulted every time.
+    """
+    now = time.time()
+    cache = _verified_cache()
+    key = f'{kind}:{token}'
+    entry = cache.get(key)
+    if entry is None:
+        payload, expires_at = _decode(token, kind)
+        entry = (payload['uid'], payload['jti'], expires_at)
+        cache.set(key, entry, expires_at - now)
+    user_id, jti, expires_at = entry
+    if expires_at <= now:
+        cache.delete(key)
+        raise InvalidToken('Token expired')
+    if _revocations().get(jti):
+        raise InvalidToken('Token revoked')
+    return user_id
+
+
+def revoke_token(token, kind=ACCESS):
+    """Revoke ``token`` until it would have expired anyway. Returns its user id."""
+    payload, expires_at = _decode(token, kind)
+    _revocations().set(payload['jti'], True, max(1, expires_at - time.time()))
+    _verified_cache().delete(f'{kind}:{token}')
+    return payload['uid']
+
+
+def refresh_tokens(refresh_token):
+    """Exchange a refresh token for a new access/refresh pair, revoking the old one."""
+    user_id = verify_token(refresh_token, REFRESH)
+    revoke_token(refresh_token, REFRESH)
+    return user_id, issue_token(user_id, ACCESS), issue_token(user_id, REFRESH)
+
+
+def user_id_from_header(auth_header):
+    """User id from an ``Authorization: Bearer <token>`` header, or ``None``."""
+    if not auth_header:
+        return None
+    scheme, _, token = auth_header.partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    try:
+        return verify_token(token.strip())
+    except InvalidToken:
+        return None
+
+
+class TokenAwareSessionInterface(SecureCookieSessionInterface):
+    """Cookie sessions that are never written back for bearer-token requests."""
+
+    def save_session(self, app, session, response):
+        if g.get('login_via_token'):
+            return
+        return super().save_session(app, session, response)
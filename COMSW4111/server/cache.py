@@ -0,0 +1,73 @@
+import time
+import pickle
+import threading
+from collections import OrderedDict
+
+
+class LocalCache:
+    """In-process LRU cache whose entries expire ``ttl`` seconds after being set."""
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Cache shared by every worker, backed by Redis (``pip install redis``).
+
+    Keys are namespaced with ``prefix`` so several caches can share a server.
+    """
+
+    def __init__(self, url, prefix=''):
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self._prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.setex(self._prefix + key, max(1, int(ttl)), pickle.dumps(value))
+
+    def delete(self, key):
+        self._client.delete(self._prefix + key)
+
+    def clear(self):
+        for key in self._client.scan_iter(self._prefix + '*'):
+            self._client.delete(key)
+
+
+def make_cache(url=None, max_size=10000, prefix=''):
+    """Redis-backed cache when ``url`` is set, otherwise an in-process :class:`LocalCache`."""
+    if url:
+        return RedisCache(url, prefix)
+    return LocalCache(max_size)
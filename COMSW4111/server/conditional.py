@@ -0,0 +1,45 @@
+import hashlib
+from datetime import timezone
+from flask import current_app, request
+
+
+def etag(*parts):
+    """Strong entity tag for a response determined entirely by ``parts``.
+
+    Pass what the body is built from (ids, ``t_last_edit`` values, the page
+    cursor) rather than the body itself, so the tag is known before anything
+    is serialized.
+    """
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def _http_time(value):
+    # Naive datetimes in this schema are UTC; HTTP dates have whole seconds
+    return value.replace(tzinfo=value.tzinfo or timezone.utc, microsecond=0)
+
+
+def not_modified(tag, last_modified=None):
+    """``304 Not Modified`` response when the request's validators match, else ``None``.
+
+    ``If-None-Match`` takes precedence over ``If-Modified-Since``, which is
+    only honoured when ``last_modified`` is given.
+    """
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(tag)
+    elif last_modified is not None and request.if_modified_since is not None:
+        matched = _http_time(last_modified) <= request.if_modified_since
+    else:
+        matched = False
+    if not matched:
+        return None
+    return validated(current_app.response_class(status=304), tag, last_modified)
+
+
+def validated(response, tag, last_modified=None):
+    """Attach the validators to ``response``; clients must revalidate before reusing it."""
+    response.set_etag(tag)
+    if last_modified is not None:
+        response.last_modified = _http_time(last_modified)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
@@ -4,4 +4,4 @@ from flask import Blueprint
 
 bp: Blueprint = Blueprint('dispute', __name__)
 
-from COMSW4111.server.listing import routes
\ No newline at end of file
+from COMSW4111.server.dispute import routes
\ No newline at end of file
@@ -2,9 +2,11 @@
 
 import uuid
 from datetime import datetime
-from sqlalchemy import or_, exc
+from sqlalchemy import exc
 from COMSW4111.data_models import db
+from COMSW4111.server import dispute_queue
 from COMSW4111.server.dispute import bp
+from COMSW4111.server.pagination import paginate, jsonify_page, InvalidCursor
 from flask_login import login_required, current_user
 from COMSW4111.data_models import Transaction, Dispute
 from flask import request, jsonify, current_app, render_template
@@ -17,54 +19,25 @@ def get_disputed_transactions():
 def generate_unique_id(prefix):
     return f"{prefix}-{str(uuid.uuid4())[:8]}"
 
-@bp.route('/api/transactions', methods=['GET'])
-@login_required
-def get_transactions():
-    try:
-        transactions = get_user_transactions(current_user)
-        transactions_list = []
-        for t in transactions:
-            transactions_list.append({
-                'transaction_id': t.transaction_id,
-                'buyer_id': t.buyer_id,
-                'seller_id': t.seller_id,
-                'listing_id': t.listing_id,
-                't_date': t.t_date.strftime('%Y-%m-%d'),
-                'agreed_price': float(t.agreed_price),
-                'serv_fee': float(t.serv_fee) if t.serv_fee else 0,
-                'status': t.status
-            })
-        return jsonify(transactions_list)
-    except Exception as e:
-        current_app.logger.error(f"Error fetching transactions: {str(e)}")
-        return jsonify({"error": "Failed to fetch transactions"}), 500
-
-def get_user_transactions(current_user):
-    if not (current_user.buyer or current_user.seller):
-        return jsonify({"error": "User is neither buyer nor seller"}), 400
-    transactions = Transaction.query.filter(
-        or_(
-            Transaction.buyer_id == current_user.buyer.buyer_id if current_user.buyer else False,
-            Transaction.seller_id == current_user.seller.seller_id if current_user.seller else False
-        )
-    ).all()
-    return transactions
-
 @bp.route('/api/disputes', methods=['GET'])
 @login_required
 def get_disputes():
     try:
         if current_user.admin:
-            disputes = Dispute.query.all()
+            status = request.args.get('status', 'all')
+            query = Dispute.query.filter(*dispute_queue.queue_filters({'status': status}))
+        elif current_user.buyer or current_user.seller:
+            # One join on the buyer/seller indexes, whatever the size of the user's history
+            query = Dispute.query.join(
+                Transaction, Dispute.transaction_id == Transaction.transaction_id
+            ).filter(Transaction.visible_to(current_user.user_id))
         else:
-            if current_user.buyer:
-                transactions = Transaction.query.filter_by(buyer_id=current_user.buyer.buyer_id).all()
-            elif current_user.seller:
-                transactions = Transaction.query.filter_by(seller_id=current_user.seller.seller_id).all()
-            else:
-                return jsonify({"error": "User has no associated transactions"}), 400
-            transaction_ids = [t.transaction_id for t in transactions]
-            disputes = Dispute.query.filter(Dispute.transaction_id.in_(transaction_ids)).all()
+            return jsonify({"error": "User has no associated transactions"}), 400
+        disputes, next_cursor = paginate(
+            query,
+            (Dispute.t_filed, Dispute.dispute_id),
+            key=lambda dispute: (dispute.t_filed, dispute.dispute_id)
+        )
         disputes_list = []
         for d in disputes:
             disputes_list.append({
@@ -75,7 +48,11 @@ def get_disputes():
                 'status': d.status,
                 'resolution_date': d.resolution_date.strftime('%Y-%m-%d') if d.resolution_date else None
             })
-        return jsonify(disputes_list)
+        return jsonify_page(disputes_list, next_cursor)
+    except dispute_queue.InvalidFilter as e:
+        return jsonify({"error": f"Invalid {e}"}), 400
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching disputes: {str(e)}")
         return jsonify({"error": "Failed to fetch disputes"}), 500
@@ -85,7 +62,7 @@ def get_disputes():
 def create_dispute():
     try:
         data = request.get_json()
-        transaction = Transaction.query.get(data['transaction_id'])
+        transaction = db.session.get(Transaction, data['transaction_id'])
         if not transaction:
             return jsonify({"error": "Transaction not found"}), 404
         if not (current_user.buyer and transaction.buyer_id == current_user.buyer.buyer_id) and \
@@ -121,7 +98,7 @@ def update_dispute(dispute_id):
     try:
         if not current_user.admin:
             return jsonify({"error": "Unauthorized"}), 403
-        dispute = Dispute.query.get(dispute_id)
+        dispute = db.session.get(Dispute, dispute_id)
         if not dispute:
             return jsonify({"error": "Dispute not found"}), 404
         data = request.get_json()
@@ -0,0 +1,94 @@
+from decimal import Decimal, InvalidOperation
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from COMSW4111.data_models import db, Dispute, Transaction
+from COMSW4111.server.cache import make_cache
+
+# Oldest first, so the head of the queue is the longest-waiting dispute
+QUEUE_ORDER = (Dispute.t_filed, Dispute.dispute_id)
+_COUNTS_KEY = 'counts'
+_PENDING_KEY = 'dispute_counts_stale'
+_cache = None
+
+
+class InvalidFilter(ValueError):
+    """Raised when a work-queue filter argument cannot be parsed."""
+
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = make_cache(current_app.config.get('USER_CACHE_URL'), 16, prefix='pr_dispute_counts:')
+    return _cache
+
+
+def _parse(args, name, convert):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return convert(value)
+    except (ValueError, InvalidOperation):
+        raise InvalidFilter(name) from None
+
+
+def queue_filters(args):
+    """SQL filter clauses for the work-queue arguments in ``args``.
+
+    ``status`` is ``unsolved`` (the default), ``solved`` or ``all``;
+    ``filed_from``/``filed_to`` bound the filing date (inclusive, ISO dates)
+    and ``min_amount``/``max_amount`` the transaction's agreed price.
+    """
+    status = args.get('status', 'unsolved')
+    if status != 'all' and status not in Dispute.STATUSES:
+        raise InvalidFilter('status')
+    clauses = [] if status == 'all' else [Dispute.status == status]
+    filed_from = _parse(args, 'filed_from', date.fromisoformat)
+    filed_to = _parse(args, 'filed_to', date.fromisoformat)
+    min_amount = _parse(args, 'min_amount', Decimal)
+    max_amount = _parse(args, 'max_amount', Decimal)
+    if filed_from is not None:
+        clauses.append(Dispute.t_filed >= datetime.combine(filed_from, datetime.min.time()))
+    if filed_to is not None:
+        clauses.append(Dispute.t_filed < datetime.combine(filed_to + timedelta(days=1), datetime.min.time()))
+    if min_amount is not None:
+        clauses.append(Transaction.agreed_price >= min_amount)
+    if max_amount is not None:
+        clauses.append(Transaction.agreed_price <= max_amount)
+    return clauses
+
+
+def status_counts():
+    """Number of disputes per status, cached for ``DISPUTE_COUNTS_TTL`` seconds.
+
+    Any committed dispute insert, update or delete drops the cached value;
+    both blueprints that write disputes import this module, so the hooks
+    below are always installed where it matters.
+    """
+    cache = _get_cache()
+    counts = cache.get(_COUNTS_KEY)
+    if counts is None:
+        rows = db.session.query(Dispute.status, func.count(Dispute.dispute_id)).group_by(Dispute.status).all()
+        counts = {status: 0 for status in Dispute.STATUSES}
+        counts.update({status: count for status, count in rows})
+        cache.set(_COUNTS_KEY, counts, current_app.config.get('DISPUTE_COUNTS_TTL', 30))
+    return counts
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_dispute_changes(session, flush_context):
+    if any(isinstance(obj, Dispute) for obj in list(session.new) + list(session.dirty) + list(session.deleted)):
+        session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _drop_counts(session):
+    if session.info.pop(_PENDING_KEY, None) and _cache is not None:
+        _cache.delete(_COUNTS_KEY)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_dispute_changes(session):
+    session.info.pop(_PENDING_KEY, None)
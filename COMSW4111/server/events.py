@@ -0,0 +1,339 @@
+import json
+import time
+import queue
+import select
+import threading
+from collections import deque
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, select as select_rows, text
+from sqlalchemy.orm import Session
+from COMSW4111.data_models import db, Dispute, Transaction
+
+ADMINS = 'admins'
+_PENDING_KEY = 'status_events'
+_NOTIFY = text("SELECT pg_notify(:channel, :payload)")
+# Seconds a client turned away for lack of a stream slot should wait
+RETRY_AFTER = 5
+_lock = threading.Lock()
+_broker = None
+_listener = None
+_slots = None
+
+
+def user_topic(user_id):
+    return f'user:{user_id}'
+
+
+class Subscription:
+    """Bounded queue of messages for one stream.
+
+    A subscriber that falls ``EVENTS_QUEUE_SIZE`` messages behind is not
+    allowed to hold up publishers; its queue is dropped and it is told to
+    resync (re-fetch) instead.
+    """
+
+    def __init__(self, topics, size):
+        self.topics = frozenset(topics)
+        self._queue = queue.Queue(size)
+        self.lost = False
+
+    def offer(self, message):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.lost = True
+
+    def get(self, timeout):
+        """Next message, ``RESYNC`` after an overflow, or ``None`` if nothing arrived within ``timeout``."""
+        if self.lost:
+            self.lost = False
+            with self._queue.mutex:
+                self._queue.queue.clear()
+            return RESYNC
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+RESYNC = {'event': 'resync', 'data': {}}
+
+
+class Broker:
+    """In-process pub/sub: messages go to every subscription sharing one of their topics.
+
+    The last ``backlog`` messages are kept, stamped with their arrival time,
+    so a client reconnecting with ``Last-Event-ID`` is sent what it missed.
+    """
+
+    def __init__(self, backlog):
+        self._lock = threading.Lock()
+        self._topics = {}
+        self._backlog = deque(maxlen=backlog)
+        self.started = time.time()
+
+    def subscribe(self, topics, size):
+        subscription = Subscription(topics, size)
+        with self._lock:
+            for topic in subscription.topics:
+                self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._topics.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._topics[topic]
+
+    def publish(self, message):
+        with self._lock:
+            # Stamped under the lock: a new subscriber either gets this
+            # message offered or finds it in the backlog
+            message = {**message, 'id': f'{time.time():.6f}'}
+            self._backlog.append(message)
+            receivers = set()
+            for topic in message['topics']:
+                receivers.update(self._topics.get(topic, ()))
+        for subscription in receivers:
+            subscription.offer(message)
+
+    def resync_all(self):
+        """Tell every subscriber to re-fetch, e.g. after notifications may have been missed."""
+        with self._lock:
+            receivers = {subscription for subscribers in self._topics.values() for subscription in subscribers}
+        for subscription in receivers:
+            subscription.offer(RESYNC)
+
+    def since(self, last_id, topics):
+        """Messages for ``topics`` that arrived after ``last_id``, or ``None`` if some may be gone."""
+        with self._lock:
+            backlog = list(self._backlog)
+        full = len(backlog) == self._backlog.maxlen
+        if last_id < self.started or (full and last_id < float(backlog[0]['id'])):
+            return None
+        return [
+            message for message in backlog
+            if float(message['id']) > last_id and topics.intersection(message['topics'])
+        ]
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _lock:
+            if _broker is None:
+                _broker = Broker(current_app.config.get('EVENTS_BACKLOG', 1000))
+    return _broker
+
+
+def events_backend():
+    """``'postgres'`` (LISTEN/NOTIFY between workers) or ``'local'`` (this process only).
+
+    ``EVENTS_BACKEND = 'auto'`` picks Postgres when the database is Postgres.
+    """
+    backend = current_app.config.get('EVENTS_BACKEND', 'auto')
+    if backend == 'auto':
+        return 'postgres' if db.engine.dialect.name == 'postgresql' else 'local'
+    return backend
+
+
+class Listener(threading.Thread):
+    """Daemon thread relaying ``NOTIFY`` payloads on ``channel`` into the broker.
+
+    Holds one connection of its own, detached from the pool. After a lost
+    connection every subscriber is told to resync, since notifications sent
+    in the meantime are gone.
+    """
+
+    def __init__(self, engine, channel, broker, logger):
+        super().__init__(name='events-listener', daemon=True)
+        self.engine = engine
+        self.channel = channel
+        self.broker = broker
+        self.logger = logger
+
+    def run(self):
+        while True:
+            try:
+                self._listen()
+            except Exception as e:
+                self.logger.warning(f"Event listener disconnected: {e}")
+                self.broker.resync_all()
+                time.sleep(1)
+
+    def _listen(self):
+        fairy = self.engine.raw_connection()
+        fairy.detach()
+        connection = fairy.driver_connection
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN {self.engine.dialect.identifier_preparer.quote(self.channel)}')
+            while True:
+                if select.select([connection], [], [], 60) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    self.broker.publish(json.loads(connection.notifies.pop(0).payload))
+        finally:
+            connection.close()
+
+
+def ensure_listener():
+    """Start this process's ``NOTIFY`` listener once, when the Postgres backend is in use.
+
+    Started on the first stream rather than at app creation, so that it runs
+    in each gunicorn worker and not in the preloading master.
+    """
+    global _listener
+    if _listener is not None or events_backend() != 'postgres':
+        return
+    broker = get_broker()
+    with _lock:
+        if _listener is None:
+            _listener = Listener(
+                db.engines[None],
+                current_app.config.get('EVENTS_CHANNEL', 'pr_events'),
+                broker,
+                current_app.logger
+            )
+            _listener.start()
+
+
+def open_stream():
+    """Claim one of this process's ``EVENTS_MAX_STREAMS`` stream slots; ``False`` if none is free.
+
+    An open stream holds a server thread until it ends, so the cap keeps
+    the rest of the threads for ordinary requests. Each claimed slot must be
+    given back with ``close_stream``.
+    """
+    global _slots
+    if _slots is None:
+        with _lock:
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(current_app.config.get('EVENTS_MAX_STREAMS', 12))
+    return _slots.acquire(blocking=False)
+
+
+def close_stream():
+    _slots.release()
+
+
+def _format(message):
+    lines = [f"event: {message['event']}"]
+    if 'id' in message:
+        lines.append(f"id: {message['id']}")
+    lines.append(f"data: {json.dumps(message['data'])}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def stream(topics, last_event_id=None):
+    """Server-sent events for ``topics``, as a generator of ``text/event-stream`` chunks.
+
+    Everything is read from the config up front: the generator runs after
+    the request (and its database session) has been torn down. The stream
+    ends after ``EVENTS_STREAM_SECONDS``; browsers reconnect by themselves,
+    sending the last id they saw, and receive anything published meanwhile
+    (or a ``resync`` event when this process cannot tell).
+    """
+    ensure_listener()
+    broker = get_broker()
+    heartbeat = current_app.config.get('EVENTS_HEARTBEAT', 15)
+    lifetime = current_app.config.get('EVENTS_STREAM_SECONDS', 25)
+    size = current_app.config.get('EVENTS_QUEUE_SIZE', 100)
+
+    def generate():
+        # Subscribed here, not up front, so the finally below always runs for it
+        subscription = broker.subscribe(topics, size)
+        try:
+            # Anything published from now on reaches the subscription
+            opened = f'{time.time():.6f}'
+            yield 'retry: 1000\n\n'
+            if last_event_id:
+                try:
+                    missed = broker.since(float(last_event_id), subscription.topics)
+                except ValueError:
+                    missed = None
+                for message in [RESYNC] if missed is None else missed:
+                    yield _format(message)
+            # Even a client that saw no events reconnects with a Last-Event-ID
+            yield f'id: {opened}\n\n'
+            deadline = time.monotonic() + lifetime
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                message = subscription.get(min(heartbeat, remaining))
+                yield _format(message) if message is not None else ': keepalive\n\n'
+        finally:
+            broker.unsubscribe(subscription)
+
+    return generate()
+
+
+def _status_changes(session):
+    """``(row, previous status)`` for transactions and disputes created or re-statused in this flush."""
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, (Transaction, Dispute)):
+            continue
+        if obj in session.new:
+            yield obj, None
+            continue
+        history = inspect(obj).attrs.status.history
+        if history.has_changes():
+            previous = history.deleted[0] if history.deleted else None
+            if previous != obj.status:
+                yield obj, previous
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_status_changes(session, flush_context):
+    changes = list(_status_changes(session))
+    if not changes or not has_app_context():
+        return
+    transaction_ids = {obj.transaction_id for obj, _ in changes if isinstance(obj, Dispute)}
+    parties = {}
+    if transaction_ids:
+        rows = session.connection().execute(
+            select_rows(Transaction.transaction_id, Transaction.buyer_id, Transaction.seller_id)
+            .where(Transaction.transaction_id.in_(transaction_ids))
+        )
+        parties = {row.transaction_id: (row.buyer_id, row.seller_id) for row in rows}
+    at = datetime.utcnow().isoformat()
+    messages = []
+    for obj, previous in changes:
+        data = {'transaction_id': obj.transaction_id, 'status': obj.status, 'previous': previous, 'at': at}
+        if isinstance(obj, Transaction):
+            kind, buyer_id, seller_id = 'transaction', obj.buyer_id, obj.seller_id
+        else:
+            kind, (buyer_id, seller_id) = 'dispute', parties.get(obj.transaction_id, (None, None))
+            data['dispute_id'] = obj.dispute_id
+        topics = [user_topic(user_id) for user_id in (buyer_id, seller_id) if user_id]
+        if kind == 'dispute':
+            topics.append(ADMINS)
+        messages.append({'event': kind, 'topics': topics, 'data': data})
+    if events_backend() == 'postgres':
+        # Sent inside the transaction: Postgres delivers them on commit and drops them on rollback
+        channel = current_app.config.get('EVENTS_CHANNEL', 'pr_events')
+        for message in messages:
+            session.connection().execute(_NOTIFY, {'channel': channel, 'payload': json.dumps(message)})
+    else:
+        session.info.setdefault(_PENDING_KEY, []).extend(messages)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_status_changes(session):
+    messages = session.info.pop(_PENDING_KEY, None)
+    if messages and has_app_context():
+        broker = get_broker()
+        for message in messages:
+            broker.publish(message)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_status_changes(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,232 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from COMSW4111.data_models import db, Listing
+from COMSW4111.server.media import HASHED_NAME
+
+ORIGINAL = 'original'
+GALLERY = 'gallery'
+# Leading bytes of each accepted format -> stored extension
+SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+# Resized WebP copies generated after upload: variant -> longest edge in pixels
+VARIANTS = {'thumb': 320, 'medium': 1024}
+CHUNK_SIZE = 64 * 1024
+
+_lock = threading.Lock()
+_executor = None
+
+
+class InvalidImage(ValueError):
+    """Raised when an upload is not a PNG, JPEG or GIF image."""
+
+
+class ImageTooLarge(InvalidImage):
+    """Raised when an upload grows past ``MAX_IMAGE_SIZE`` while it is being stored."""
+
+
+def image_root():
+    """Directory holding stored images, ``IMAGE_ROOT`` or the app's ``static/listing_images``."""
+    root = current_app.config.get('IMAGE_ROOT') or os.path.join(current_app.root_path, 'static', 'listing_images')
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+def _digest(name):
+    return name.split('.', 1)[0]
+
+
+def variant_filename(name, variant):
+    return f'{_digest(name)}-{variant}.webp'
+
+
+def sniff_extension(head):
+    """Extension for an image starting with ``head``, from its magic bytes."""
+    for signature, extension in SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    raise InvalidImage('Invalid file type')
+
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        # directories cannot be opened for fsync on every platform
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def store_image(file):
+    """Store an uploaded file under the SHA-256 of its contents and return the file name.
+
+    The upload is copied chunk by chunk into a temporary file in the image
+    root: the first chunk must carry a known image signature and the copy
+    stops with :class:`ImageTooLarge` as soon as ``MAX_IMAGE_SIZE`` is
+    passed. The file is fsynced and renamed into place, so identical
+    uploads end up as one file and readers never see a partial image.
+    """
+    root = image_root()
+    max_size = current_app.config.get('MAX_IMAGE_SIZE', 10 * 1024 * 1024)
+    head = file.read(CHUNK_SIZE)
+    extension = sniff_extension(head)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=root, prefix='.upload-')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > max_size:
+                    raise ImageTooLarge(f'Images may be at most {max_size} bytes')
+                digest.update(chunk)
+                out.write(chunk)
+                chunk = file.read(CHUNK_SIZE)
+            out.flush()
+            os.fsync(out.fileno())
+        name = f'{digest.hexdigest()}.{extension}'
+        path = os.path.join(root, name)
+        if os.path.exists(path):
+            os.unlink(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+            _fsync_dir(root)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return name
+
+
+def is_stored(name):
+    """Whether ``name`` is an original stored by :func:`store_image`.
+
+    Rejects variants, paths and anything else that did not come from an
+    upload, before it reaches ``image_record`` or the variant builder.
+    """
+    match = HASHED_NAME.match(name) if isinstance(name, str) else None
+    if match is None or '-' in match.group(1):
+        return False
+    return os.path.isfile(os.path.join(image_root(), name))
+
+
+def image_record(name, gallery=()):
+    """``Listing.list_image`` value for cover image ``name`` and whichever of its variants exist so far.
+
+    Further images of the listing are kept, in order, under ``gallery``.
+    """
+    root = image_root()
+    record = {ORIGINAL: name}
+    for variant in VARIANTS:
+        filename = variant_filename(name, variant)
+        if os.path.exists(os.path.join(root, filename)):
+            record[variant] = filename
+    if gallery:
+        record[GALLERY] = list(gallery)
+    return json.dumps(record)
+
+
+def _parse(value):
+    try:
+        record = json.loads(value)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def image_variant(value, variant=ORIGINAL):
+    """File name of ``variant`` in a ``list_image`` value, falling back to the original."""
+    if not value:
+        return value
+    record = _parse(value)
+    if record is None:
+        # bare file name stored before variants existed
+        return value
+    return record.get(variant) or record.get(ORIGINAL)
+
+
+def image_gallery(value):
+    """Original file names of the listing's images after the cover."""
+    record = _parse(value) if value else None
+    return record.get(GALLERY, []) if record else []
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=current_app.config.get('IMAGE_WORKERS', 2), thread_name_prefix='image-variants'
+                )
+    return _executor
+
+
+def schedule_variants(name, listing_id=None):
+    """Generate the variants of ``name`` in the background; returns the future.
+
+    Once built they are recorded on ``listing_id`` if ``name`` is its cover,
+    so schedule only after that listing has been committed.
+    """
+    app = current_app._get_current_object()
+    return _pool().submit(_build_variants, app, name, listing_id)
+
+
+def _build_variants(app, name, listing_id):
+    with app.app_context():
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            app.logger.warning('Pillow is not installed; serving original images only')
+            return None
+        root = image_root()
+        try:
+            with Image.open(os.path.join(root, name)) as image:
+                image = ImageOps.exif_transpose(image)
+                if image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+                for variant, size in VARIANTS.items():
+                    path = os.path.join(root, variant_filename(name, variant))
+                    if os.path.exists(path):
+                        continue
+                    resized = image.copy()
+                    resized.thumbnail((size, size))
+                    fd, tmp_path = tempfile.mkstemp(dir=root, prefix='.variant-')
+                    with os.fdopen(fd, 'wb') as out:
+                        resized.save(out, 'WEBP', quality=80)
+                    os.replace(tmp_path, path)
+        except Exception as e:
+            app.logger.error(f"Error generating variants for {name}: {str(e)}")
+            return None
+        return record_variants(name, listing_id)
+
+
+def record_variants(name, listing_id=None):
+    """Point listing ``listing_id`` at the current variants of ``name`` if it is still its cover."""
+    record = image_record(name)
+    if listing_id is None:
+        return record
+    try:
+        listing = db.session.get(Listing, listing_id)
+        if listing is not None and image_variant(listing.list_image) == name:
+            listing.list_image = image_record(name, image_gallery(listing.list_image))
+            # The listing's image URLs change, so cached copies and validators must too
+            listing.t_last_edit = datetime.utcnow()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return record
@@ -0,0 +1,77 @@
+import os
+import ast
+import threading
+from importlib import import_module
+from importlib.util import find_spec
+
+
+class LazyView:
+    """View function that imports its module on first use.
+
+    Flask allows no new routes once the first request has been handled, so a
+    lazily loaded blueprint still has its URL rules added up front; only the
+    routes module, and everything it imports, waits for a matching request.
+    Attribute lookups (e.g. the ``read_replica`` marker) load the real view.
+    """
+
+    # Read by Flask while adding the rule; answering them must not import anything
+    required_methods = ()
+    provide_automatic_options = None
+
+    def __init__(self, module, name):
+        self.__module__ = module
+        self.__name__ = name
+        self._view = None
+        self._lock = threading.Lock()
+
+    @property
+    def view(self):
+        if self._view is None:
+            with self._lock:
+                if self._view is None:
+                    self._view = getattr(import_module(self.__module__), self.__name__)
+        return self._view
+
+    def __getattr__(self, name):
+        return getattr(self.view, name)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+def _literal(node, default=None):
+    return ast.literal_eval(node) if node is not None else default
+
+
+def route_table(package):
+    """``(rule, function name, methods)`` for each ``@bp.route`` in ``package.routes``.
+
+    The source is parsed rather than imported; even the package itself is
+    not imported, as its ``__init__`` pulls in the routes. Only literal rules
+    and methods are understood, and ``@bp.route`` must be the outermost
+    decorator, as everywhere in this package.
+    """
+    path = os.path.join(find_spec(package).submodule_search_locations[0], 'routes.py')
+    with open(path, encoding='utf-8') as source:
+        tree = ast.parse(source.read())
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef) or not node.decorator_list:
+            continue
+        decorator = node.decorator_list[0]
+        if not (isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Attribute)):
+            continue
+        target = decorator.func
+        if target.attr != 'route' or not isinstance(target.value, ast.Name) or target.value.id != 'bp':
+            continue
+        keywords = {keyword.arg: keyword.value for keyword in decorator.keywords}
+        yield _literal(decorator.args[0]), node.name, _literal(keywords.get('methods'), ['GET'])
+
+
+def register_lazy_blueprint(app, package, name):
+    """Add the routes of blueprint ``name`` (in ``package``) with views loaded on first request.
+
+    Endpoints keep their ``<name>.<function>`` names, so ``url_for`` works
+    as if the blueprint had been registered normally.
+    """
+    for rule, function, methods in route_table(package):
+        app.add_url_rule(rule, f'{name}.{function}', LazyView(f'{package}.routes', function), methods=methods)
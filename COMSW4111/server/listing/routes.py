@@ -1,38 +1,72 @@
 #!/usr/bin/env python3
 
-import os
 import uuid
 from sqlalchemy import exc
 from datetime import datetime
+from COMSW4111.server import conditional, images, listing_cache
 from COMSW4111.server.listing import bp
-from werkzeug.utils import secure_filename
+from COMSW4111.server.media import send_media
+from COMSW4111.server.replica import read_replica
+from werkzeug.exceptions import NotFound, RequestEntityTooLarge
 from flask_login import login_required, current_user
-from flask import render_template, request, jsonify, current_app, send_from_directory, abort
+from flask import render_template, request, jsonify, current_app, abort, url_for
 from COMSW4111.data_models import db, Account, Seller, PRUser, Listing
+from COMSW4111.data_models.search_index import search_listings_query
+from COMSW4111.server.pagination import paginate, jsonify_page, InvalidCursor
+from COMSW4111.server.serialization import Schema
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
-UPLOAD_FOLDER = 'static/listing_images'
+LISTING_FIELDS = dict(
+    listing_id=Listing.listing_id,
+    seller_id=Listing.seller_id,
+    title=Listing.title,
+    status=Listing.status,
+    description=Listing.description,
+    price=Listing.price,
+    location_id=Listing.location_id,
+    meta_tag=Listing.meta_tag,
+    t_created=Listing.t_created,
+    t_last_edit=Listing.t_last_edit
+)
+# Search grid rows ship the thumbnail, the detail view the medium image
+LISTING_RESULT = Schema(
+    **LISTING_FIELDS,
+    list_image=(Listing.list_image, lambda value: images.image_variant(value, 'thumb'))
+)
+LISTING_DETAIL = Schema(
+    **LISTING_FIELDS,
+    list_image=(Listing.list_image, lambda value: images.image_variant(value, 'medium')),
+    gallery=(Listing.list_image, images.image_gallery)
+)
 
-def allowed_file(filename):
-    """Check if the file has a valid extension."""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+def save_files(files):
+    """Store each upload by content hash and return the stored names.
 
-def save_file(file):
-    """Handle file saving and return the URL or an error message."""
-    if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        unique_filename = f"{filename}"
-        file_dir = os.path.join(current_app.root_path, UPLOAD_FOLDER)
-        os.makedirs(file_dir, exist_ok=True)
-        file_path = os.path.join(file_dir, unique_filename)
-        file.save(file_path)
-        return f"/{UPLOAD_FOLDER}/{unique_filename}"
-    return None
+    Raises :class:`images.InvalidImage` for a file that is not an image or
+    is too large, and when more than ``MAX_IMAGES_PER_REQUEST`` are sent.
+    """
+    files = [file for file in files if file and file.filename]
+    if len(files) > current_app.config.get('MAX_IMAGES_PER_REQUEST', 10):
+        raise images.InvalidImage('Too many images')
+    return [images.store_image(file) for file in files]
+
+
+def build_variants(names, listing_id=None):
+    """Queue the resized variants of ``names``; call after ``listing_id`` is committed."""
+    for name in dict.fromkeys(names):
+        images.schedule_variants(name, listing_id)
 
 
 @bp.route('/listing/<string:listing_id>', methods=['GET'])
+@read_replica
 @login_required
 def listing_page(listing_id):
+    list_data = listing_cache.cached_listing('page', listing_id, lambda: _listing_page_data(listing_id))
+    if list_data is None:
+        return None
+    list_data = {**list_data, 'your_listing': list_data['seller_id'] == current_user.user_id}
+    return render_template('listing.html', title='Listing', listing_data=list_data)
+
+def _listing_page_data(listing_id):
     result = (
         db.session.query(Listing, PRUser)
         .join(PRUser, Listing.seller_id == PRUser.user_id)
@@ -42,23 +76,21 @@ def listing_page(listing_id):
     if not result:
         return None
     listing, seller = result
-    list_data = {
+    return {
         "listing_id": str(listing.listing_id),
         "seller_id": str(listing.seller_id),
         "status": str(listing.status),
         "title": str(listing.title),
         "description": str(listing.description),
         "price": float(listing.price),
-        "list_image": str(listing.list_image),
+        "list_image": str(images.image_variant(listing.list_image, 'medium')),
         "meta_tag": listing.meta_tag,
         "t_created": listing.t_created,
         "seller_name": f"{seller.first_name} {seller.last_name}",
         "seller_email": seller.email,
         "t_last_edit": listing.t_last_edit,
-        "location_id": str(listing.location_id),
-        'your_listing': listing.seller_id == current_user.user_id
+        "location_id": str(listing.location_id)
     }
-    return render_template('listing.html', title='Listing', listing_data=list_data)
 
 def ensure_seller_exists():
     seller = Seller.query.get(current_user.user_id)
@@ -81,20 +113,30 @@ def ensure_seller_exists():
 @bp.route('/api/listings/upload-images', methods=['POST'])
 @login_required
 def upload_images():
-    if 'images' not in request.files:
-        return jsonify({'error': 'No images provided'}), 400
-    file = request.files['images']
-    if not file:
-        return jsonify({'error': 'No selected file'}), 400
     try:
-        image_url = save_file(file)
-        if image_url:
-            return jsonify({
-                'message': 'Image uploaded successfully',
-                'imageUrl': image_url
-            }), 200
-        else:
-            return jsonify({'error': 'Invalid file type'}), 400
+        if 'images' not in request.files:
+            return jsonify({'error': 'No images provided'}), 400
+        image_names = save_files(request.files.getlist('images'))
+        if not image_names:
+            return jsonify({'error': 'No selected file'}), 400
+        # Not attached to a listing yet; update_listing records them once it is
+        build_variants(image_names)
+        uploaded = [{
+            'image': image_name,
+            'imageUrl': url_for('listing.get_images', image_name=image_name)
+        } for image_name in image_names]
+        return jsonify({
+            'message': 'Image uploaded successfully',
+            'image': uploaded[0]['image'],
+            'imageUrl': uploaded[0]['imageUrl'],
+            'images': uploaded
+        }), 200
+    except images.ImageTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except images.InvalidImage as e:
+        return jsonify({'error': str(e)}), 400
+    except RequestEntityTooLarge:
+        return jsonify({'error': 'Upload too large'}), 413
     except Exception as e:
         current_app.logger.error(f"Error uploading image: {str(e)}")
         return jsonify({'error': 'Failed to upload image'}), 500
@@ -103,39 +145,20 @@ def upload_images():
 @bp.route('/api/get-images/<string:image_name>', methods=['GET'])
 def get_images(image_name):
     try:
-        upload_path = "/Users/christopherwebb/Developer/COMSW4111/static/listing_images"
-        # Check if file exists
-        full_path = os.path.join(upload_path, image_name)
-        if not os.path.exists(full_path):
-            print(f"File not found: {full_path}")
-            return abort(404)
-        # Add mime type for better browser handling
-        return send_from_directory(
-            upload_path,
-            image_name,
-            mimetype='image/jpeg'
-        )
+        return send_media(images.image_root(), image_name)
+    except NotFound:
+        return abort(404)
     except Exception as e:
-        print(f"Error serving image: {str(e)}")
+        current_app.logger.error(f"Error serving image: {str(e)}")
         return abort(500)
 
 @bp.route('/api/listings/create', methods=['POST'])
 @login_required
 def create_listing():
-    data = request.form
     try:
+        data = request.form
+        image_names = save_files(request.files.getlist('images'))
         seller = ensure_seller_exists()
-        image_url = None
-        if 'images' in request.files:
-            file = request.files['images']
-            if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                unique_filename = f"{filename}"
-                os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-                file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
-                file.save(file_path)
-                image_url = f"/static/listing_images/{unique_filename}"
-                print(image_url)
         current_time = datetime.utcnow()
         new_listing = Listing(
             listing_id=str(uuid.uuid4()),
@@ -144,7 +167,7 @@ def create_listing():
             title=data['title'],
             description=data['description'],
             price=float(data['price']),
-            list_image=unique_filename,
+            list_image=images.image_record(image_names[0], image_names[1:]) if image_names else None,
             location_id=data.get('location_id'),
             meta_tag=data.get('meta_tags', ''),
             t_created=current_time,
@@ -152,10 +175,15 @@ def create_listing():
         )
         db.session.add(new_listing)
         db.session.commit()
+        build_variants(image_names, new_listing.listing_id)
         return jsonify({
             'message': 'Listing created successfully',
             'listing_id': new_listing.listing_id
         }), 201
+    except images.ImageTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except RequestEntityTooLarge:
+        return jsonify({'error': 'Upload too large'}), 413
     except ValueError as ve:
         db.session.rollback()
         current_app.logger.error(f"Validation error: {str(ve)}")
@@ -170,31 +198,31 @@ def create_listing():
         return jsonify({'error': 'Failed to create listing'}), 500
 
 @bp.route('/api/listings/<string:listing_id>', methods=['GET'])
+@read_replica
 @login_required
 def get_listing(listing_id):
     try:
-        listing = Listing.query.get(listing_id)
-        print(listing.seller_id == current_user.user_id)
-        if not listing:
+        cached = listing_cache.cached_listing('detail', listing_id, lambda: _listing_detail(listing_id))
+        if cached is None:
             return jsonify({'error': 'Listing not found'}), 404
-        return jsonify({
-            'listing_id': listing.listing_id,
-            'seller_id': listing.seller_id,
-            'status': listing.status,
-            'title': listing.title,
-            'description': listing.description,
-            'price': float(listing.price),
-            'list_image': listing.list_image,
-            'location_id': listing.location_id,
-            'meta_tag': listing.meta_tag,
-            't_created': listing.t_created.utcnow().isoformat(),
-            't_last_edit': listing.t_last_edit.utcnow().isoformat(),
-            'your_listing': listing.seller_id == current_user.user_id
-        }), 200
+        listing_data, last_modified = cached
+        your_listing = listing_data['seller_id'] == current_user.user_id
+        tag = conditional.etag(listing_id, last_modified, your_listing)
+        unchanged = conditional.not_modified(tag, last_modified)
+        if unchanged is not None:
+            return unchanged
+        # The cached dict is shared between users; the viewer's flag goes on a copy
+        listing_data = {**listing_data, 'your_listing': your_listing}
+        return conditional.validated(jsonify(listing_data), tag, last_modified), 200
     except Exception as e:
         current_app.logger.error(f"Error fetching listing: {str(e)}")
         return jsonify({'error': 'Failed to fetch listing'}), 500
 
+def _listing_detail(listing_id):
+    """``(body, t_last_edit)`` for the listing; the raw timestamp feeds the HTTP validators."""
+    listing = LISTING_DETAIL.query().filter(Listing.listing_id == listing_id).first()
+    return (LISTING_DETAIL.dump(listing), listing.t_last_edit) if listing else None
+
 @bp.route('/api/listings/<string:listing_id>', methods=['PUT'])
 @login_required
 def update_listing(listing_id):
@@ -203,6 +231,8 @@ def update_listing(listing_id):
         if not listing:
             return jsonify({'error': 'Listing not found'}), 404
         data = request.get_json()
+        if data.get('list_image') and not images.is_stored(data['list_image']):
+            return jsonify({'error': 'Unknown image'}), 400
         if 'title' in data:
             listing.title = data['title']
         if 'description' in data:
@@ -212,13 +242,15 @@ def update_listing(listing_id):
         if 'price' in data:
             listing.price = data['price']
         if 'list_image' in data:
-            listing.list_image = data['list_image']
+            listing.list_image = images.image_record(data['list_image']) if data['list_image'] else None
         if 'location_id' in data:
             listing.location_id = data['location_id']
         if 'meta_tag' in data:
             listing.meta_tag = data['meta_tag']
         listing.t_last_edit = datetime.utcnow()
         db.session.commit()
+        if data.get('list_image'):
+            build_variants([data['list_image']], listing_id)
         return jsonify({
             'message': 'Listing updated successfully',
             'listing_id': listing_id
@@ -244,47 +276,63 @@ def delete_listing(listing_id):
         return jsonify({
             'message': 'Listing deleted successfully'
         }), 200
+    except exc.IntegrityError:
+        # Its sales stay on record; the listing can be deactivated instead
+        db.session.rollback()
+        return jsonify({'error': 'Listing has transactions and cannot be deleted'}), 409
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error deleting listing: {str(e)}")
         return jsonify({'error': 'Failed to delete listing'}), 500
 
 @bp.route('/api/listing/search', methods=['GET'])
+@read_replica
 @login_required
 def search_listings():
     try:
-        title = request.args.get('title', '')
-        min_price = request.args.get('min_price', type=float)
-        max_price = request.args.get('max_price', type=float)
-        meta_tag = request.args.get('meta_tag', '')
-        query = Listing.query
-        if title:
-            query = query.filter(Listing.title.ilike(f'%{title}%'))
-        if min_price is not None:
-            query = query.filter(Listing.price >= min_price)
-        if max_price is not None:
-            query = query.filter(Listing.price <= max_price)
-        if meta_tag:
-            query = query.filter(Listing.meta_tag.ilike(f'%{meta_tag}%'))
-        listings = query.all()
-        results = [{
-            'listing_id': listing.listing_id,
-            'seller_id': listing.seller_id,
-            'title': listing.title,
-            'status': listing.status,
-            'description': listing.description,
-            'price': float(listing.price),
-            'list_image': listing.list_image,
-            'location_id': listing.location_id,
-            'meta_tag': listing.meta_tag,
-            't_created': listing.t_created.isoformat(),
-            't_last_edit': listing.t_last_edit.isoformat()
-        } for listing in listings]
-        return jsonify(results), 200
+        listings, next_cursor, tag = listing_cache.cached_search(request.args, _search_page)
+        unchanged = conditional.not_modified(tag)
+        if unchanged is not None:
+            return unchanged
+        return conditional.validated(jsonify_page(listings, next_cursor), tag), 200
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         current_app.logger.error(f"Error searching listings: {str(e)}")
         return jsonify({'error': 'Failed to search listings'}), 500
 
+def _search_page():
+    """One page of search results for the request's arguments, as ``(items, next_cursor, etag)``."""
+    text_query = ' '.join(filter(None, (
+        request.args.get('q', ''),
+        request.args.get('title', ''),
+        request.args.get('meta_tag', '')
+    ))).strip()
+    min_price = request.args.get('min_price', type=float)
+    max_price = request.args.get('max_price', type=float)
+    query = LISTING_RESULT.query()
+    if min_price is not None:
+        query = query.filter(Listing.price >= min_price)
+    if max_price is not None:
+        query = query.filter(Listing.price <= max_price)
+    if text_query:
+        query, rank = search_listings_query(query, text_query)
+        rank = rank.label('rank')
+        listings, next_cursor = paginate(
+            query.add_columns(rank),
+            (rank, Listing.listing_id),
+            key=lambda row: (row.rank, row.listing_id)
+        )
+    else:
+        listings, next_cursor = paginate(
+            query,
+            (Listing.t_created, Listing.listing_id),
+            key=lambda row: (row.t_created, row.listing_id)
+        )
+    items = LISTING_RESULT.dump_all(listings)
+    tag = conditional.etag(next_cursor, [(item['listing_id'], item['t_last_edit']) for item in items])
+    return items, next_cursor, tag
+
 @bp.route('/api/listings/status', methods=['PATCH'])
 @login_required
 def update_listing_status():
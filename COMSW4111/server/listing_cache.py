@@ -0,0 +1,114 @@
+import time
+import uuid
+import threading
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from COMSW4111.data_models import Listing
+from COMSW4111.data_models.listing import CHANGED_KEY
+from COMSW4111.data_models.routing import use_replica
+from COMSW4111.server.cache import make_cache
+
+_GENERATION_KEY = 'search_generation'
+_GENERATION_TTL = 24 * 3600
+# Stored in place of an invalidated entry so that a lagging replica cannot
+# put the pre-write version straight back
+_TOMBSTONE = 'invalidated'
+_lock = threading.Lock()
+_cache = None
+
+
+def get_cache():
+    """Process-wide listing cache: an in-process LRU, or Redis when ``LISTING_CACHE_URL`` is set."""
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                _cache = make_cache(
+                    current_app.config.get('LISTING_CACHE_URL'),
+                    current_app.config.get('LISTING_CACHE_SIZE', 10000),
+                    prefix='pr_listing_cache:'
+                )
+    return _cache
+
+
+def _settle_time():
+    # Replica reads are at most REPLICA_MAX_LAG behind, so anything read
+    # later than that after a write already reflects it
+    return current_app.config.get('REPLICA_MAX_LAG', 5) + 1
+
+
+def cached_listing(kind, listing_id, build):
+    """Shared part of a listing response, built by ``build()`` at most once per ``LISTING_CACHE_TTL``.
+
+    ``kind`` names the response shape (``'detail'``, ``'page'``). The value
+    must not depend on the viewer: callers merge per-user fields into a copy
+    afterwards. ``None`` results (missing listings) are not cached.
+    """
+    cache = get_cache()
+    key = f'{kind}:{listing_id}'
+    value = cache.get(key)
+    if value is not None and value != _TOMBSTONE:
+        return value
+    settling = value == _TOMBSTONE
+    value = build()
+    if value is not None and not (settling and use_replica()):
+        cache.set(key, value, current_app.config.get('LISTING_CACHE_TTL', 30))
+    return value
+
+
+def cached_search(args, build):
+    """Search page for the query arguments ``args``, cached for ``SEARCH_CACHE_TTL`` seconds.
+
+    Keys include a generation that changes on every listing write, which
+    retires all cached searches at once.
+    """
+    cache = get_cache()
+    generation = cache.get(_GENERATION_KEY)
+    if generation is None:
+        generation = _new_generation(cache)
+    token, started = generation
+    key = f'search:{token}:' + '&'.join(f'{name}={value}' for name, value in sorted(args.items(multi=True)))
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        if not use_replica() or time.time() - started > _settle_time():
+            cache.set(key, value, current_app.config.get('SEARCH_CACHE_TTL', 10))
+    return value
+
+
+def _new_generation(cache):
+    generation = (uuid.uuid4().hex, time.time())
+    cache.set(_GENERATION_KEY, generation, _GENERATION_TTL)
+    return generation
+
+
+def invalidate(listing_ids):
+    """Drop cached responses for ``listing_ids`` and every cached search."""
+    cache = get_cache()
+    for listing_id in listing_ids:
+        for kind in ('detail', 'page'):
+            cache.set(f'{kind}:{listing_id}', _TOMBSTONE, _settle_time())
+    _new_generation(cache)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_listing_changes(session, flush_context):
+    changed = {
+        obj.listing_id for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if isinstance(obj, Listing)
+    }
+    if changed:
+        session.info.setdefault(CHANGED_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    changed = session.info.pop(CHANGED_KEY, None)
+    if changed and has_app_context():
+        invalidate(changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_listing_changes(session):
+    session.info.pop(CHANGED_KEY, None)
@@ -0,0 +1,58 @@
+import os
+import re
+import mimetypes
+from flask import current_app, request, send_file
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+# Images named by content hash (optionally with a variant suffix) never change
+HASHED_NAME = re.compile(r'^([0-9a-f]{64}(?:-[a-z]+)?)\.[a-z0-9]+$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+mimetypes.add_type('image/webp', '.webp')
+
+
+def media_type(name):
+    return mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+def send_media(root, name):
+    """Serve ``name`` from ``root`` with validators, caching headers and Range support.
+
+    Content-addressed names get a strong ETag derived from the hash and a
+    year-long immutable ``Cache-Control``; anything else is revalidated on
+    every use. Conditional and Range requests are answered by werkzeug.
+    When ``MEDIA_ACCEL_REDIRECT`` is set the body is left to the reverse
+    proxy through ``X-Accel-Redirect``; ``USE_X_SENDFILE`` likewise hands
+    it off with ``X-Sendfile``.
+    """
+    path = safe_join(root, name)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+    hashed = HASHED_NAME.match(name)
+    accel_prefix = current_app.config.get('MEDIA_ACCEL_REDIRECT')
+    if accel_prefix:
+        response = current_app.response_class(mimetype=media_type(name))
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + name
+        stat = os.stat(path)
+        response.last_modified = stat.st_mtime
+        if hashed:
+            response.set_etag(hashed.group(1))
+        else:
+            response.set_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+        response = response.make_conditional(request)
+    else:
+        response = send_file(
+            path,
+            mimetype=media_type(name),
+            conditional=True,
+            etag=hashed.group(1) if hashed else True,
+            max_age=IMMUTABLE_MAX_AGE if hashed else None
+        )
+    if hashed:
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
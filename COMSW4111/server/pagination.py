@@ -0,0 +1,99 @@
+import json
+import base64
+import binascii
+from decimal import Decimal
+from datetime import date, datetime
+from sqlalchemy import tuple_
+from flask import current_app, jsonify, request
+
+
+class InvalidCursor(ValueError):
+    """Raised when a ``cursor`` query argument cannot be decoded."""
+
+
+def page_size():
+    """Requested ``limit`` clamped to ``1..MAX_PAGE_SIZE``, defaulting to ``PAGE_SIZE``."""
+    default = current_app.config.get('PAGE_SIZE', 50)
+    maximum = current_app.config.get('MAX_PAGE_SIZE', 200)
+    limit = request.args.get('limit', default, type=int)
+    return max(1, min(limit, maximum))
+
+
+def _to_json(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _from_json(column, value):
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row on a page as an opaque token."""
+    raw = json.dumps([_to_json(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """Decode ``cursor`` back into values typed like ``columns``."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise InvalidCursor(cursor)
+        return [_from_json(column, value) for column, value in zip(columns, values)]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def paginate(query, order_by, key, descending=True):
+    """Keyset-paginate ``query`` on the ``order_by`` columns.
+
+    ``order_by`` is the sort key, ending in a unique column as tie-breaker
+    (e.g. ``(Listing.t_created, Listing.listing_id)``), and ``key`` returns
+    those values for a result row. Only ``limit + 1`` rows after the
+    request's ``cursor`` are read, so the cost of a page does not depend on
+    how many rows precede it. Returns ``(items, next_cursor)``.
+    """
+    size = page_size()
+    cursor = request.args.get('cursor')
+    if cursor:
+        values = decode_cursor(cursor, order_by)
+        if descending:
+            query = query.filter(tuple_(*order_by) < tuple_(*values))
+        else:
+            query = query.filter(tuple_(*order_by) > tuple_(*values))
+    ordering = [column.desc() if descending else column.asc() for column in order_by]
+    items = query.order_by(*ordering).limit(size + 1).all()
+    next_cursor = None
+    if len(items) > size:
+        items = items[:size]
+        next_cursor = encode_cursor(key(items[-1]))
+    return items, next_cursor
+
+
+def jsonify_page(payload, next_cursor):
+    """``jsonify`` a page, exposing ``next_cursor`` to the client.
+
+    Object payloads get a ``next_cursor`` member; list payloads keep their
+    shape and carry the cursor in the ``X-Next-Cursor`` header.
+    """
+    if isinstance(payload, dict):
+        payload = {**payload, 'next_cursor': next_cursor}
+    response = jsonify(payload)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
@@ -0,0 +1,123 @@
+import time
+import threading
+from flask import current_app, g, has_request_context, request
+from flask_login import current_user
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from COMSW4111.data_models import db
+from COMSW4111.data_models.routing import REPLICA, route_to
+from COMSW4111.server.cache import make_cache
+
+_PENDING_KEY = 'replica_pending_write'
+_WROTE_KEY = 'replica_wrote'
+_lock = threading.Lock()
+_lag = (0.0, None)  # (checked at, seconds behind or None when unknown)
+_sticky = None
+
+# Seconds the replica is behind the primary; 0 when it has replayed everything received
+LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def read_replica(view):
+    """Mark a GET view as safe to serve from the read replica.
+
+    Put it directly below ``@bp.route`` so the marker is on the registered
+    function. Whether a given request actually goes to the replica is
+    decided by :func:`select_bind`.
+    """
+    view.read_replica = True
+    return view
+
+
+def _sticky_store():
+    global _sticky
+    if _sticky is None:
+        with _lock:
+            if _sticky is None:
+                _sticky = make_cache(
+                    current_app.config.get('USER_CACHE_URL'),
+                    current_app.config.get('USER_CACHE_SIZE', 10000),
+                    prefix='pr_primary:'
+                )
+    return _sticky
+
+
+def replica_lag():
+    """Seconds the replica is behind, re-measured at most every ``REPLICA_LAG_CHECK_INTERVAL``.
+
+    Returns ``None`` when the replica cannot be reached, which callers treat
+    as too far behind.
+    """
+    global _lag
+    checked, lag = _lag
+    now = time.monotonic()
+    if now - checked < current_app.config.get('REPLICA_LAG_CHECK_INTERVAL', 1):
+        return lag
+    engine = db.engines[REPLICA]
+    try:
+        if engine.dialect.name == 'postgresql':
+            with engine.connect() as connection:
+                lag = float(connection.execute(LAG_QUERY).scalar() or 0)
+        else:
+            lag = 0.0
+    except Exception as e:
+        current_app.logger.warning(f"Read replica unavailable: {e}")
+        lag = None
+    _lag = (now, lag)
+    return lag
+
+
+def select_bind():
+    """``before_request`` hook routing marked views to the replica when it is safe.
+
+    Requests stay on the primary when no replica is configured, for anything
+    but GET/HEAD, for a user who wrote within ``REPLICA_STICKY_SECONDS``
+    (so they read their own writes), and while the replica is more than
+    ``REPLICA_MAX_LAG`` seconds behind.
+    """
+    view = current_app.view_functions.get(request.endpoint)
+    if not getattr(view, 'read_replica', False) or request.method not in ('GET', 'HEAD'):
+        return
+    if REPLICA not in db.engines:
+        return
+    if current_user.is_authenticated and _sticky_store().get(current_user.get_id()):
+        return
+    lag = replica_lag()
+    if lag is None or lag > current_app.config.get('REPLICA_MAX_LAG', 5):
+        return
+    route_to(REPLICA)
+
+
+def remember_writes(response):
+    """``after_request`` hook pinning a user who just committed a write to the primary."""
+    if g.get(_WROTE_KEY) and current_user.is_authenticated:
+        _sticky_store().set(current_user.get_id(), True, current_app.config.get('REPLICA_STICKY_SECONDS', 30))
+    return response
+
+
+def init_app(app):
+    app.before_request(select_bind)
+    app.after_request(remember_writes)
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_write(session, flush_context):
+    if has_request_context():
+        g.setdefault(_PENDING_KEY, True)
+        # Anything read later in this request must see what was just flushed
+        route_to(None)
+
+
+@event.listens_for(Session, 'after_commit')
+def _commit_write(session):
+    if has_request_context() and g.pop(_PENDING_KEY, None):
+        setattr(g, _WROTE_KEY, True)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_write(session):
+    if has_request_context():
+        g.pop(_PENDING_KEY, None)
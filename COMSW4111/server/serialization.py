@@ -0,0 +1,101 @@
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import types
+from COMSW4111.data_models import db
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask's JSON output, encoded by orjson.
+
+    orjson serializes dicts, lists, strings and numbers natively; Decimals,
+    dates and Flask's other extra types fall back to Flask's ``default``,
+    so clients see the same strings (Decimals as ``"11.00"``, dates as HTTP
+    dates) whichever backend is installed.
+    """
+
+    def _options(self, pretty=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=self.default, option=self._options(pretty)) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def make_provider(app):
+    """JSON provider selected by ``JSON_BACKEND``: ``'orjson'``, ``'json'`` or ``'auto'``."""
+    backend = app.config.get('JSON_BACKEND', 'auto')
+    if backend == 'orjson' or (backend == 'auto' and orjson is not None):
+        if orjson is None:
+            raise RuntimeError("JSON_BACKEND is 'orjson' but orjson is not installed")
+        return OrjsonProvider(app)
+    return DefaultJSONProvider(app)
+
+
+def _number(value):
+    return None if value is None else float(value)
+
+
+def _isoformat(value):
+    return None if value is None else value.isoformat()
+
+
+def _wire_format(column_type):
+    """Converter for a column of ``column_type`` without one of its own, or ``None``."""
+    if isinstance(column_type, types.Numeric) and not isinstance(column_type, types.Float):
+        return _number
+    if isinstance(column_type, (types.Date, types.DateTime)):
+        return _isoformat
+    return None
+
+
+class Schema:
+    """Declarative shape of the rows an endpoint returns.
+
+    Each keyword maps an output key to a column expression, or to a
+    ``(column, convert)`` pair when the value needs post-processing.
+    :meth:`query` selects exactly those columns as plain tuples (no ORM
+    entities are built) and :meth:`dump` turns a row into a dict ready for
+    ``jsonify``. Numeric columns come out as numbers and dates as ISO-8601,
+    as these endpoints have always sent them, unless a field has its own
+    converter.
+    """
+
+    def __init__(self, **fields):
+        self.names = tuple(fields)
+        self.columns = []
+        self.converters = []
+        for name, spec in fields.items():
+            column, convert = spec if isinstance(spec, tuple) else (spec, _wire_format(spec.type))
+            self.columns.append(column.label(name))
+            self.converters.append(convert)
+        self._converted = [(index, convert) for index, convert in enumerate(self.converters) if convert]
+
+    def query(self, *extra):
+        """Query selecting the schema's columns, followed by any ``extra`` ones (ignored by :meth:`dump`)."""
+        return db.session.query(*self.columns, *extra)
+
+    def dump(self, row):
+        values = list(row[:len(self.names)])
+        for index, convert in self._converted:
+            values[index] = convert(values[index])
+        return dict(zip(self.names, values))
+
+    def dump_all(self, rows):
+        return [self.dump(row) for row in rows]
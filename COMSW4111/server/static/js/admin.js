@@ -5,24 +5,33 @@ const AdminDisputes = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [selectedDispute, setSelectedDispute] = useState(null);
-  const [filterStatus, setFilterStatus] = useState('all');
+  const [filterStatus, setFilterStatus] = useState('unsolved');
+  const [counts, setCounts] = useState({});
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchDisputes();
-  }, []);
+  }, [filterStatus]);
 
-  const fetchDisputes = async () => {
+  // The queue comes a page at a time, oldest first; next_cursor fetches the following page
+  const fetchDisputes = async (cursor = null) => {
     try {
-      const response = await fetch('/api/admin/disputes');
+      if (cursor) setLoadingMore(true);
+      const page = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`/api/admin/disputes/queue?status=${filterStatus}${page}`);
       if (!response.ok) {
         throw new Error('Failed to fetch disputes');
       }
       const data = await response.json();
-      setDisputes(data.disputes);
+      setDisputes(prev => cursor ? [...prev, ...data.disputes] : data.disputes);
+      setCounts(data.counts);
+      setNextCursor(data.next_cursor);
     } catch (err) {
       setError('Failed to load disputed transactions');
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -40,24 +49,15 @@ const AdminDisputes = () => {
         throw new Error('Failed to update dispute status');
       }
 
-      const data = await response.json();
-
-      // Update local state
-      setDisputes(disputes.map(dispute =>
-        dispute.dispute_id === disputeId
-          ? { ...dispute, status: newStatus, resolution_date: data.resolution_date }
-          : dispute
-      ));
-
+      // Reload the queue: the dispute may have left it and the counts changed
+      await fetchDisputes();
       setSelectedDispute(null);
     } catch (err) {
       setError('Failed to update dispute status');
     }
   };
 
-  const filteredDisputes = filterStatus === 'all'
-    ? disputes
-    : disputes.filter(dispute => dispute.status === filterStatus);
+  const totalCount = (counts.solved || 0) + (counts.unsolved || 0);
 
   if (loading) {
     return (
@@ -78,9 +78,9 @@ const AdminDisputes = () => {
             onChange={(e) => setFilterStatus(e.target.value)}
             className="border border-gray-300 rounded px-3 py-1"
           >
-            <option value="all">All Disputes</option>
-            <option value="solved">Resolved</option>
-            <option value="unsolved">Unresolved</option>
+            <option value="unsolved">Unresolved ({counts.unsolved || 0})</option>
+            <option value="solved">Resolved ({counts.solved || 0})</option>
+            <option value="all">All Disputes ({totalCount})</option>
           </select>
         </div>
 
@@ -115,7 +115,7 @@ const AdminDisputes = () => {
               </tr>
             </thead>
             <tbody className="bg-white divide-y divide-gray-200">
-              {filteredDisputes.map((dispute) => (
+              {disputes.map((dispute) => (
                 <tr key={dispute.dispute_id} className="hover:bg-gray-50">
                   <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
                     {dispute.transaction_id}
@@ -151,6 +151,18 @@ const AdminDisputes = () => {
           </table>
         </div>
 
+        {nextCursor && (
+          <div className="mt-4 text-center">
+            <button
+              onClick={() => fetchDisputes(nextCursor)}
+              disabled={loadingMore}
+              className="px-4 py-2 text-sm font-medium rounded text-blue-600 bg-blue-100 hover:bg-blue-200 disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
+
         {/* Dispute Detail Modal */}
         {selectedDispute && (
           <div className="fixed inset-0 bg-gray-600 bg-opacity-50 flex justify-center items-center">
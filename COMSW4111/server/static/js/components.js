@@ -294,27 +294,40 @@ const PaymentMethodsTab = () => {
 
 
 
+// Transaction lists come a page at a time; next_cursor fetches the following page
+const LoadMoreButton = ({ onClick, loading }) => (
+  <div className="mt-4 text-center">
+    <button onClick={onClick} disabled={loading}
+            className="px-4 py-2 text-sm font-medium rounded-md text-blue-600 bg-blue-100 hover:bg-blue-200 disabled:opacity-50">
+      {loading ? 'Loading...' : 'Load more'}
+    </button>
+  </div>
+);
+
+const withCursor = (url, cursor) => cursor ? `${url}?cursor=${encodeURIComponent(cursor)}` : url;
+
 const BuyerDashboard = () => {
   const [buyerData, setBuyerData] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
 
   useEffect(() => {
     fetchBuyerData();
   }, []);
 
-  const fetchBuyerData = async () => {
+  const fetchBuyerData = async (cursor = null) => {
     try {
-      setLoading(true);
-      const response = await fetch('/api/account/buyer_list');
+      cursor ? setLoadingMore(true) : setLoading(true);
+      const response = await fetch(withCursor('/api/account/buyer_list', cursor));
       if (!response.ok) throw new Error('Failed to fetch buyer data');
       const data = await response.json();
-      setBuyerData(data);
-      console.log(data);
+      setBuyerData(prev => cursor && prev ? { ...data, transactions: [...prev.transactions, ...data.transactions] } : data);
     } catch (err) {
       setError(err.message);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -405,6 +418,9 @@ const BuyerDashboard = () => {
             </tbody>
           </table>
         </div>
+        {buyerData.next_cursor && (
+          <LoadMoreButton onClick={() => fetchBuyerData(buyerData.next_cursor)} loading={loadingMore}/>
+        )}
       </div>
     </div>
   );
@@ -413,23 +429,25 @@ const BuyerDashboard = () => {
 const SellerDashboard = () => {
     const [sellerData, setSellerData] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [error, setError] = useState(null);
 
     useEffect(() => {
         fetchSellerData();
     }, []);
 
-    const fetchSellerData = async () => {
+    const fetchSellerData = async (cursor = null) => {
         try {
-            setLoading(true);
-            const response = await fetch('/api/account/seller_list');
+            cursor ? setLoadingMore(true) : setLoading(true);
+            const response = await fetch(withCursor('/api/account/seller_list', cursor));
             if (!response.ok) throw new Error('Failed to fetch seller data');
             const data = await response.json();
-            setSellerData(data);
+            setSellerData(prev => cursor && prev ? { ...data, transactions: [...prev.transactions, ...data.transactions] } : data);
         } catch (err) {
             setError(err.message);
         } finally {
             setLoading(false);
+            setLoadingMore(false);
         }
     };
 
@@ -548,6 +566,9 @@ const SellerDashboard = () => {
             </tbody>
           </table>
         </div>
+        {sellerData.next_cursor && (
+          <LoadMoreButton onClick={() => fetchSellerData(sellerData.next_cursor)} loading={loadingMore}/>
+        )}
       </div>
         </div>
     );
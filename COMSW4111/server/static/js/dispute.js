@@ -20,21 +20,42 @@ function DisputePage() {
     const [success, setSuccess] = useState(false);
     const [transactions, setTransactions] = useState([]);
 
-    useEffect(() => {
-        const fetchTransactions = async () => {
-            try {
-                const response = await fetch('/api/transactions');
+    const fetchTransactions = async () => {
+        try {
+            // The picker needs every transaction, so follow X-Next-Cursor through all pages
+            let all = [];
+            let url = '/api/transactions';
+            while (url) {
+                const response = await fetch(url);
                 if (!response.ok) throw new Error('Failed to fetch transactions');
-                const data = await response.json();
-                setTransactions(data);
-            } catch (err) {
-                setError('Failed to load transactions');
+                all = all.concat(await response.json());
+                const cursor = response.headers.get('X-Next-Cursor');
+                url = cursor ? `/api/transactions?cursor=${encodeURIComponent(cursor)}` : null;
             }
-        };
+            setTransactions(all);
+        } catch (err) {
+            setError('Failed to load transactions');
+        }
+    };
 
+    useEffect(() => {
         fetchTransactions();
     }, []);
 
+    useEffect(() => {
+        // Pushed by the server: the filed dispute's resolution and new transactions
+        return openEvents({
+            dispute: (e) => {
+                const change = JSON.parse(e.data);
+                setDispute(prev => prev.dispute_id === change.dispute_id ? {...prev, status: change.status} : prev);
+            },
+            transaction: (e) => {
+                if (JSON.parse(e.data).previous === null) fetchTransactions();
+            },
+            resync: () => fetchTransactions()
+        });
+    }, []);
+
     const handleInputChange = (e) => {
         const {name, value} = e.target;
         setFormData(prevState => ({
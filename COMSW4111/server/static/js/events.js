@@ -0,0 +1,25 @@
+// Server-sent status changes from /api/events. The browser reconnects a
+// dropped stream by itself but gives up on an error response, such as the
+// 503 a worker sends when all its stream slots are taken; reopen after a
+// randomised delay instead, calling the resync handler meanwhile so the page
+// keeps itself current from the list endpoints until a slot frees up.
+// Returns a function that closes the stream.
+function openEvents(handlers) {
+  let source = null;
+  let timer = null;
+  const connect = () => {
+    source = new EventSource('/api/events');
+    Object.entries(handlers).forEach(([name, handler]) => source.addEventListener(name, handler));
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        if (handlers.resync) handlers.resync();
+        timer = setTimeout(connect, 5000 + Math.random() * 5000);
+      }
+    };
+  };
+  connect();
+  return () => {
+    clearTimeout(timer);
+    source.close();
+  };
+}
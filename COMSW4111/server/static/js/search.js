@@ -7,24 +7,30 @@ const ListingsPage = () => {
   const [listingsData, setListingsData] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchListingData();
   }, []);
 
-  const fetchListingData = async () => {
+  // Pages of 50, newest first; the X-Next-Cursor header fetches the following one
+  const fetchListingData = async (cursor = null) => {
     try {
-      const response = await fetch('/api/listing/search');
+      if (cursor) setLoadingMore(true);
+      const response = await fetch(cursor ? `/api/listing/search?cursor=${encodeURIComponent(cursor)}` : '/api/listing/search');
       if (!response.ok) {
         throw new Error('Failed to fetch user data');
       } else {
         const data = await response.json();
-        setListingsData(data);
+        setListingsData(prev => cursor ? [...prev, ...data] : data);
+        setNextCursor(response.headers.get('X-Next-Cursor'));
       }
     } catch (err) {
       setError(err.message);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -112,6 +118,14 @@ const ListingsPage = () => {
               </div>
           ))}
         </div>
+        {nextCursor && (
+            <div className="mt-6 text-center">
+              <button onClick={() => fetchListingData(nextCursor)} disabled={loadingMore}
+                      className="bg-white text-blue-600 border border-blue-600 px-6 py-2 rounded-lg hover:bg-blue-50 transition duration-200 font-medium disabled:opacity-50">
+                {loadingMore ? 'Loading...' : 'Load more listings'}
+              </button>
+            </div>
+        )}
         {filteredListings.length === 0 && (
             <div className="text-center py-12 bg-white rounded-lg shadow mt-6">
             <p className="text-gray-500 text-lg">No listings found matching your criteria</p>
@@ -12,6 +12,19 @@ const TransactionDetail = ({ transactionId }) => {
     fetchTransactionDetails().then(r => console.log("Transaction details fetched"));
   }, [transactionId]);
 
+  useEffect(() => {
+    // Status changes made elsewhere (e.g. by the other party) are pushed by the server
+    return openEvents({
+      transaction: (e) => {
+        const change = JSON.parse(e.data);
+        if (change.transaction_id === transactionId) {
+          setTransaction(prev => prev && { ...prev, status: change.status });
+        }
+      },
+      resync: () => fetchTransactionDetails()
+    });
+  }, [transactionId]);
+
   const fetchTransactionDetails = async () => {
     try {
       setLoading(true);
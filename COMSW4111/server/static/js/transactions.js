@@ -1,8 +1,13 @@
-const { useState, useEffect } = React;
+const { useState, useEffect, useRef } = React;
 const TransactionListingPage = () => {
   const [transactions, setTransactions] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Read by the event handler below, which is set up once and would otherwise see the first render's list
+  const transactionsRef = useRef(transactions);
+  transactionsRef.current = transactions;
   const [sortConfig, setSortConfig] = useState({
     key: 't_date',
     direction: 'desc'
@@ -10,16 +15,35 @@ const TransactionListingPage = () => {
   useEffect(() => {
     fetchTransactions();
   }, []);
-  const fetchTransactions = async () => {
+  useEffect(() => {
+    // Status changes are pushed by the server instead of re-fetching the list
+    return openEvents({
+      transaction: (e) => {
+        const change = JSON.parse(e.data);
+        if (!transactionsRef.current.some(t => t.transaction_id === change.transaction_id)) {
+          fetchTransactions();
+          return;
+        }
+        setTransactions(prev => prev.map(t => t.transaction_id === change.transaction_id ? { ...t, status: change.status } : t));
+      },
+      resync: () => fetchTransactions()
+    });
+  }, []);
+  // Pages of 50; the X-Next-Cursor header fetches the following one
+  const fetchTransactions = async (cursor = null) => {
     try {
-      const response = await fetch('/api/transactions', { headers: { 'Accept': 'application/json' } });
+      if (cursor) setLoadingMore(true);
+      const url = cursor ? `/api/transactions?cursor=${encodeURIComponent(cursor)}` : '/api/transactions';
+      const response = await fetch(url, { headers: { 'Accept': 'application/json' } });
       if (!response.ok) throw new Error('Failed to fetch transactions');
       const data = await response.json();
-      setTransactions(data);
+      setTransactions(prev => cursor ? [...prev, ...data] : data);
+      setNextCursor(response.headers.get('X-Next-Cursor'));
     } catch (err) {
       setError(err.message);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
   const getStatusColor = (status) => {
@@ -133,6 +157,14 @@ const TransactionListingPage = () => {
             </tbody>
           </table>
         </div>
+        {nextCursor && (
+            <div className="mt-4 text-center">
+              <button onClick={() => fetchTransactions(nextCursor)} disabled={loadingMore}
+                      className="px-4 py-2 text-sm font-medium rounded-md text-blue-600 bg-blue-100 hover:bg-blue-200 disabled:opacity-50">
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+        )}
         {transactions.length === 0 && (
             <div className="text-center py-8 text-gray-500">
               No transactions found
@@ -1,14 +1,12 @@
-from flask import Blueprint, request, jsonify, render_template, current_app
+from flask import Blueprint, Response, request, jsonify, render_template, current_app
 from flask_login import login_required, current_user
-from datetime import datetime
-from sqlalchemy import exc, and_, desc
-from COMSW4111.data_models import PRUser
-from COMSW4111.data_models import db, Account
+from sqlalchemy import exc
+from COMSW4111.data_models import db, checkout
 from COMSW4111.data_models.transaction import Transaction
-from COMSW4111.data_models.buyer import Buyer
-from COMSW4111.data_models.listing import Listing
+from COMSW4111.server import conditional, events
 from COMSW4111.server.transactions import bp
-import uuid
+from COMSW4111.server.pagination import paginate, jsonify_page, InvalidCursor
+from COMSW4111.server.app import busy_response
 
 @bp.route('/transaction', methods=['GET'])
 @login_required
@@ -26,45 +24,20 @@ def transaction_list():
 @bp.route('/api/transaction', methods=['POST'])
 @login_required
 def post_new_transaction():
+    """Buy a listing. Send an ``Idempotency-Key`` header to make retries safe."""
     data = request.get_json()
-    error_description = ""
+    idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+    if idempotency_key and len(idempotency_key) > 64:
+        return jsonify({"error": "Idempotency key too long"}), 400
     try:
-        listing = Listing.query.filter_by(listing_id=data['listing_id']).first()
-        account = Account.query.filter_by(user_id=current_user.user_id).first()
-        transaction_user = PRUser.query.get(current_user.user_id)
-        transactions = Transaction.query.filter(and_(Transaction.listing_id == data['listing_id'], Transaction.buyer_id == current_user.user_id)).all()
-        if transactions:
-            error_description = "transaction already exists"
-            return jsonify({"error": f"Transactions already exist"}), 500
-        if listing.seller_id == current_user.user_id:
-            error_description = "cannot buy own listing"
-            return jsonify({"error": f"Cannot buy your own listing"}), 500
-        if account is None:
-            account = Account(
-                account_id=str(uuid.uuid4()),
-                user_id=current_user.user_id,
-                billing_address=transaction_user.address,
-            )
-            db.session.add(account)
-            db.session.commit()
-        buyer = Buyer.query.get(current_user.user_id)
-        if buyer is None:
-            buyer = Buyer(buyer_id=current_user.user_id, account_id=account.account_id)
-            db.session.add(buyer)
-        new_transaction = Transaction(
-            transaction_id=str(uuid.uuid4()),
-            buyer_id=buyer.buyer_id,
-            seller_id=listing.seller_id,
-            listing_id=listing.listing_id,
-            t_date=datetime.utcnow(),
-            agreed_price=data['agreed_price'],
-            serv_fee=data['serv_fee'],
-            status='pending'
+        new_transaction, created = checkout.checkout(
+            current_user.user_id,
+            data['listing_id'],
+            data['agreed_price'],
+            data['serv_fee'],
+            idempotency_key=idempotency_key
         )
-        listing.status = 'pending'
-        db.session.add(new_transaction)
-        db.session.commit()
-        return jsonify({
+        response = jsonify({
             'transaction_id': new_transaction.transaction_id,
             'buyer_id': new_transaction.buyer_id,
             'seller_id': new_transaction.seller_id,
@@ -74,36 +47,54 @@ def post_new_transaction():
             'serv_fee': float(new_transaction.serv_fee),
             'status': new_transaction.status
         })
+        if not created:
+            response.headers['Idempotent-Replayed'] = 'true'
+        return response
+    except checkout.CheckoutError as e:
+        return jsonify({"error": str(e)}), e.status
     except exc.SQLAlchemyError as e:
         print(e)
-        db.session.rollback()
         current_app.logger.error(f"Database error: {str(e)}")
         return jsonify({"error": "Database error occurred"}), 500
     except Exception as e:
         print(e)
-        current_app.logger.error(f"Error creating transaction: {str(e)} {error_description}")
-        return jsonify({"error": f"Failed to create transaction - {str(e)} {error_description}"}), 500
+        current_app.logger.error(f"Error creating transaction: {str(e)}")
+        return jsonify({"error": f"Failed to create transaction - {str(e)}"}), 500
 
 
 @bp.route('/api/transactions', methods=['GET'])
+@login_required
 def get_transactions():
     try:
+        role = request.args.get('role', 'all')
+        # Legacy filters: only the caller's own id is accepted
         buyer_id = request.args.get('buyer_id')
         seller_id = request.args.get('seller_id')
+        for requested_id in (buyer_id, seller_id):
+            if requested_id and requested_id != current_user.user_id:
+                return jsonify({'error': 'Unauthorized to view these transactions'}), 403
+        if buyer_id and not seller_id:
+            role = 'buyer'
+        elif seller_id and not buyer_id:
+            role = 'seller'
+        if role not in Transaction.ROLES:
+            return jsonify({'error': 'Invalid role', 'valid_roles': list(Transaction.ROLES)}), 400
+        query = Transaction.query.filter(Transaction.visible_to(current_user.user_id, role))
         status = request.args.get('status')
-        query = Transaction.query
-        if buyer_id:
-            query = query.filter(Transaction.buyer_id == buyer_id and buyer_id == current_user.user_id)
-        if seller_id:
-            query = query.filter(Transaction.seller_id == seller_id and seller_id == current_user.user_id)
         if status:
-            query = query.filter(Transaction.status == status and (buyer_id == current_user.user_id or seller_id == current_user.user_id))
-        query = query.order_by(desc(Transaction.t_date))
-        transactions = query.all()
-        filtered_transactions = [
-            transaction for transaction in transactions
-            if transaction.seller_id == current_user.user_id
-        ]
+            query = query.filter(Transaction.status.in_(status.split(',')))
+        transactions, next_cursor = paginate(
+            query,
+            (Transaction.t_date, Transaction.transaction_id),
+            key=lambda transaction: (transaction.t_date, transaction.transaction_id)
+        )
+        tag = conditional.etag(next_cursor, [
+            (transaction.transaction_id, transaction.status, transaction.t_last_edit)
+            for transaction in transactions
+        ])
+        unchanged = conditional.not_modified(tag)
+        if unchanged is not None:
+            return unchanged
         transactions_list = [{
             'transaction_id': transaction.transaction_id,
             'buyer_id': transaction.buyer_id,
@@ -113,8 +104,10 @@ def get_transactions():
             'agreed_price': str(transaction.agreed_price),  # Convert Decimal to string
             'serv_fee': str(transaction.serv_fee) if transaction.serv_fee else None,  # Handle nullable field
             'status': transaction.status
-        } for transaction in filtered_transactions]
-        return jsonify(transactions_list)
+        } for transaction in transactions]
+        return conditional.validated(jsonify_page(transactions_list, next_cursor), tag)
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         print(e)
         return jsonify({
@@ -127,10 +120,15 @@ def get_transactions():
 @login_required
 def get_transaction(transaction_id):
     """Fetch a specific transaction by ID"""
-    transaction = Transaction.query.get(transaction_id)
+    transaction = db.session.get(Transaction, transaction_id)
     if not transaction:
         return jsonify({"error": "Transaction not found"}), 404
-    return jsonify({
+    last_modified = transaction.t_last_edit
+    tag = conditional.etag(transaction.transaction_id, transaction.status, last_modified)
+    unchanged = conditional.not_modified(tag, last_modified)
+    if unchanged is not None:
+        return unchanged
+    return conditional.validated(jsonify({
         "transaction_id": transaction.transaction_id,
         "buyer_id": transaction.buyer_id,
         "seller_id": transaction.seller_id,
@@ -139,7 +137,7 @@ def get_transaction(transaction_id):
         "agreed_price": transaction.agreed_price,
         "serv_fee": transaction.serv_fee,
         "status": transaction.status
-    })
+    }), tag, last_modified)
 
 
 @bp.route('/api/transaction/update/<transaction_id>', methods=['PUT'])
@@ -148,9 +146,36 @@ def update_transaction_status(transaction_id):
     """Update the status of a transaction"""
     data = request.json
     new_status = data.get('status')
-    transaction = Transaction.query.get(transaction_id)
+    transaction = db.session.get(Transaction, transaction_id)
     if not transaction:
         return jsonify({"error": "Transaction not found"}), 404
     transaction.status = new_status
     db.session.commit()
     return jsonify({"message": "Transaction status updated", "transaction_id": transaction.transaction_id})
+
+
+@bp.route('/api/events', methods=['GET'])
+@login_required
+def event_stream():
+    """Server-sent ``transaction`` and ``dispute`` status changes for the current user.
+
+    Buyers and sellers get events for their own transactions and the
+    disputes filed on them; admins get every dispute event as well.
+    """
+    topics = [events.user_topic(current_user.user_id)]
+    if current_user.admin:
+        topics.append(events.ADMINS)
+    if not events.open_stream():
+        return busy_response(events.RETRY_AFTER)
+    try:
+        body = events.stream(topics, request.headers.get('Last-Event-ID'))
+    except Exception:
+        events.close_stream()
+        raise
+    response = Response(body, mimetype='text/event-stream')
+    # Runs once the server is done with the stream, however it ended
+    response.call_on_close(events.close_stream)
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
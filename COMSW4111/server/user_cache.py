@@ -0,0 +1,104 @@
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from COMSW4111.data_models import db, PRUser, Seller, Buyer, Admin
+from COMSW4111.data_models.PRUser import CHANGED_KEY as _PENDING_KEY
+from COMSW4111.server.cache import make_cache
+
+ROLE_MODELS = {'seller': Seller, 'buyer': Buyer, 'admin': Admin}
+_cache = None
+
+
+def get_cache():
+    """Return the process-wide cache, built from ``USER_CACHE_URL``/``USER_CACHE_SIZE`` on first use."""
+    global _cache
+    if _cache is None:
+        _cache = make_cache(
+            current_app.config.get('USER_CACHE_URL'), current_app.config.get('USER_CACHE_SIZE', 10000)
+        )
+    return _cache
+
+
+def _cache_key(user_id):
+    return f'pr_user:{user_id}'
+
+
+def _columns(obj):
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(type(obj)).column_attrs}
+
+
+def _detached(model, values):
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return obj
+
+
+def snapshot(user):
+    """Plain-data copy of ``user`` and its role rows, safe to pickle and share."""
+    data = {'user': _columns(user)}
+    for role in ROLE_MODELS:
+        related = getattr(user, role)
+        data[role] = _columns(related) if related is not None else None
+    return data
+
+
+def restore(data):
+    """Attach a :func:`snapshot` to the current session without querying the database."""
+    user = _detached(PRUser, data['user'])
+    for role, model in ROLE_MODELS.items():
+        values = data[role]
+        set_committed_value(user, role, _detached(model, values) if values is not None else None)
+    return db.session.merge(user, load=False)
+
+
+def query_user(user_id):
+    """Load a user with its seller, buyer and admin rows in one joined SELECT."""
+    return PRUser.query.options(
+        joinedload(PRUser.seller), joinedload(PRUser.buyer), joinedload(PRUser.admin)
+    ).filter(PRUser.user_id == user_id).first()
+
+
+def load_user(user_id):
+    """Return the user for ``user_id`` from the cache, falling back to :func:`query_user`."""
+    if not user_id:
+        return None
+    cache = get_cache()
+    key = _cache_key(user_id)
+    data = cache.get(key)
+    if data is not None:
+        return restore(data)
+    user = query_user(user_id)
+    if user is not None:
+        cache.set(key, snapshot(user), current_app.config.get('USER_CACHE_TTL', 60))
+    return user
+
+
+def invalidate(user_id):
+    if _cache is not None:
+        _cache.delete(_cache_key(user_id))
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_user_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, PRUser):
+            pending.add(obj.user_id)
+        elif isinstance(obj, Seller):
+            pending.add(obj.seller_id)
+        elif isinstance(obj, Buyer):
+            pending.add(obj.buyer_id)
+        elif isinstance(obj, Admin):
+            pending.add(obj.admin_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_user_changes(session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_user_changes(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,61 @@
+import multiprocessing
+from COMSW4111.data_models import db
+
+
+def server_options(config, **overrides):
+    """Gunicorn settings from the ``SERVER_*`` keys of ``config``; non-``None`` ``overrides`` win."""
+    workers = config.get('SERVER_WORKERS') or multiprocessing.cpu_count() * 2 + 1
+    threads = config.get('SERVER_THREADS', 1)
+    options = {
+        'bind': f"{config.get('SERVER_HOST', '0.0.0.0')}:{config.get('SERVER_PORT', 8111)}",
+        'workers': workers,
+        'threads': threads,
+        'keepalive': config.get('SERVER_KEEPALIVE', 5),
+        'timeout': config.get('SERVER_TIMEOUT', 30),
+        'graceful_timeout': config.get('SERVER_GRACEFUL_TIMEOUT', 30),
+        'preload_app': config.get('SERVER_PRELOAD', True),
+        'max_requests': config.get('SERVER_MAX_REQUESTS', 0),
+        'max_requests_jitter': config.get('SERVER_MAX_REQUESTS_JITTER', 0),
+        'pidfile': config.get('SERVER_PIDFILE'),
+    }
+    options.update({key: value for key, value in overrides.items() if value is not None})
+    options.setdefault('worker_class', 'gthread' if options['threads'] > 1 else 'sync')
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def _reset_connections(app):
+    # Connections opened while preloading belong to the master; each worker
+    # must open its own instead of sharing the inherited sockets.
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def serve(app_factory, options):
+    """Run ``app_factory()`` under gunicorn with ``options`` until the master exits.
+
+    The master re-execs its workers gracefully on SIGHUP (e.g. ``kill -HUP
+    $(cat <pidfile>)`` after a deploy) and drains in-flight requests for
+    ``graceful_timeout`` seconds on SIGTERM. With ``preload_app`` the code
+    is imported once in the master, so picking up new code needs a restart
+    rather than a HUP.
+    """
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        application = None
+
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+            self.cfg.set('post_fork', self.post_fork)
+
+        def load(self):
+            self.application = app_factory()
+            return self.application
+
+        def post_fork(self, server, worker):
+            if self.application is not None:
+                _reset_connections(self.application)
+
+    Application().run()
@@ -0,0 +1,80 @@
+import uuid
+from datetime import datetime
+import pytest
+from COMSW4111.config import TestingConfig
+from COMSW4111.data_models import db, Account, Listing, PRUser, Seller
+from COMSW4111.data_models.password_logic import generate_password_hash
+from COMSW4111.server import create_app
+from COMSW4111.server.auth import throttle
+
+PASSWORD = 'correct horse'
+
+
+@pytest.fixture(autouse=True)
+def login_buckets(monkeypatch):
+    # Every test client logs in from 127.0.0.1; give each test its own buckets
+    monkeypatch.setattr(throttle, '_store', None)
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+    # No app context is held during the test: each request must get its own,
+    # as in production, or g and the session would leak between requests
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+def _saved(*objs):
+    db.session.add_all(objs)
+    db.session.commit()
+    for obj in objs:
+        db.session.refresh(obj)
+        db.session.expunge(obj)
+    return objs[0]
+
+
+@pytest.fixture
+def make_user(app):
+    def make_user(seller=False):
+        with app.app_context():
+            return _make_user(seller)
+
+    def _make_user(seller):
+        user = PRUser(
+            user_id=str(uuid.uuid4()), first_name='Test', last_name='User', email=f'{uuid.uuid4().hex}@example.com',
+            password_hash=generate_password_hash(PASSWORD, TestingConfig.PASSWORD_HASH_METHOD),
+            address='1 Main St', acc_status='active'
+        )
+        db.session.add(user)
+        if seller:
+            account = Account(account_id=str(uuid.uuid4()), user_id=user.user_id, billing_address=user.address)
+            db.session.add(account)
+            db.session.flush()
+            db.session.add(Seller(seller_id=user.user_id, account_id=account.account_id))
+        return _saved(user)
+    return make_user
+
+
+@pytest.fixture
+def make_listing(app):
+    def make_listing(seller, price=10):
+        now = datetime.utcnow()
+        with app.app_context():
+            return _saved(Listing(
+                listing_id=str(uuid.uuid4()), seller_id=seller.user_id, status='active', title='Lamp',
+                description='A lamp', price=price, t_created=now, t_last_edit=now
+            ))
+    return make_listing
+
+
+@pytest.fixture
+def login(app):
+    def login(user):
+        client = app.test_client()
+        client.post('/login', data={'email': user.email, 'password': PASSWORD})
+        return client
+    return login
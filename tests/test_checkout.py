@@ -0,0 +1,42 @@
+def test_first_checkout_makes_buyer_visible_to_cached_user(make_user, make_listing, login):
+    seller = make_user(seller=True)
+    buyer = make_user()
+    listing = make_listing(seller)
+    client = login(buyer)
+    # Caches current_user without a buyer role
+    assert client.get('/api/account/buyer_list').status_code == 403
+
+    response = client.post('/api/transaction', json={
+        'listing_id': listing.listing_id, 'agreed_price': 10, 'serv_fee': 1
+    })
+    assert response.status_code == 200
+
+    response = client.get('/api/account/buyer_list')
+    assert response.status_code == 200
+    assert [row['listing_id'] for row in response.json['transactions']] == [listing.listing_id]
+
+
+def checkout(client, listing, key, price=10, fee=1):
+    return client.post('/api/transaction', json={
+        'listing_id': listing.listing_id, 'agreed_price': price, 'serv_fee': fee
+    }, headers={'Idempotency-Key': key})
+
+
+def test_retry_with_the_same_key_replays_the_transaction(make_user, make_listing, login):
+    listing = make_listing(make_user(seller=True))
+    client = login(make_user())
+    first = checkout(client, listing, 'key-1')
+    retry = checkout(client, listing, 'key-1', price='10.00')
+    assert retry.status_code == 200
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.json['transaction_id'] == first.json['transaction_id']
+
+
+def test_key_reused_for_a_different_checkout_is_refused(make_user, make_listing, login):
+    seller = make_user(seller=True)
+    listing, other_listing = make_listing(seller), make_listing(seller)
+    client = login(make_user())
+    assert checkout(client, listing, 'key-2').status_code == 200
+    assert checkout(client, listing, 'key-2', price=5).status_code == 422
+    assert checkout(client, listing, 'key-2', fee=0).status_code == 422
+    assert checkout(client, other_listing, 'key-2').status_code == 422
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from sqlalchemy import update
+from COMSW4111.data_models import db, Transaction
+
+
+def earlier(last_modified):
+    return format_datetime(parsedate_to_datetime(last_modified) - timedelta(seconds=1), usegmt=True)
+
+
+def assert_revalidates(client, url):
+    """The response carries validators, and each of them alone turns a repeat GET into a 304."""
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] in ('private, no-cache', 'no-cache, private')
+    tag, last_modified = response.headers['ETag'], response.headers['Last-Modified']
+    unchanged = client.get(url, headers={'If-None-Match': tag})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b''
+    assert unchanged.headers['ETag'] == tag
+    assert client.get(url, headers={'If-None-Match': '"stale"'}).status_code == 200
+    assert client.get(url, headers={'If-Modified-Since': last_modified}).status_code == 304
+    assert client.get(url, headers={'If-Modified-Since': earlier(last_modified)}).status_code == 200
+    # If-None-Match wins over a matching If-Modified-Since
+    both = {'If-None-Match': '"stale"', 'If-Modified-Since': last_modified}
+    assert client.get(url, headers=both).status_code == 200
+    return tag, last_modified
+
+
+def test_listing_detail_revalidates(make_user, make_listing, login):
+    seller = make_user(seller=True)
+    listing = make_listing(seller)
+    client = login(seller)
+    url = f'/api/listings/{listing.listing_id}'
+    tag, last_modified = assert_revalidates(client, url)
+    assert client.put(url, json={'title': 'Chair'}).status_code == 200
+    assert client.get(url, headers={'If-None-Match': tag}).status_code == 200
+
+
+def test_listing_detail_tag_depends_on_the_viewer(make_user, make_listing, login):
+    seller = make_user(seller=True)
+    listing = make_listing(seller)
+    url = f'/api/listings/{listing.listing_id}'
+    tag = login(seller).get(url).headers['ETag']
+    # The body differs in your_listing, so the seller's copy must not validate for anyone else
+    assert login(make_user()).get(url, headers={'If-None-Match': tag}).status_code == 200
+
+
+def test_transaction_revalidates(app, make_user, make_listing, login):
+    seller, buyer = make_user(seller=True), make_user()
+    client = login(buyer)
+    response = client.post('/api/transaction', json={
+        'listing_id': make_listing(seller).listing_id, 'agreed_price': 10, 'serv_fee': 1
+    })
+    transaction_id = response.json['transaction_id']
+    with app.app_context():
+        # Far enough back that the status change below moves Last-Modified on
+        db.session.execute(
+            update(Transaction).where(Transaction.transaction_id == transaction_id)
+            .values(t_last_edit=datetime.utcnow() - timedelta(minutes=1))
+        )
+        db.session.commit()
+    url = f'/api/transaction/{transaction_id}'
+    tag, last_modified = assert_revalidates(client, url)
+    login(seller).put(f'/api/transaction/update/{transaction_id}', json={'status': 'confirming'})
+    assert client.get(url, headers={'If-None-Match': tag}).status_code == 200
+    assert client.get(url, headers={'If-Modified-Since': last_modified}).status_code == 200
+
+
+def test_search_revalidates_by_tag_only(make_user, make_listing, login):
+    seller = make_user(seller=True)
+    make_listing(seller)
+    client = login(make_user())
+    url = '/api/listing/search?limit=5'
+    response = client.get(url)
+    tag = response.headers['ETag']
+    assert 'Last-Modified' not in response.headers
+    assert client.get(url, headers={'If-None-Match': tag}).status_code == 304
+    # Without a Last-Modified the date validator is not honoured
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(minutes=1), usegmt=True)
+    assert client.get(url, headers={'If-Modified-Since': later}).status_code == 200
+    make_listing(seller)
+    assert client.get(url, headers={'If-None-Match': tag}).status_code == 200
@@ -0,0 +1,21 @@
+from COMSW4111.config import Config
+from COMSW4111.server import events
+
+
+def test_streams_past_the_cap_are_turned_away_until_one_closes(app, make_user, login, monkeypatch):
+    app.config['EVENTS_MAX_STREAMS'] = 1
+    monkeypatch.setattr(events, '_slots', None)
+    client = login(make_user())
+    first = client.get('/api/events')
+    assert first.status_code == 200
+    turned_away = client.get('/api/events')
+    assert turned_away.status_code == 503
+    assert turned_away.headers['Retry-After'] == str(events.RETRY_AFTER)
+    first.close()
+    again = client.get('/api/events')
+    assert again.status_code == 200
+    again.close()
+
+
+def test_default_cap_leaves_threads_for_requests():
+    assert 1 < Config.EVENTS_MAX_STREAMS < Config.SERVER_THREADS
@@ -0,0 +1,52 @@
+import io
+import pytest
+
+
+def test_listing_detail(make_user, make_listing, login):
+    seller = make_user(seller=True)
+    listing = make_listing(seller, price=12)
+    response = login(make_user()).get(f'/api/listings/{listing.listing_id}')
+    assert response.status_code == 200
+    assert response.json['listing_id'] == listing.listing_id
+    assert response.json['price'] == 12.0
+    assert response.json['t_last_edit'] == listing.t_last_edit.isoformat()
+    assert response.json['your_listing'] is False
+    assert response.headers['ETag']
+    assert response.headers['Last-Modified']
+
+
+def test_missing_listing_detail_is_404(make_user, login):
+    assert login(make_user()).get('/api/listings/nope').status_code == 404
+
+
+def png_bytes():
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGB', (4, 4), 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('name', [
+    '/etc/hostname',
+    '../../../../etc/hostname',
+    'a' * 64 + '-thumb.webp',
+    'b' * 64 + '.png',
+])
+def test_listing_cover_must_be_a_stored_upload(app, make_user, make_listing, login, tmp_path, name):
+    app.config['IMAGE_ROOT'] = str(tmp_path)
+    seller = make_user(seller=True)
+    listing = make_listing(seller)
+    response = login(seller).put(f'/api/listings/{listing.listing_id}', json={'list_image': name})
+    assert response.status_code == 400
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_listing_cover_can_be_an_uploaded_image(app, make_user, make_listing, login, tmp_path):
+    app.config['IMAGE_ROOT'] = str(tmp_path)
+    seller = make_user(seller=True)
+    listing = make_listing(seller)
+    client = login(seller)
+    upload = client.post('/api/listings/upload-images', data={'images': (io.BytesIO(png_bytes()), 'red.png')})
+    name = upload.json['image']
+    response = client.put(f'/api/listings/{listing.listing_id}', json={'list_image': name})
+    assert response.status_code == 200
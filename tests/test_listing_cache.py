@@ -0,0 +1,130 @@
+import pytest
+from sqlalchemy import update
+from werkzeug.datastructures import MultiDict
+from COMSW4111.data_models import db, Listing
+from COMSW4111.data_models.listing import CHANGED_KEY
+from COMSW4111.data_models.routing import REPLICA, route_to
+from COMSW4111.server import listing_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(listing_cache, '_cache', None)
+
+
+def behind_the_cache(app, listing, **values):
+    """Change the row without the ORM hooks seeing it, as another process's write would look."""
+    with app.app_context():
+        db.session.execute(
+            update(Listing).where(Listing.listing_id == listing.listing_id).values(**values),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.info.pop(CHANGED_KEY, None)
+        db.session.commit()
+
+
+def detail(client, listing):
+    return client.get(f'/api/listings/{listing.listing_id}')
+
+
+def test_detail_is_served_from_the_cache(app, make_user, make_listing, login):
+    client = login(make_user())
+    listing = make_listing(make_user(seller=True))
+    assert detail(client, listing).json['title'] == 'Lamp'
+    behind_the_cache(app, listing, title='Chair')
+    assert detail(client, listing).json['title'] == 'Lamp'
+
+
+def test_update_invalidates_the_detail(make_user, make_listing, login):
+    seller = make_user(seller=True)
+    listing = make_listing(seller)
+    client = login(seller)
+    assert detail(client, listing).json['title'] == 'Lamp'
+    assert client.put(f'/api/listings/{listing.listing_id}', json={'title': 'Chair'}).status_code == 200
+    assert detail(client, listing).json['title'] == 'Chair'
+
+
+def test_status_change_invalidates_the_detail(make_user, make_listing, login):
+    seller = make_user(seller=True)
+    listing = make_listing(seller)
+    client = login(seller)
+    assert detail(client, listing).json['status'] == 'active'
+    response = client.patch('/api/listings/status', json={'listing_id': listing.listing_id, 'status': 'closed'})
+    assert response.status_code == 200
+    assert detail(client, listing).json['status'] == 'closed'
+
+
+def test_delete_invalidates_the_detail(make_user, make_listing, login):
+    seller = make_user(seller=True)
+    listing = make_listing(seller)
+    client = login(seller)
+    assert detail(client, listing).status_code == 200
+    assert client.delete(f'/api/listings/{listing.listing_id}').status_code == 200
+    assert detail(client, listing).status_code == 404
+
+
+def test_checkout_invalidates_the_detail_and_searches(make_user, make_listing, login):
+    listing = make_listing(make_user(seller=True))
+    client = login(make_user())
+    assert detail(client, listing).json['status'] == 'active'
+    assert [item['listing_id'] for item in client.get('/api/listing/search').json] == [listing.listing_id]
+    # The claim is a bulk UPDATE, reported to the cache through note_changed
+    response = client.post('/api/transaction', json={
+        'listing_id': listing.listing_id, 'agreed_price': 10, 'serv_fee': 1
+    })
+    assert response.status_code == 200
+    assert detail(client, listing).json['status'] == 'pending'
+    assert client.get('/api/listing/search').json[0]['status'] == 'pending'
+
+
+def test_replica_reads_are_not_cached_over_a_tombstone(app):
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {'title': f'build {len(builds)}'}
+
+    with app.test_request_context():
+        listing_cache.invalidate(['listing-1'])
+        route_to(REPLICA)
+        # The replica may not have the write yet: serve its version uncached
+        assert listing_cache.cached_listing('detail', 'listing-1', build) == {'title': 'build 1'}
+        assert listing_cache.cached_listing('detail', 'listing-1', build) == {'title': 'build 2'}
+        route_to(None)
+        # The primary has it, so its version replaces the tombstone
+        assert listing_cache.cached_listing('detail', 'listing-1', build) == {'title': 'build 3'}
+        assert listing_cache.cached_listing('detail', 'listing-1', build) == {'title': 'build 3'}
+
+
+def test_replica_reads_are_cached_once_settled(app):
+    app.config['REPLICA_MAX_LAG'] = -1
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {'title': f'build {len(builds)}'}
+
+    with app.test_request_context():
+        # Settle time is now zero, so the tombstone has already expired
+        listing_cache.invalidate(['listing-1'])
+        route_to(REPLICA)
+        assert listing_cache.cached_listing('detail', 'listing-1', build) == {'title': 'build 1'}
+        assert listing_cache.cached_listing('detail', 'listing-1', build) == {'title': 'build 1'}
+
+
+def test_replica_searches_are_not_cached_right_after_a_write(app):
+    builds = []
+
+    def build():
+        builds.append(1)
+        return len(builds)
+
+    args = MultiDict({'q': 'lamp'})
+    with app.test_request_context():
+        listing_cache.invalidate(['listing-1'])
+        route_to(REPLICA)
+        assert listing_cache.cached_search(args, build) == 1
+        assert listing_cache.cached_search(args, build) == 2
+        route_to(None)
+        assert listing_cache.cached_search(args, build) == 3
+        assert listing_cache.cached_search(args, build) == 3
@@ -0,0 +1,45 @@
+import pytest
+from COMSW4111.config import TestingConfig
+from COMSW4111.data_models import db
+from COMSW4111.server import create_app
+from tests.conftest import PASSWORD
+
+
+class BehindProxyConfig(TestingConfig):
+    PROXY_FIX_HOPS = 1
+    LOGIN_RATE_PER_IP = (2, 60)
+    LOGIN_RATE_PER_ACCOUNT = (3, 300)
+
+
+@pytest.fixture
+def app():
+    app = create_app(BehindProxyConfig)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+def token_request(client, email, password, ip):
+    return client.post(
+        '/api/auth/token', json={'email': email, 'password': password}, headers={'X-Forwarded-For': ip}
+    )
+
+
+def test_one_client_hits_its_own_limit_before_the_accounts(app, make_user):
+    user = make_user()
+    client = app.test_client()
+    assert token_request(client, user.email, 'wrong', '203.0.113.9').status_code == 401
+    assert token_request(client, user.email, 'wrong', '203.0.113.9').status_code == 401
+    assert token_request(client, user.email, 'wrong', '203.0.113.9').status_code == 429
+    # Same proxy hop, different client behind it
+    assert token_request(client, user.email, PASSWORD, '198.51.100.7').status_code == 200
+
+
+def test_guesses_spread_over_addresses_are_capped_per_account(app, make_user):
+    user = make_user()
+    client = app.test_client()
+    for address in ('203.0.113.1', '203.0.113.2', '203.0.113.3'):
+        assert token_request(client, user.email, 'wrong', address).status_code == 401
+    assert token_request(client, user.email, 'wrong', '203.0.113.4').status_code == 429
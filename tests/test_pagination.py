@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+from COMSW4111.data_models import db, Dispute, Listing, Transaction
+
+
+def buy(client, listing):
+    response = client.post('/api/transaction', json={
+        'listing_id': listing.listing_id, 'agreed_price': 10, 'serv_fee': 1
+    })
+    assert response.status_code == 200
+    return response.json['transaction_id']
+
+
+def follow_header(client, url):
+    """Every item of a list endpoint, page by page through ``X-Next-Cursor``."""
+    items, pages = [], 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        items += response.json
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        url = f'{url.split("&cursor=")[0]}&cursor={cursor}' if cursor else None
+    return items, pages
+
+
+def test_transactions_page_through_every_row_once(make_user, make_listing, login):
+    seller = make_user(seller=True)
+    client = login(make_user())
+    bought = {buy(client, make_listing(seller)) for _ in range(5)}
+    items, pages = follow_header(client, '/api/transactions?limit=2')
+    assert sorted(item['transaction_id'] for item in items) == sorted(bought)
+    assert pages == 3
+
+
+def test_search_pages_newest_first(app, make_user, make_listing, login):
+    seller = make_user(seller=True)
+    listings = [make_listing(seller) for _ in range(3)]
+    with app.app_context():
+        # Listings created in the same instant are ordered by id
+        for offset, listing in enumerate(listings):
+            db.session.get(Listing, listing.listing_id).t_created = datetime(2024, 1, 1) + timedelta(days=offset)
+        db.session.commit()
+    items, pages = follow_header(login(make_user()), '/api/listing/search?limit=1')
+    assert [item['listing_id'] for item in items] == [listing.listing_id for listing in reversed(listings)]
+    assert pages == 3
+
+
+def test_disputes_page_by_filing_time(app, make_user, make_listing, login):
+    seller = make_user(seller=True)
+    client = login(make_user())
+    transaction_id = buy(client, make_listing(seller))
+    with app.app_context():
+        # Ids deliberately out of filing order
+        for number, day in ((1, 3), (2, 1), (3, 2)):
+            db.session.add(Dispute(
+                dispute_id=f'dsp-{number}', transaction_id=transaction_id, description='x', status='unsolved',
+                t_filed=datetime(2024, 1, day)
+            ))
+        db.session.commit()
+    items, pages = follow_header(client, '/api/disputes?limit=2')
+    assert [item['dispute_id'] for item in items] == ['dsp-1', 'dsp-3', 'dsp-2']
+    assert pages == 2
+
+
+def test_invalid_cursor_is_rejected(make_user, login):
+    assert login(make_user()).get('/api/transactions?cursor=not-a-cursor').status_code == 400
+
+
+def test_sort_keys_are_required():
+    assert not Transaction.__table__.c.t_date.nullable
+    assert not Listing.__table__.c.t_created.nullable
+    assert not Dispute.__table__.c.t_filed.nullable
+
+
+def test_transaction_list_has_one_owner(app):
+    endpoints = [rule.endpoint for rule in app.url_map.iter_rules() if rule.rule == '/api/transactions']
+    assert endpoints == ['transactions.get_transactions']
@@ -0,0 +1,31 @@
+from concurrent.futures import Future
+import pytest
+from COMSW4111.data_models import password_pool
+from COMSW4111.data_models.password_pool import PasswordHashingBusy
+
+
+class StalledExecutor:
+    """Accepts work and never runs it, like a pool whose workers are all stuck."""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+
+def test_hash_that_overruns_the_timeout_is_busy_and_frees_its_slot(app, monkeypatch):
+    executor = StalledExecutor()
+    monkeypatch.setattr(password_pool, '_executor', executor)
+    monkeypatch.setattr(password_pool, '_slots', password_pool.threading.BoundedSemaphore(1))
+    app.config['PASSWORD_HASH_TIMEOUT'] = 0.01
+    with app.app_context():
+        with pytest.raises(PasswordHashingBusy):
+            password_pool.check_password('hash', 'password')
+        assert executor.futures[0].cancelled()
+        # The only slot was given back: the next attempt times out too instead of being turned away
+        with pytest.raises(PasswordHashingBusy):
+            password_pool.check_password('hash', 'password')
+        assert len(executor.futures) == 2
@@ -0,0 +1,100 @@
+import uuid
+from datetime import datetime
+import pytest
+from COMSW4111.data_models import db, Listing
+from COMSW4111.data_models.search_index import InvertedIndex, listing_index, search_backend
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    # The index is per process; start each test from the test's own database
+    listing_index.ready = False
+    yield
+    listing_index.ready = False
+
+
+@pytest.fixture
+def add_listing(app):
+    def add_listing(seller, title, description=None, meta_tag=None):
+        now = datetime.utcnow()
+        with app.app_context():
+            listing = Listing(
+                listing_id=str(uuid.uuid4()), seller_id=seller.user_id, status='active', title=title,
+                description=description, meta_tag=meta_tag, price=10, t_created=now, t_last_edit=now
+            )
+            db.session.add(listing)
+            db.session.commit()
+            return listing.listing_id
+    return add_listing
+
+
+def search(client, query):
+    response = client.get(f'/api/listing/search?{query}')
+    assert response.status_code == 200
+    return [item['listing_id'] for item in response.json]
+
+
+def test_index_requires_every_term_and_weights_fields():
+    index = InvertedIndex()
+    index.add('title', {'title': 'Brass lamp', 'description': 'Works'})
+    index.add('tag', {'title': 'Lamp', 'meta_tag': 'brass'})
+    index.add('body', {'title': 'Lamp', 'description': 'Brass base'})
+    index.add('other', {'title': 'Brass chair'})
+    assert index.search('brass lamp') == [('title', 6), ('tag', 5), ('body', 4)]
+    index.remove('title')
+    assert [listing_id for listing_id, _ in index.search('BRASS, lamp!')] == ['tag', 'body']
+    assert index.search('') == []
+    assert index.search('sofa') == []
+
+
+def test_search_ranks_title_matches_first(app, make_user, add_listing, login):
+    seller = make_user(seller=True)
+    in_description = add_listing(seller, 'Desk lamp', description='Brass finish')
+    in_title = add_listing(seller, 'Brass desk lamp')
+    in_tag = add_listing(seller, 'Desk lamp', meta_tag='brass')
+    add_listing(seller, 'Floor lamp')
+    with app.app_context():
+        assert search_backend() == 'memory'
+    assert search(login(make_user()), 'q=brass') == [in_title, in_tag, in_description]
+
+
+def test_memory_index_follows_committed_writes(app, make_user, add_listing, login):
+    seller = make_user(seller=True)
+    client = login(make_user())
+    lamp = add_listing(seller, 'Brass lamp')
+    assert search(client, 'q=brass') == [lamp]
+    assert listing_index.ready
+    chair = add_listing(seller, 'Oak chair')
+    with app.app_context():
+        db.session.get(Listing, lamp).title = 'Oak lamp'
+        db.session.commit()
+    assert search(client, 'q=brass') == []
+    assert sorted(search(client, 'q=oak')) == sorted([lamp, chair])
+    with app.app_context():
+        db.session.delete(db.session.get(Listing, chair))
+        db.session.commit()
+    assert search(client, 'q=oak') == [lamp]
+
+
+def test_rolled_back_writes_are_not_indexed(app, make_user, add_listing, login):
+    seller = make_user(seller=True)
+    client = login(make_user())
+    lamp = add_listing(seller, 'Brass lamp')
+    assert search(client, 'q=brass') == [lamp]
+    with app.app_context():
+        db.session.get(Listing, lamp).title = 'Oak lamp'
+        db.session.flush()
+        db.session.rollback()
+    assert search(client, 'q=brass') == [lamp]
+    assert search(client, 'q=oak') == []
+
+
+def test_q_title_and_meta_tag_must_all_match(make_user, add_listing, login):
+    seller = make_user(seller=True)
+    match = add_listing(seller, 'Oak desk', description='Sturdy', meta_tag='vintage')
+    add_listing(seller, 'Oak desk', description='Sturdy', meta_tag='modern')
+    add_listing(seller, 'Pine desk', description='Sturdy', meta_tag='vintage')
+    client = login(make_user())
+    assert search(client, 'q=sturdy&title=oak&meta_tag=vintage') == [match]
+    assert len(search(client, 'q=sturdy')) == 3
+    assert search(client, 'title=oak&meta_tag=vintage&min_price=20') == []
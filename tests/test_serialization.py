@@ -0,0 +1,21 @@
+import json
+from datetime import date
+from decimal import Decimal
+import pytest
+from flask.json.provider import DefaultJSONProvider
+from COMSW4111.data_models import Listing
+from COMSW4111.server.serialization import OrjsonProvider, Schema
+
+
+@pytest.mark.parametrize('provider', [DefaultJSONProvider, OrjsonProvider])
+def test_providers_keep_flasks_decimal_and_date_format(app, provider):
+    encoded = provider(app).dumps({'price': Decimal('11.00'), 'on': date(2024, 1, 2)})
+    assert json.loads(encoded) == {'price': '11.00', 'on': 'Tue, 02 Jan 2024 00:00:00 GMT'}
+
+
+def test_schema_dumps_numbers_and_iso_dates(app, make_user, make_listing):
+    listing = make_listing(make_user(seller=True), price=Decimal('11.00'))
+    schema = Schema(listing_id=Listing.listing_id, price=Listing.price, t_created=Listing.t_created)
+    with app.app_context():
+        row = schema.dump(schema.query().filter(Listing.listing_id == listing.listing_id).one())
+    assert row == {'listing_id': listing.listing_id, 'price': 11.0, 't_created': listing.t_created.isoformat()}
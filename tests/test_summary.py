@@ -0,0 +1,60 @@
+from COMSW4111.data_models import db
+from COMSW4111.data_models.summary import BuyerSummary, ListingSales, SellerSummary, rebuild_summaries
+
+
+def buy(client, listing, price=10, fee=1):
+    response = client.post('/api/transaction', json={
+        'listing_id': listing.listing_id, 'agreed_price': price, 'serv_fee': fee
+    })
+    assert response.status_code == 200
+    return response.json['transaction_id']
+
+
+def summaries(app, seller, buyer, listing):
+    with app.app_context():
+        return (
+            SellerSummary.for_party(seller.user_id).status_summary(),
+            BuyerSummary.for_party(buyer.user_id).status_summary(),
+            db.session.get(ListingSales, listing.listing_id)
+        )
+
+
+def test_summaries_follow_transaction_status(app, make_user, make_listing, login):
+    seller, buyer = make_user(seller=True), make_user()
+    listing = make_listing(seller)
+    buyer_client, seller_client = login(buyer), login(seller)
+    transaction_id = buy(buyer_client, listing)
+    seller_counts, buyer_counts, sales = summaries(app, seller, buyer, listing)
+    assert seller_counts['pending'] == buyer_counts['pending'] == 1
+    assert sales is None
+
+    seller_client.put(f'/api/transaction/update/{transaction_id}', json={'status': 'completed'})
+    seller_counts, buyer_counts, sales = summaries(app, seller, buyer, listing)
+    assert seller_counts['pending'] == 0 and seller_counts['completed'] == 1
+    assert buyer_counts['pending'] == 0 and buyer_counts['completed'] == 1
+    assert (sales.sale_count, float(sales.total_amount)) == (1, 10.0)
+
+    seller_summary = seller_client.get('/api/account/seller_list').json['summary']
+    assert seller_summary == {'total_transactions': 1, 'total_sales': 10.0, 'total_fees': 1.0, 'net_earnings': 9.0}
+    buyer_summary = buyer_client.get('/api/account/buyer_list').json['summary']
+    assert buyer_summary == {'total_transactions': 1, 'total_spent': 10.0, 'total_fees': 1.0}
+
+
+def test_rebuild_matches_incremental_summaries(app, make_user, make_listing, login):
+    seller, buyer = make_user(seller=True), make_user()
+    listing = make_listing(seller)
+    transaction_id = buy(login(buyer), listing)
+    login(seller).put(f'/api/transaction/update/{transaction_id}', json={'status': 'completed'})
+    buy(login(buyer), make_listing(seller))
+    with app.app_context():
+        before = [(row.seller_id, row.count_pending, row.count_completed, row.completed_amount)
+                  for row in SellerSummary.query.all()]
+        rebuild_summaries()
+        after = [(row.seller_id, row.count_pending, row.count_completed, row.completed_amount)
+                 for row in SellerSummary.query.all()]
+    assert before == after == [(seller.user_id, 1, 1, 10)]
+
+
+def test_listing_sales_go_with_their_listing():
+    (foreign_key,) = ListingSales.__table__.c.listing_id.foreign_keys
+    assert foreign_key.ondelete == 'CASCADE'